@@ -2,8 +2,8 @@ import sys
 import json
 import numpy as np
 import pandas as pd
-from pypfopt import EfficientFrontier, expected_returns
-from pypfopt.risk_models import CovarianceShrinkage
+from pypfopt import EfficientFrontier
+from portfolio_statistics import mean_historical_return, ledoit_wolf_covariance
 
 def optimize_portfolio(stock_data, var_percent):
     print('[LOG] [Classic] Step 1: Received stock data for optimization')
@@ -11,9 +11,9 @@ def optimize_portfolio(stock_data, var_percent):
     print(f'[LOG] [Classic] Step 2: Created DataFrame with shape {df.shape}')
     prices = df.pivot(index='date', columns='symbol', values='close').sort_index()
     print(f'[LOG] [Classic] Step 3: Pivoted prices DataFrame with shape {prices.shape}')
-    mu = expected_returns.mean_historical_return(prices)
+    mu = mean_historical_return(prices)
     print(f'[LOG] [Classic] Step 4: Calculated expected returns: {mu}')
-    S = CovarianceShrinkage(prices).ledoit_wolf()
+    S = ledoit_wolf_covariance(prices)
     print('[LOG] [Classic] Step 5: Calculated covariance matrix')
     ef = EfficientFrontier(mu, S)
     print('[LOG] [Classic] Step 6: Created EfficientFrontier object')
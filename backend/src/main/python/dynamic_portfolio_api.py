@@ -31,7 +31,8 @@ from sqlalchemy.ext.declarative import declarative_base
 from enhanced_dynamic_portfolio_opt import (
     DynamicOptimizationConfig, 
     dynamic_quantum_optimize,
-    OptimizationObjective
+    OptimizationObjective,
+    OPTIMIZER_TYPES
 )
 
 # Setup logging
@@ -116,6 +117,8 @@ class DynamicOptimizationRequest(BaseModel):
     bit_resolution: int = Field(2, description="Bits per allocation variable", ge=1, le=4)
     num_generations: int = Field(20, description="DE generations", ge=5, le=100)
     population_size: int = Field(40, description="DE population size", ge=10, le=100)
+    optimizer_type: str = Field("differential_evolution", description=f"Optimizer (variational, or classical simulated_annealing): {', '.join(OPTIMIZER_TYPES)}")
+    max_evaluations: int = Field(0, description="Cost evaluation budget (0 = 2 x generations x population)", ge=0, le=20000)
     
     # Execution settings
     async_execution: bool = Field(False, description="Run optimization asynchronously")
@@ -128,6 +131,12 @@ class DynamicOptimizationRequest(BaseModel):
         if len(v) > 10:
             raise ValueError('Maximum 10 assets supported')
         return v
+    
+    @validator('optimizer_type')
+    def validate_optimizer_type(cls, v):
+        if v not in OPTIMIZER_TYPES:
+            raise ValueError(f'optimizer_type must be one of {OPTIMIZER_TYPES}')
+        return v
 
 
 class OptimizationStatusResponse(BaseModel):
@@ -490,6 +499,8 @@ def _create_config_from_request(request: DynamicOptimizationRequest) -> DynamicO
         transaction_fee=request.transaction_fee,
         num_generations=request.num_generations,
         population_size=request.population_size,
+        optimizer_type=request.optimizer_type,
+        max_evaluations=request.max_evaluations,
         # Use reduced shots for API responsiveness
         estimator_shots=10000,
         sampler_shots=50000
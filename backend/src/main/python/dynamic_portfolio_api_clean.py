@@ -6,10 +6,11 @@ with the existing FastAPI backend infrastructure.
 """
 
 import asyncio
+import itertools
 import json
 import logging
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Literal, Optional, Any
 
 import pandas as pd
 import numpy as np
@@ -19,7 +20,8 @@ from pydantic import BaseModel, Field, validator
 # Local imports
 from enhanced_dynamic_portfolio_opt import (
     DynamicOptimizationConfig, 
-    dynamic_quantum_optimize
+    dynamic_quantum_optimize,
+    dynamic_quantum_sweep
 )
 
 # Setup logging
@@ -28,6 +30,7 @@ logger = logging.getLogger(__name__)
 # Constants
 JOB_NOT_FOUND_ERROR = "Job not found"
 OPTIMIZATION_TIMEOUT = 90.0  # 1.5 minutes maximum for API
+MAX_SWEEP_POINTS = 100
 
 # In-memory job storage (replace with Redis in production)
 active_jobs: Dict[str, Dict] = {}
@@ -66,6 +69,8 @@ class DynamicOptimizationRequest(BaseModel):
     population_size: int = Field(40, description="DE population size", ge=2, le=100)
     estimator_shots: int = Field(10000, description="Quantum estimator shots", ge=10, le=100000)
     sampler_shots: int = Field(50000, description="Quantum sampler shots", ge=50, le=200000)
+    simulation_mode: Literal["sampling", "exact"] = Field(
+        "sampling", description="Cost evaluation: shot sampling or exact statevector expectation")
     
     # Execution settings
     async_execution: bool = Field(False, description="Run optimization asynchronously")
@@ -82,6 +87,32 @@ class DynamicOptimizationRequest(BaseModel):
         return v
 
 
+class WeightingSweepRequest(DynamicOptimizationRequest):
+    """Request model for a sweep over (risk_aversion, restriction_coefficient) pairs"""
+    
+    risk_aversions: List[float] = Field(..., description="Risk aversion (γ) values to evaluate")
+    restriction_coefficients: List[float] = Field([1.0], description="Penalty (ρ) values to evaluate")
+    
+    @validator('risk_aversions', 'restriction_coefficients')
+    def validate_weights(cls, v):
+        if not v:
+            raise ValueError('At least one value required')
+        if any(w < 0 for w in v):
+            raise ValueError('Weights must be non-negative')
+        return v
+    
+    @validator('restriction_coefficients')
+    def validate_grid_size(cls, v, values):
+        num_points = len(values.get('risk_aversions') or []) * len(v)
+        if num_points > MAX_SWEEP_POINTS:
+            raise ValueError(f'Sweep grid has {num_points} points, maximum is {MAX_SWEEP_POINTS}')
+        return v
+    
+    def weightings(self) -> List[tuple]:
+        """Cartesian grid of (γ, ρ) pairs"""
+        return list(itertools.product(self.risk_aversions, self.restriction_coefficients))
+
+
 class OptimizationStatusResponse(BaseModel):
     """Response model for optimization job status"""
     job_id: str
@@ -151,6 +182,47 @@ async def start_dynamic_optimization(
         raise HTTPException(status_code=400, detail=f"Optimization failed: {str(e)}")
 
 
+@router.post("/sweep", response_model=Dict[str, Any])
+async def start_weighting_sweep(
+    request: WeightingSweepRequest,
+    background_tasks: BackgroundTasks,
+    user_id: str = "anonymous"
+) -> Dict[str, Any]:
+    """Optimize one price load under a grid of (risk_aversion, restriction_coefficient) pairs"""
+    try:
+        timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
+        job_id = f"dps_{timestamp}_{hash(str(request.dict()))}"
+        
+        logger.info("Starting weighting sweep job %s (%d points)", job_id, len(request.weightings()))
+        
+        validate_asset_data(request.assets)
+        
+        active_jobs[job_id] = {
+            "job_id": job_id,
+            "user_id": user_id,
+            "status": "pending",
+            "job_type": "sweep",
+            "request": request.dict(),
+            "created_at": datetime.now(timezone.utc),
+            "progress": 0.0
+        }
+        
+        # Points run one after another, so only a single point (or test-mode
+        # grid) fits the synchronous timeout; larger sweeps are queued
+        if request.async_execution or (len(request.weightings()) > 1 and not request.test_mode):
+            background_tasks.add_task(run_sweep_background, job_id, request)
+            return {"job_id": job_id, "status": "queued"}
+        
+        results = await run_sweep_sync(job_id, request)
+        return {"job_id": job_id, "status": "completed", "results": results}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to start weighting sweep: %s", e)
+        raise HTTPException(status_code=400, detail=f"Sweep failed: {str(e)}")
+
+
 @router.get("/status/{job_id}", response_model=OptimizationStatusResponse)
 async def get_optimization_status(job_id: str) -> OptimizationStatusResponse:
     """Get status of optimization job"""
@@ -366,6 +438,84 @@ async def run_optimization_background(job_id: str, request: DynamicOptimizationR
         active_jobs[job_id]["completed_at"] = datetime.now(timezone.utc)
 
 
+async def run_sweep_sync(job_id: str, request: WeightingSweepRequest) -> List[Dict]:
+    """Run a weighting sweep with timeout protection"""
+    try:
+        results = await asyncio.wait_for(run_sweep(job_id, request), timeout=OPTIMIZATION_TIMEOUT)
+        logger.info("Completed weighting sweep job %s", job_id)
+        return results
+        
+    except asyncio.TimeoutError:
+        # The executor thread keeps running; the failed status stops it before its next point
+        active_jobs[job_id]["status"] = "failed"
+        active_jobs[job_id]["error_message"] = "Sweep timeout"
+        active_jobs[job_id]["completed_at"] = datetime.now(timezone.utc)
+        raise HTTPException(status_code=408, detail="Sweep timeout")
+        
+    except Exception as e:
+        active_jobs[job_id]["status"] = "failed"
+        active_jobs[job_id]["error_message"] = str(e)
+        active_jobs[job_id]["completed_at"] = datetime.now(timezone.utc)
+        logger.error("Weighting sweep job %s failed: %s", job_id, e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def run_sweep_background(job_id: str, request: WeightingSweepRequest) -> None:
+    """Run a weighting sweep in a background task without timeout constraints"""
+    try:
+        await run_sweep(job_id, request)
+        logger.info("Background weighting sweep %s completed successfully", job_id)
+        
+    except Exception as e:
+        logger.error("Background weighting sweep %s failed: %s", job_id, e)
+        active_jobs[job_id]["status"] = "failed"
+        active_jobs[job_id]["error_message"] = str(e)
+        active_jobs[job_id]["completed_at"] = datetime.now(timezone.utc)
+
+
+async def run_sweep(job_id: str, request: WeightingSweepRequest) -> List[Dict]:
+    """Load prices once and evaluate every (γ, ρ) pair of the request"""
+    active_jobs[job_id]["status"] = "running"
+    active_jobs[job_id]["started_at"] = datetime.now(timezone.utc)
+    
+    config = create_config_from_request(request)
+    prices_df = load_price_data([asset.symbol for asset in request.assets])
+    
+    prev_allocation = None
+    if request.previous_allocation:
+        prev_allocation = np.array([
+            request.previous_allocation.get(asset.symbol, 0.0) 
+            for asset in request.assets
+        ])
+    
+    def should_stop() -> bool:
+        # Timed-out and cancelled jobs stop before their next point
+        return active_jobs[job_id]["status"] in ("failed", "cancelled")
+    
+    loop = asyncio.get_event_loop()
+    results = await loop.run_in_executor(
+        None,
+        dynamic_quantum_sweep,
+        prices_df,
+        config,
+        request.weightings(),
+        prev_allocation,
+        request.quantum_backend,
+        should_stop
+    )
+    
+    if should_stop():
+        # Do not overwrite a timeout or cancellation with a partial result
+        return results
+    
+    active_jobs[job_id]["status"] = "completed"
+    active_jobs[job_id]["completed_at"] = datetime.now(timezone.utc)
+    active_jobs[job_id]["result"] = {"sweep_results": results}
+    active_jobs[job_id]["progress"] = 100.0
+    
+    return results
+
+
 async def run_quantum_optimization(prices_df: pd.DataFrame, 
                                   config: DynamicOptimizationConfig,
                                   previous_allocation: Optional[np.ndarray],
@@ -397,6 +547,7 @@ def create_config_from_request(request: DynamicOptimizationRequest) -> DynamicOp
         # Use ultra-minimal shots for API responsiveness
         estimator_shots=min(request.estimator_shots, 100),  # Cap at 100 for API
         sampler_shots=min(request.sampler_shots, 500),      # Cap at 500 for API
+        simulation_mode=request.simulation_mode,
         # Enable test mode for ultra-fast development testing
         test_mode=request.test_mode
     )
@@ -12,27 +12,45 @@ Key improvements:
 3. Multi-bit asset encoding (fractional allocations)
 4. Transaction cost modeling
 5. Advanced constraint handling
-6. Differential Evolution + VQE hybrid optimization
+6. Differential Evolution + VQE hybrid optimization, or SPSA / COBYLA / Nelder-Mead /
+   parameter-shift / Bayesian (GP) optimizers under an evaluation budget
 """
 
 import sys
 import json
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple, Optional, Union
+from dataclasses import dataclass, replace
 from enum import Enum
 
-from pypfopt import expected_returns
-from pypfopt.risk_models import CovarianceShrinkage
 from qiskit.quantum_info import SparsePauliOp
 from qiskit.circuit.library import RealAmplitudes
-from qiskit.transpiler import generate_preset_pass_manager
 from scipy.optimize import differential_evolution, minimize
 import warnings
 warnings.filterwarnings('ignore')
 
-from quantum_backend_config import QuantumBackendManager
+from quantum_backend_config import BackendType, get_backend_manager
+from sparse_qubo import BlockSparseQubo
+from portfolio_statistics import price_fingerprint
+from rolling_statistics import period_statistics
+from ising_hamiltonian import extract_ising_terms, ising_terms_to_operator
+from qubo_energy import expectation_from_counts
+from exact_expectation import SIMULATION_MODES
+from transpilation import sampler_pub
+from parallel_vqe import PENALTY_COST, ParallelPopulationEvaluator, VQECostFunction
+from shot_scheduler import AdaptiveShotScheduler, ShotSchedule
+from warm_start import get_warm_start_store, seeded_population
+from variational_optimizers import OPTIMIZERS, create_optimizer, run_ask_tell
+from qubo_presolve import PresolvedQubo, presolve_qubo
+from qubo_decomposition import QuboComponent, decompose_qubo, stitch_bitstrings, stitch_counts
+from simulated_annealing import simulated_annealing
+
+OPTIMIZER_TYPES = ("differential_evolution",) + tuple(OPTIMIZERS) + ("simulated_annealing",)
 
 
 @dataclass
@@ -52,20 +70,54 @@ class DynamicOptimizationConfig:
     restriction_coefficient: float = 1.0  # ρ penalty coefficient
     
     # Optimization settings
-    optimizer_type: str = "differential_evolution"
+    optimizer_type: str = "differential_evolution"  # or an ask/tell optimizer: spsa, cobyla, nelder_mead, parameter_shift, bayesian
+    # or "simulated_annealing": classical replicas on the QUBO itself, no circuit
+    max_evaluations: int = 0  # cost evaluation budget; 0 = num_generations * population_size * 2
     num_generations: int = 20
     population_size: int = 40
     recombination: float = 0.4
-    max_parallel_jobs: int = 8  # Increase to use more CPU cores
+    warm_start: bool = True  # seed the DE population from optima of similar recorded problems
+    batch_population: bool = True  # score each DE generation with one sampler job
+    de_workers: int = 1  # >1 spreads each DE population over a process pool (local simulators only)
+    max_parallel_jobs: int = 8  # Increase to use more CPU cores; also bounds concurrently solved components
+    annealing_replicas: int = 64  # simulated_annealing chains run side by side
+    annealing_sweeps: int = 1000
     
     # Quantum settings
     estimator_shots: int = 25000
     sampler_shots: int = 100000
+    # Adaptive shots: batched DE populations are raced by successive halving, starting at
+    # min_estimator_shots (0 = estimator_shots // 16) and capped at estimator_shots
+    adaptive_shots: bool = False
+    min_estimator_shots: int = 0
+    shot_race_eta: int = 2
     ansatz_reps: int = 3
     use_optimized_ansatz: bool = True
     
     # Testing mode for ultra-fast development
     test_mode: bool = False  # Use classical approximation for fastest testing
+    
+    # Fix and merge variables decided by the coefficients before building the circuit
+    presolve: bool = True
+    
+    # Solve independent components of the interaction graph (e.g. periods) as separate circuits
+    decompose: bool = True
+    
+    # QUBO storage: larger problems use per-period blocks instead of a dense matrix
+    dense_qubo_max_qubits: int = 512
+    
+    # Hamiltonian terms below this fraction of the largest coefficient are dropped
+    hamiltonian_relative_tolerance: float = 1e-12
+    
+    # Bitstring energies: full 2^n table up to this size, per-outcome LRU cache above it
+    energy_table_max_qubits: int = 22
+    energy_table_dir: Optional[str] = None  # memory-map tables here instead of RAM
+    energy_cache_size: int = 1_000_000
+    
+    # "sampling" scores each cost evaluation from shots; "exact" uses noiseless statevector
+    # probabilities (local simulators, up to exact_max_qubits) and samples only the final solution
+    simulation_mode: str = "sampling"
+    exact_max_qubits: int = 25
 
 
 class OptimizationObjective(Enum):
@@ -76,6 +128,48 @@ class OptimizationObjective(Enum):
     CONSTRAINT = "constraint_penalty"    # P: Investment restrictions
 
 
+@dataclass
+class DynamicQuboComponents:
+    """
+    Unweighted QUBO components of O = -F + γR + C + ρP
+    
+    Each term is stored at unit weight (γ = fee = ρ = 1), so a new weighting
+    is a linear combination of cached arrays rather than a rebuild from prices.
+    """
+    terms: Dict[OptimizationObjective, BlockSparseQubo]
+    num_qubits: int
+    
+    def weights(self, config: DynamicOptimizationConfig) -> Dict[OptimizationObjective, float]:
+        """Objective weights taken from the configuration"""
+        return {
+            OptimizationObjective.RETURN: 1.0,
+            OptimizationObjective.RISK: config.risk_aversion,
+            OptimizationObjective.TRANSACTION: config.transaction_fee,
+            OptimizationObjective.CONSTRAINT: config.restriction_coefficient
+        }
+    
+    def combine(self, config: DynamicOptimizationConfig,
+                sparse: bool = False) -> Tuple[np.ndarray, Union[np.ndarray, BlockSparseQubo]]:
+        """
+        Weighted sum of the components
+        
+        Returns:
+            (linear, quadratic) with quadratic dense, or a BlockSparseQubo
+            sharing linear when sparse=True
+        """
+        weights = self.weights(config)
+        first = next(iter(self.terms.values()))
+        qubo = BlockSparseQubo.zeros(first.block_qubits, self.num_qubits)
+        for objective, term in self.terms.items():
+            qubo.linear += weights[objective] * term.linear
+            if np.any(term.blocks):
+                qubo.blocks += weights[objective] * term.blocks
+        
+        if sparse:
+            return qubo.linear, qubo
+        return qubo.to_dense()
+
+
 def calculate_total_qubits(num_assets: int, num_periods: int, config: DynamicOptimizationConfig) -> int:
     """
     Calculate total qubits needed: na × np × nq
@@ -120,7 +214,8 @@ def prepare_multi_period_data(prices: pd.DataFrame, config: DynamicOptimizationC
 
 def build_dynamic_qubo(periods_data: List[pd.DataFrame], 
                       config: DynamicOptimizationConfig,
-                      previous_allocation: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, int]:
+                      previous_allocation: Optional[np.ndarray] = None,
+                      sparse: bool = False) -> Tuple[np.ndarray, Union[np.ndarray, BlockSparseQubo], int]:
     """
     Build enhanced QUBO matrix for dynamic multi-period portfolio optimization
     
@@ -130,9 +225,12 @@ def build_dynamic_qubo(periods_data: List[pd.DataFrame],
         periods_data: List of price DataFrames for each time period
         config: Optimization configuration
         previous_allocation: Previous period allocation for transaction costs
+        sparse: Store couplings as per-period blocks (BlockSparseQubo) instead
+            of a dense total_qubits × total_qubits matrix
         
     Returns:
-        Tuple of (linear_coeffs, quadratic_matrix, total_qubits)
+        Tuple of (linear_coeffs, quadratic, total_qubits). quadratic is a dense
+        matrix, or a BlockSparseQubo sharing linear_coeffs when sparse=True
     """
     num_assets = periods_data[0].shape[1] 
     num_periods = len(periods_data)
@@ -140,27 +238,106 @@ def build_dynamic_qubo(periods_data: List[pd.DataFrame],
     
     print(f"[LOG] Building dynamic QUBO: {num_assets} assets, {num_periods} periods, {total_qubits} qubits")
     
-    # Initialize QUBO components
-    linear = np.zeros(total_qubits)
-    quadratic = np.zeros((total_qubits, total_qubits))
+    # Components are cached per price data, so only the weighting is redone here
+    components = get_qubo_components(periods_data, config, previous_allocation)
+    linear, quadratic = components.combine(config, sparse=sparse)
     
-    # Build each objective component
-    linear, quadratic = add_return_objective(linear, quadratic, periods_data, config)
-    linear, quadratic = add_risk_objective(linear, quadratic, periods_data, config)
-    linear, quadratic = add_transaction_cost_objective(linear, quadratic, config, num_periods, previous_allocation)
-    linear, quadratic = add_constraint_penalties(linear, quadratic, config, num_periods, num_assets)
-    
-    print(f"[LOG] QUBO construction complete: linear shape {linear.shape}, quadratic shape {quadratic.shape}")
+    if sparse:
+        print(f"[LOG] QUBO construction complete: linear shape {linear.shape}, "
+              f"{quadratic.blocks.shape[0]} blocks of {quadratic.blocks.shape[1]} qubits")
+    else:
+        print(f"[LOG] QUBO construction complete: linear shape {linear.shape}, quadratic shape {quadratic.shape}")
     
     return linear, quadratic, total_qubits
 
 
+def build_qubo_components(periods_data: List[pd.DataFrame],
+                          config: DynamicOptimizationConfig,
+                          previous_allocation: Optional[np.ndarray] = None) -> DynamicQuboComponents:
+    """
+    Build the unit-weight return, risk, transaction and penalty components
+    
+    Args:
+        periods_data: List of price DataFrames for each time period
+        config: Optimization configuration (objective weights are ignored)
+        previous_allocation: Previous period allocation for transaction costs
+        
+    Returns:
+        DynamicQuboComponents for the given price data
+    """
+    num_assets = periods_data[0].shape[1]
+    num_periods = len(periods_data)
+    total_qubits = calculate_total_qubits(num_assets, num_periods, config)
+    block_qubits = _period_qubit_indices(num_assets, num_periods, config)
+    unit_config = replace(config, risk_aversion=1.0, transaction_fee=1.0, restriction_coefficient=1.0)
+    
+    builders = {
+        OptimizationObjective.RETURN: lambda l, q: add_return_objective(l, q, periods_data, unit_config),
+        OptimizationObjective.RISK: lambda l, q: add_risk_objective(l, q, periods_data, unit_config),
+        OptimizationObjective.TRANSACTION: lambda l, q: add_transaction_cost_objective(
+            l, q, unit_config, num_periods, previous_allocation),
+        OptimizationObjective.CONSTRAINT: lambda l, q: add_constraint_penalties(
+            l, q, unit_config, num_periods, num_assets)
+    }
+    
+    terms = {}
+    for objective, add_objective in builders.items():
+        term = BlockSparseQubo.zeros(block_qubits, total_qubits)
+        add_objective(term.linear, term)
+        terms[objective] = term
+    
+    return DynamicQuboComponents(terms=terms, num_qubits=total_qubits)
+
+
+# Component cache keyed by price data and QUBO layout (LRU, small: one entry per universe)
+_QUBO_COMPONENT_CACHE: "OrderedDict[str, DynamicQuboComponents]" = OrderedDict()
+_QUBO_COMPONENT_CACHE_SIZE = 8
+_QUBO_COMPONENT_CACHE_LOCK = threading.Lock()
+
+
+def get_qubo_components(periods_data: List[pd.DataFrame],
+                        config: DynamicOptimizationConfig,
+                        previous_allocation: Optional[np.ndarray] = None) -> DynamicQuboComponents:
+    """
+    Cached build_qubo_components
+    
+    Objective weights are not part of the key, so changing risk_aversion,
+    transaction_fee or restriction_coefficient reuses the cached components.
+    """
+    digest = hashlib.sha256()
+    for period_prices in periods_data:
+        digest.update(price_fingerprint(period_prices).encode())
+    digest.update(str(config.bit_resolution).encode())
+    if previous_allocation is not None:
+        digest.update(np.asarray(previous_allocation, dtype=float).tobytes())
+    key = digest.hexdigest()
+    
+    with _QUBO_COMPONENT_CACHE_LOCK:
+        if key in _QUBO_COMPONENT_CACHE:
+            _QUBO_COMPONENT_CACHE.move_to_end(key)
+            return _QUBO_COMPONENT_CACHE[key]
+    
+    # Built outside the lock; a concurrent miss on the same key only costs duplicate work
+    components = build_qubo_components(periods_data, config, previous_allocation)
+    with _QUBO_COMPONENT_CACHE_LOCK:
+        _QUBO_COMPONENT_CACHE[key] = components
+        _QUBO_COMPONENT_CACHE.move_to_end(key)
+        while len(_QUBO_COMPONENT_CACHE) > _QUBO_COMPONENT_CACHE_SIZE:
+            _QUBO_COMPONENT_CACHE.popitem(last=False)
+    
+    return components
+
+
 def add_return_objective(linear: np.ndarray, quadratic: np.ndarray, 
                         periods_data: List[pd.DataFrame], 
                         config: DynamicOptimizationConfig) -> Tuple[np.ndarray, np.ndarray]:
     """
     Add return maximization objective: -F (negative for maximization)
     
+    Each period contributes the outer product mu ⊗ w of its expected returns
+    with the bit-weight vector, scattered onto that period's qubits. Expected
+    returns of all (overlapping) periods come from one rolling-window pass.
+    
     Args:
         linear: Linear QUBO coefficients
         quadratic: Quadratic QUBO matrix
@@ -172,22 +349,14 @@ def add_return_objective(linear: np.ndarray, quadratic: np.ndarray,
     """
     num_assets = periods_data[0].shape[1]
     num_periods = len(periods_data)
+    bit_weights = _bit_weights(config)
+    period_qubits = _period_qubit_indices(num_assets, num_periods, config)
     
-    for period_idx, period_prices in enumerate(periods_data):
-        # Calculate expected returns for this period
-        mu = expected_returns.mean_historical_return(period_prices)
-        
-        # Add to linear terms (negative for maximization)
-        for asset_idx in range(num_assets):
-            for bit_idx in range(config.bit_resolution):
-                qubit_idx = _get_qubit_index(asset_idx, period_idx, bit_idx, config, num_periods)
-                
-                # Weight by bit significance (2^bit_idx)
-                bit_weight = 2 ** bit_idx
-                allocation_weight = bit_weight / ((2 ** config.bit_resolution) - 1)
-                
-                # Add negative expected return (for maximization)
-                linear[qubit_idx] -= mu.iloc[asset_idx] * allocation_weight
+    statistics = period_statistics(periods_data)
+    
+    for period_idx, mu in enumerate(statistics.mu):
+        # Negative expected return (for maximization), one entry per (asset, bit)
+        linear[period_qubits[period_idx]] -= np.outer(mu, bit_weights).ravel()
     
     return linear, quadratic
 
@@ -198,6 +367,12 @@ def add_risk_objective(linear: np.ndarray, quadratic: np.ndarray,
     """
     Add risk minimization objective: γ²R
     
+    The per-period block is the Kronecker product of the covariance matrix
+    with the bit-weight outer product. Its diagonal (same asset, same bit)
+    goes to the linear terms, the remaining entries are halved into the
+    quadratic matrix. Covariances of all periods are shrunk in one batched
+    rolling-window pass.
+    
     Args:
         linear: Linear QUBO coefficients  
         quadratic: Quadratic QUBO matrix
@@ -209,41 +384,15 @@ def add_risk_objective(linear: np.ndarray, quadratic: np.ndarray,
     """
     num_assets = periods_data[0].shape[1]
     num_periods = len(periods_data)
+    bit_weights = _bit_weights(config)
+    period_qubits = _period_qubit_indices(num_assets, num_periods, config)
     
-    for period_idx, period_prices in enumerate(periods_data):
-        # Calculate covariance matrix for this period
-        S = CovarianceShrinkage(period_prices).ledoit_wolf()
-        
-        # Add quadratic risk terms
-        for i in range(num_assets):
-            for j in range(num_assets):
-                for bit_i in range(config.bit_resolution):
-                    for bit_j in range(config.bit_resolution):
-                        qubit_i = _get_qubit_index(i, period_idx, bit_i, config, num_periods)
-                        qubit_j = _get_qubit_index(j, period_idx, bit_j, config, num_periods)
-                        
-                        # Debug bounds checking
-                        if qubit_i >= len(linear) or qubit_j >= len(linear):
-                            print(f"[ERROR] Qubit index out of bounds: qubit_i={qubit_i}, qubit_j={qubit_j}, linear_size={len(linear)}")
-                            continue
-                            
-                        if i >= S.shape[0] or j >= S.shape[1]:
-                            print(f"[ERROR] Covariance matrix index out of bounds: i={i}, j={j}, S_shape={S.shape}")
-                            continue
-                        
-                        # Bit weights
-                        weight_i = 2 ** bit_i / ((2 ** config.bit_resolution) - 1)
-                        weight_j = 2 ** bit_j / ((2 ** config.bit_resolution) - 1)
-                        
-                        # Risk coefficient
-                        risk_coeff = config.risk_aversion * S.iloc[i, j] * weight_i * weight_j
-                        
-                        if i == j and bit_i == bit_j:
-                            # Diagonal terms go to linear
-                            linear[qubit_i] += risk_coeff
-                        else:
-                            # Off-diagonal terms go to quadratic  
-                            quadratic[qubit_i, qubit_j] += risk_coeff / 2
+    statistics = period_statistics(periods_data)
+    
+    for period_idx, S in enumerate(statistics.covariance):
+        block = _kron_bit_block(config.risk_aversion * S, bit_weights)
+        _scatter_period_block(linear, quadratic, period_idx, period_qubits[period_idx],
+                              np.diagonal(block), block / 2)
     
     return linear, quadratic
 
@@ -271,23 +420,14 @@ def add_transaction_cost_objective(linear: np.ndarray, quadratic: np.ndarray,
         return linear, quadratic
         
     num_assets = len(previous_allocation)
-    
-    # Transaction costs apply between consecutive periods
-    for period_idx in range(1, num_periods):
-        for asset_idx in range(num_assets):
-            # Current period allocation qubits
-            current_qubits = []
-            for bit_idx in range(config.bit_resolution):
-                qubit_idx = _get_qubit_index(asset_idx, period_idx, bit_idx, config, num_periods)
-                current_qubits.append(qubit_idx)
-            
-            # Previous period allocation (from previous_allocation array)
-            prev_allocation = previous_allocation[asset_idx]
-            
-            # Add quadratic terms for |current - previous|² approximation
-            # This is a simplified model - full implementation would need absolute value handling
-            for qubit in current_qubits:
-                linear[qubit] += config.transaction_fee * prev_allocation
+    period_qubits = _period_qubit_indices(num_assets, num_periods, config)
+    
+    # Transaction costs apply between consecutive periods, on every bit of
+    # every asset. This is a simplified linear model - a full |current - previous|
+    # formulation would need absolute value handling.
+    asset_costs = np.repeat(config.transaction_fee * np.asarray(previous_allocation, dtype=float),
+                            config.bit_resolution)
+    linear[period_qubits[1:]] += asset_costs
                 
     return linear, quadratic
 
@@ -313,29 +453,19 @@ def add_constraint_penalties(linear: np.ndarray, quadratic: np.ndarray,
     Returns:
         Updated (linear, quadratic) coefficients
     """
+    bit_weights = _bit_weights(config)
+    period_qubits = _period_qubit_indices(num_assets, num_periods, config)
+    penalty_strength = config.restriction_coefficient
+    
+    # Budget constraint (Σx_i - 1)²: x_i² terms on the diagonal, x_i * x_j
+    # cross terms for every other (asset, bit) pair within the period
+    diagonal = np.tile(penalty_strength * bit_weights * (bit_weights - 2), num_assets)
+    cross_terms = np.tile((penalty_strength * bit_weights)[:, None] * bit_weights[None, :] / 2,
+                          (num_assets, num_assets))
     
-    # Budget constraint: (Σ allocations - 1)² penalty
     for period_idx in range(num_periods):
-        # Add penalty for deviating from full investment (sum = 1)
-        penalty_strength = config.restriction_coefficient
-        
-        # Quadratic terms for (Σx_i - 1)²
-        for asset_i in range(num_assets):
-            for asset_j in range(num_assets):
-                for bit_i in range(config.bit_resolution):
-                    for bit_j in range(config.bit_resolution):
-                        qubit_i = _get_qubit_index(asset_i, period_idx, bit_i, config, num_periods)
-                        qubit_j = _get_qubit_index(asset_j, period_idx, bit_j, config, num_periods)
-                        
-                        weight_i = 2 ** bit_i / ((2 ** config.bit_resolution) - 1)
-                        weight_j = 2 ** bit_j / ((2 ** config.bit_resolution) - 1)
-                        
-                        if asset_i == asset_j and bit_i == bit_j:
-                            # x_i² terms
-                            linear[qubit_i] += penalty_strength * weight_i * (weight_i - 2)
-                        else:
-                            # x_i * x_j cross terms
-                            quadratic[qubit_i, qubit_j] += penalty_strength * weight_i * weight_j / 2
+        _scatter_period_block(linear, quadratic, period_idx, period_qubits[period_idx],
+                              diagonal, cross_terms)
     
     return linear, quadratic
 
@@ -367,6 +497,61 @@ def _get_qubit_index(asset_idx: int, period_idx: int, bit_idx: int,
             bit_idx)
 
 
+def _bit_weights(config: DynamicOptimizationConfig) -> np.ndarray:
+    """Allocation weight of each bit: 2^bit_idx / (2^bit_resolution - 1)"""
+    return 2.0 ** np.arange(config.bit_resolution) / ((2 ** config.bit_resolution) - 1)
+
+
+def _period_qubit_indices(num_assets: int, num_periods: int,
+                          config: DynamicOptimizationConfig) -> np.ndarray:
+    """
+    Vectorized _get_qubit_index for every (asset, bit) pair of every period
+    
+    Returns:
+        Array of shape (num_periods, num_assets * bit_resolution); row p holds
+        the qubit indices of period p ordered asset-major, then by bit
+    """
+    qubits_per_asset = num_periods * config.bit_resolution
+    asset_offsets = np.arange(num_assets)[:, None] * qubits_per_asset
+    period_offsets = np.arange(num_periods)[:, None] * config.bit_resolution
+    
+    return period_offsets + (asset_offsets + np.arange(config.bit_resolution)[None, :]).ravel()[None, :]
+
+
+def _kron_bit_block(asset_matrix: np.ndarray, bit_weights: np.ndarray) -> np.ndarray:
+    """
+    Expand an (asset × asset) matrix into its (asset, bit) × (asset, bit) block
+    
+    Equivalent to kron(asset_matrix, outer(w, w)), but evaluated as
+    (M[i, j] * w_i) * w_j so every entry is rounded exactly like the scalar
+    QUBO formulas.
+    """
+    num_assets = asset_matrix.shape[0]
+    num_bits = bit_weights.size
+    block = (asset_matrix[:, None, :, None] *
+             bit_weights[None, :, None, None] *
+             bit_weights[None, None, None, :])
+    
+    return block.reshape(num_assets * num_bits, num_assets * num_bits)
+
+
+def _scatter_period_block(linear: np.ndarray, quadratic: Union[np.ndarray, BlockSparseQubo],
+                          period_idx: int, qubits: np.ndarray,
+                          diagonal: np.ndarray, off_diagonal: np.ndarray) -> None:
+    """
+    Add a period block in place: diagonal entries to the linear terms,
+    off-diagonal entries (its own diagonal is ignored) to the quadratic couplings
+    """
+    linear[qubits] += diagonal
+    
+    if isinstance(quadratic, BlockSparseQubo):
+        quadratic.add_block(period_idx, off_diagonal)
+    else:
+        off_diagonal = np.array(off_diagonal, dtype=float)
+        np.fill_diagonal(off_diagonal, 0.0)
+        quadratic[np.ix_(qubits, qubits)] += off_diagonal
+
+
 def create_optimized_ansatz(num_qubits: int, config: DynamicOptimizationConfig) -> RealAmplitudes:
     """
     Create hardware-efficient ansatz optimized for portfolio optimization
@@ -397,48 +582,36 @@ def create_optimized_ansatz(num_qubits: int, config: DynamicOptimizationConfig)
         from qiskit.circuit.library import QAOAAnsatz
         hamiltonian = build_hamiltonian_from_qubo(np.zeros(num_qubits), 
                                                 np.zeros((num_qubits, num_qubits)), 
-                                                num_qubits)
+                                                num_qubits,
+                                                config.hamiltonian_relative_tolerance)
         ansatz = QAOAAnsatz(cost_operator=hamiltonian, reps=2)
         
     return ansatz
 
 
-def build_hamiltonian_from_qubo(linear: np.ndarray, quadratic: np.ndarray, num_qubits: int) -> SparsePauliOp:
+def build_hamiltonian_from_qubo(linear: np.ndarray, quadratic: Union[np.ndarray, BlockSparseQubo],
+                                num_qubits: int, relative_tolerance: float = 1e-12) -> SparsePauliOp:
     """
     Convert QUBO coefficients to quantum Hamiltonian
     
+    Terms are extracted as index/coefficient arrays and written directly into
+    the Pauli table, so cost grows with the number of non-zero terms instead
+    of building an n-character label per term.
+    
     Args:
         linear: Linear QUBO coefficients
-        quadratic: Quadratic QUBO matrix
+        quadratic: Quadratic QUBO matrix or BlockSparseQubo
         num_qubits: Number of qubits
+        relative_tolerance: Drop terms below this fraction of the largest coefficient
         
     Returns:
         Hamiltonian as SparsePauliOp
     """
-    pauli_terms = []
-    
-    # Linear terms: h_i * Z_i  
-    for i in range(num_qubits):
-        if abs(linear[i]) > 1e-10:  # Skip near-zero terms
-            label = 'I' * i + 'Z' + 'I' * (num_qubits - i - 1)
-            pauli_terms.append((label, linear[i]))
-    
-    # Quadratic terms: J_ij * Z_i * Z_j
-    for i in range(num_qubits):
-        for j in range(i+1, num_qubits):
-            if abs(quadratic[i, j]) > 1e-10:  # Skip near-zero terms
-                label = ['I'] * num_qubits
-                label[i] = 'Z'
-                label[j] = 'Z'
-                pauli_terms.append((''.join(label), quadratic[i, j]))
-    
-    print(f"[LOG] Built Hamiltonian: {len(pauli_terms)} Pauli terms")
+    terms = extract_ising_terms(linear, quadratic, num_qubits, relative_tolerance)
+    print(f"[LOG] Built Hamiltonian: {terms.num_terms} Pauli terms")
     
-    if not pauli_terms:
-        # Fallback identity if no terms
-        pauli_terms = [('I' * num_qubits, 0.0)]
-    
-    return SparsePauliOp.from_list(pauli_terms)
+    # Zero-coefficient identity if no terms survive pruning
+    return ising_terms_to_operator(terms)
 
 
 def decode_quantum_solution(bitstring: str, config: DynamicOptimizationConfig, 
@@ -455,28 +628,24 @@ def decode_quantum_solution(bitstring: str, config: DynamicOptimizationConfig,
     Returns:
         Dictionary mapping time_step -> {asset -> allocation}
     """
-    allocations = {}
+    period_qubits = _period_qubit_indices(num_assets, num_periods, config)
+    
+    # Qubits beyond the end of the bitstring read as '0'
+    bits = np.zeros(max(len(bitstring), period_qubits.size), dtype=np.int64)
+    bits[:len(bitstring)] = np.frombuffer(bitstring.encode('ascii'), dtype=np.uint8) - ord('0')
+    
+    # Convert binary (LSB first) to allocation percentage for every (period, asset)
+    asset_bits = bits[period_qubits].reshape(num_periods, num_assets, config.bit_resolution)
+    bit_values = asset_bits @ (2 ** np.arange(config.bit_resolution))
+    max_value = (2 ** config.bit_resolution) - 1
+    asset_allocations = bit_values / max_value * config.max_investment_per_asset
     
+    allocations = {}
     for period_idx in range(num_periods):
-        period_key = f"time_step_{period_idx}"
-        allocations[period_key] = {}
-        
-        for asset_idx in range(num_assets):
-            # Extract bits for this asset in this period
-            asset_bits = []
-            for bit_idx in range(config.bit_resolution):
-                qubit_idx = _get_qubit_index(asset_idx, period_idx, bit_idx, config, num_periods)
-                if qubit_idx < len(bitstring):
-                    asset_bits.append(bitstring[qubit_idx])
-                else:
-                    asset_bits.append('0')
-            
-            # Convert binary to allocation percentage
-            bit_value = int(''.join(reversed(asset_bits)), 2)  # LSB first
-            max_value = (2 ** config.bit_resolution) - 1
-            allocation = bit_value / max_value * config.max_investment_per_asset
-            
-            allocations[period_key][f"asset_{asset_idx}"] = allocation
+        allocations[f"time_step_{period_idx}"] = {
+            f"asset_{asset_idx}": float(asset_allocations[period_idx, asset_idx])
+            for asset_idx in range(num_assets)
+        }
     
     return allocations
 
@@ -496,18 +665,46 @@ def run_differential_evolution_vqe(ansatz, hamiltonian, config: DynamicOptimizat
     Returns:
         Optimization result with quantum solution
     """
-    import time
-    from qiskit_aer import AerSimulator
-    from qiskit_ibm_runtime import SamplerV2 as Sampler
+    print(f"[LOG] Starting Differential Evolution VQE: {config.num_generations} generations, {config.population_size} population")
+    return _run_on_leased_backend(ansatz, hamiltonian, config, quantum_backend, _run_differential_evolution_on_backend)
+
+
+def run_ask_tell_vqe(ansatz, hamiltonian, config: DynamicOptimizationConfig, quantum_backend: Optional[str] = None):
+    """
+    Run VQE optimization with a registered ask/tell optimizer (config.optimizer_type)
     
-    start_time = time.time()
-    optimization_timeout = 60  # 1 minute maximum for VQE
+    Args:
+        ansatz: Quantum circuit ansatz
+        hamiltonian: Problem Hamiltonian
+        config: Optimization configuration
+        quantum_backend: Name of quantum backend to use (None for auto-selection)
+        
+    Returns:
+        Optimization result with quantum solution
+    """
+    print(f"[LOG] Starting {config.optimizer_type} VQE: budget {evaluation_budget(config)} evaluations")
+    return _run_on_leased_backend(ansatz, hamiltonian, config, quantum_backend, _run_ask_tell_on_backend)
+
+
+def evaluation_budget(config: DynamicOptimizationConfig) -> int:
+    """Cost evaluations an optimizer may spend"""
+    return config.max_evaluations or max(10, config.num_generations * config.population_size * 2)
+
+
+def _run_on_leased_backend(ansatz, hamiltonian, config: DynamicOptimizationConfig, quantum_backend: Optional[str],
+                           run_on_backend):
+    """
+    Select and lease a backend, then run one VQE optimization on it
     
-    print(f"[LOG] Starting Differential Evolution VQE: {config.num_generations} generations, {config.population_size} population")
+    Args:
+        run_on_backend: Optimization loop called as run_on_backend(ansatz, hamiltonian, config,
+            lease, backend_info, optimization_timeout)
+    """
+    optimization_timeout = 60  # 1 minute maximum for VQE
     print(f"[LOG] Optimization timeout set to {optimization_timeout} seconds")
     
-    # Initialize quantum backend manager
-    backend_manager = QuantumBackendManager()
+    # Shared backend manager: its simulator pool bounds concurrent runs
+    backend_manager = get_backend_manager()
     
     # Select and configure quantum backend
     num_qubits = ansatz.num_qubits
@@ -525,87 +722,165 @@ def run_differential_evolution_vqe(ansatz, hamiltonian, config: DynamicOptimizat
     
     print(f"[LOG] Using quantum backend: {selected_backend_info.name} ({selected_backend_info.backend_type.value})")
     
-    # Setup quantum backend for execution  
-    backend = backend_manager.get_backend_instance(backend_name)
-    pm = generate_preset_pass_manager(backend=backend, optimization_level=2)
-    sampler = Sampler(mode=backend)
+    # Lease the backend (pooled for local simulators) for the whole run
+    with backend_manager.lease_backend(backend_name) as lease:
+        simulation_method = None
+        if selected_backend_info.backend_type == BackendType.SIMULATOR_LOCAL:
+            # Statevector memory grows as 2^n: pick the Aer method from size and entanglement
+            simulation_method = backend_manager.select_simulation_method(ansatz)
+            lease.apply_simulation_method(simulation_method)
+            print(f"[LOG] Aer simulation method: {simulation_method.method} "
+                  f"(predicted memory {simulation_method.predicted_memory_mb:.1f} MB) - {simulation_method.reason}")
+        result = run_on_backend(ansatz, hamiltonian, config, lease, selected_backend_info, optimization_timeout)
+        result['simulation_method'] = simulation_method.to_dict() if simulation_method else None
+        return result
+
+
+def _use_exact_simulation(config: DynamicOptimizationConfig, backend_name: str, selected_backend_info,
+                          num_qubits: int) -> bool:
+    """Whether config.simulation_mode == "exact" can be honoured on this backend and problem size"""
+    # Exact expectation values need a local simulator and a statevector that fits in memory
+    use_exact = config.simulation_mode == "exact"
+    if use_exact and selected_backend_info.backend_type != BackendType.SIMULATOR_LOCAL:
+        print(f"[WARNING] Exact simulation needs a local simulator, sampling on {backend_name} instead")
+        use_exact = False
+    if use_exact and num_qubits > config.exact_max_qubits:
+        print(f"[WARNING] {num_qubits} qubits exceed exact_max_qubits={config.exact_max_qubits}, sampling instead")
+        use_exact = False
+    print(f"[LOG] Cost function simulation mode: {'exact' if use_exact else 'sampling'}")
+    return use_exact
+
+
+def _create_cost_function(isa_ansatz, hamiltonian, config: DynamicOptimizationConfig, lease, use_exact: bool,
+                          deadline: float, max_evaluations: int,
+                          shot_scheduler: Optional[AdaptiveShotScheduler] = None) -> VQECostFunction:
+    """Cost function of the transpiled ansatz on a leased backend"""
+    # Picklable cost: bitstring energies are tabulated or cached once per process,
+    # and the time and evaluation budget is enforced in this process
+    cost_function = VQECostFunction(
+        isa_ansatz, hamiltonian, lease.backend, config.estimator_shots,
+        use_exact=use_exact,
+        exact_max_qubits=config.exact_max_qubits,
+        energy_table_max_qubits=config.energy_table_max_qubits,
+        energy_table_dir=config.energy_table_dir,
+        energy_cache_size=config.energy_cache_size,
+        deadline=deadline,
+        max_evaluations=max_evaluations,
+        shot_scheduler=shot_scheduler
+    )
+    return cost_function
+
+
+def _sample_final_counts(lease, isa_ansatz, params, shots: int) -> dict:
+    """Measurement counts of the optimized circuit"""
+    final_job = lease.sampler.run([sampler_pub(isa_ansatz, params)], shots=shots)
+    return final_job.result()[0].data.meas.get_counts()
+
+
+def _run_differential_evolution_on_backend(ansatz, hamiltonian, config: DynamicOptimizationConfig, lease,
+                                           selected_backend_info, optimization_timeout: float):
+    """
+    DE-VQE loop on a leased backend
+    
+    Args:
+        ansatz: Quantum circuit ansatz
+        hamiltonian: Problem Hamiltonian
+        config: Optimization configuration
+        lease: BackendLease providing backend, sampler and pass managers
+        selected_backend_info: QuantumBackendInfo of the leased backend
+        optimization_timeout: Seconds of optimization, counted from acquiring the lease
+        
+    Returns:
+        Optimization result with quantum solution
+    """
+    import time
+    
+    deadline = time.time() + optimization_timeout
+    backend_name = lease.backend_name
+    
+    # Transpile the unbound ansatz once (or reuse a cached ISA circuit); evaluations only pass parameter values
+    isa_ansatz = lease.transpile(ansatz, optimization_level=2)
+    
+    use_exact = _use_exact_simulation(config, backend_name, selected_backend_info, ansatz.num_qubits)
+    simulation_mode = "exact" if use_exact else "sampling"
     
     # Parameter bounds
     num_params = ansatz.num_parameters
     bounds = [(0, 2 * np.pi)] * num_params
     
-    job_count = 0
-    
-    def cost_function(params):
-        nonlocal job_count
-        job_count += 1
-        
-        # Check timeout to prevent infinite execution
-        if time.time() - start_time > optimization_timeout:
-            print(f"[LOG] Stopping optimization: timeout reached ({optimization_timeout}s)")
-            return 1e6  # Force termination with high cost
-        
-        # Enforce hard limit on job count to prevent runaway optimization
-        max_jobs = max(20, config.num_generations * config.population_size * 3)
-        if job_count > max_jobs:
-            print(f"[LOG] Stopping optimization: reached max jobs limit ({max_jobs})\"")
-            return 1e6  # Force termination with high cost
-        
-        try:
-            # Prepare parameterized circuit
-            circuit = ansatz.assign_parameters(params)
-            isa_circuit = pm.run(circuit)
-            
-            # Execute on quantum simulator
-            job = sampler.run([isa_circuit], shots=config.estimator_shots)
-            result = job.result()
-            
-            # Extract measurement counts
-            counts = result[0].data.meas.get_counts()
-            
-            # Compute expectation value
-            expectation = compute_expectation_from_counts(counts, hamiltonian)
-            
-            if job_count % 50 == 0:
-                print(f"[LOG] DE-VQE job {job_count}: expectation = {expectation:.4f}")
-            
-            return expectation
-            
-        except Exception as e:
-            print(f"[LOG] Cost function error: {e}")
-            return 1e6  # Return high cost on error
-    
-    # Run Differential Evolution (sequential for now due to pickle constraints)
-    # Note: Parallelization disabled temporarily due to local function pickle issue
-    print("[LOG] Running DE optimization with ultra-minimal parameters for speed")
+    # Adaptive shots need whole populations per cost call and sampled expectation values
+    shot_scheduler = None
+    if config.adaptive_shots and not use_exact:
+        if config.batch_population or config.de_workers > 1:
+            shot_scheduler = AdaptiveShotScheduler(ShotSchedule.for_budget(
+                config.estimator_shots, config.min_estimator_shots, config.shot_race_eta))
+            print(f"[LOG] Adaptive shots: {shot_scheduler.schedule.min_shots}-"
+                  f"{shot_scheduler.schedule.max_shots} per candidate")
+        else:
+            print("[WARNING] Adaptive shots need batched populations, using fixed estimator_shots")
     
     # Add strict limits to prevent runaway optimization
-    max_evaluations = max(10, config.num_generations * config.population_size * 2)  # Hard limit
-    
-    result = differential_evolution(
-        cost_function,
-        bounds,
-        maxiter=config.num_generations,
-        popsize=config.population_size,
-        recombination=config.recombination,
-        workers=1,  # Sequential to avoid pickle issues
-        seed=42,
-        # Add convergence criteria for early stopping
-        tol=1e-3,  # Stop if improvement is less than this
-        atol=1e-6,  # Absolute tolerance
-        # Add callback to enforce hard limits
-        callback=lambda x, convergence: job_count >= max_evaluations
-    )
+    max_evaluations = evaluation_budget(config)  # Hard limit
+    
+    cost_function = _create_cost_function(isa_ansatz, hamiltonian, config, lease, use_exact, deadline,
+                                          max_evaluations=max(20, max_evaluations * 3 // 2),
+                                          shot_scheduler=shot_scheduler)
+    
+    workers = max(1, config.de_workers)
+    if workers > 1 and not cost_function.picklable:
+        print(f"[WARNING] Parallel DE-VQE needs a local simulator, evaluating sequentially on {backend_name}")
+        workers = 1
+    
+    # Initial population around the optima of similar recorded problems
+    warm_start_store = get_warm_start_store() if config.warm_start else None
+    warm_starts = warm_start_store.lookup(ansatz, hamiltonian, k=3) if warm_start_store else []
+    init = 'latinhypercube'
+    if warm_starts:
+        population_size = max(5, config.population_size * num_params)
+        init = seeded_population(warm_starts, population_size, num_params, np.random.default_rng(42))
+        print(f"[LOG] DE warm start: {len(warm_starts)} recorded optima, nearest at distance {warm_starts[0].distance:.4f}")
+    
+    def run_de(objective, vectorized: bool):
+        # With vectorized=True each generation (and the initial population) is one cost call
+        return differential_evolution(
+            objective,
+            bounds,
+            maxiter=config.num_generations,
+            popsize=config.population_size,
+            recombination=config.recombination,
+            init=init,
+            vectorized=vectorized,
+            updating='deferred' if vectorized else 'immediate',
+            seed=42,
+            # Add convergence criteria for early stopping
+            tol=1e-3,  # Stop if improvement is less than this
+            atol=1e-6,  # Absolute tolerance
+            # Add callback to enforce hard limits
+            callback=lambda x, convergence: cost_function.evaluation_count >= max_evaluations
+        )
     
-    print(f"[LOG] DE-VQE complete: {job_count} evaluations, best cost = {result.fun:.4f}")
+    print(f"[LOG] Running DE optimization (batched population: {config.batch_population}, workers: {workers})")
+    if workers > 1:
+        # Populations are split across worker processes, one batched job per chunk
+        with ParallelPopulationEvaluator(cost_function, workers, config.batch_population) as objective:
+            result = run_de(objective, vectorized=True)
+    else:
+        result = run_de(cost_function, vectorized=config.batch_population)
+    
+    evaluation_count = cost_function.evaluation_count
+    job_count = cost_function.job_count
+    shot_count = cost_function.shot_count
+    print(f"[LOG] DE-VQE complete: {evaluation_count} evaluations in {job_count} jobs "
+          f"({shot_count} shots), best cost = {result.fun:.4f}")
+    shot_schedule = shot_scheduler.summary(config.estimator_shots) if shot_scheduler else None
+    if warm_start_store and result.fun < PENALTY_COST:
+        warm_start_store.record(ansatz, hamiltonian, result.x, result.fun)
+    if shot_schedule:
+        print(f"[LOG] Adaptive shots used {shot_schedule['total_shots']} of "
+              f"{shot_schedule['fixed_schedule_shots']} fixed-schedule shots on populations")
     
     # Get final solution bitstring
-    final_circuit = ansatz.assign_parameters(result.x)
-    isa_final = pm.run(final_circuit)
-    
-    final_job = sampler.run([isa_final], shots=config.sampler_shots)
-    final_result = final_job.result()
-    final_counts = final_result[0].data.meas.get_counts()
+    final_counts = _sample_final_counts(lease, isa_ansatz, result.x, config.sampler_shots)
     
     # Get most probable bitstring
     best_bitstring = max(final_counts, key=final_counts.get)
@@ -614,9 +889,89 @@ def run_differential_evolution_vqe(ansatz, hamiltonian, config: DynamicOptimizat
         'solution': best_bitstring,
         'objective_value': result.fun,
         'optimization_result': result,
+        'optimizer_type': "differential_evolution",
         'job_count': job_count,
+        'evaluation_count': evaluation_count,
+        'shot_count': shot_count,
+        'total_shots': shot_count + config.sampler_shots,
+        'shot_schedule': shot_schedule,
+        'warm_start_distance': warm_starts[0].distance if warm_starts else None,
         'final_counts': final_counts,
-        'backend_name': backend_name
+        'backend_name': backend_name,
+        'simulation_mode': simulation_mode
+    }
+
+
+def _run_ask_tell_on_backend(ansatz, hamiltonian, config: DynamicOptimizationConfig, lease,
+                             selected_backend_info, optimization_timeout: float):
+    """
+    Ask/tell optimizer loop on a leased backend
+    
+    Every ask() batch (2 points for SPSA, 2n+1 for parameter-shift) is
+    scored as one sampler job; COBYLA and Nelder-Mead ask one point at a time.
+    
+    Args:
+        ansatz: Quantum circuit ansatz
+        hamiltonian: Problem Hamiltonian
+        config: Optimization configuration
+        lease: BackendLease providing backend, sampler and pass managers
+        selected_backend_info: QuantumBackendInfo of the leased backend
+        optimization_timeout: Seconds of optimization, counted from acquiring the lease
+        
+    Returns:
+        Optimization result with quantum solution
+    """
+    import time
+    
+    deadline = time.time() + optimization_timeout
+    isa_ansatz = lease.transpile(ansatz, optimization_level=2)
+    num_params = ansatz.num_parameters
+    use_exact = _use_exact_simulation(config, lease.backend_name, selected_backend_info, ansatz.num_qubits)
+    simulation_mode = "exact" if use_exact else "sampling"
+    max_evaluations = evaluation_budget(config)
+    cost_function = _create_cost_function(isa_ansatz, hamiltonian, config, lease, use_exact, deadline,
+                                          max_evaluations)
+    
+    # Start from the optimum of the most similar recorded problem
+    warm_start_store = get_warm_start_store() if config.warm_start else None
+    warm_starts = warm_start_store.lookup(ansatz, hamiltonian) if warm_start_store else []
+    if warm_starts:
+        x0 = warm_starts[0].parameters
+        print(f"[LOG] {config.optimizer_type} warm start at distance {warm_starts[0].distance:.4f}")
+    else:
+        x0 = np.random.default_rng(42).uniform(0, 2 * np.pi, num_params)
+    
+    optimizer = create_optimizer(config.optimizer_type, x0, max_evaluations,
+                                 bounds=[(0, 2 * np.pi)] * num_params, seed=42)
+    # The cost function takes populations as (num_params, S) columns
+    result = run_ask_tell(optimizer, lambda points: cost_function(points.T),
+                          callback=lambda: time.time() > deadline)
+    
+    evaluation_count = cost_function.evaluation_count
+    job_count = cost_function.job_count
+    shot_count = cost_function.shot_count
+    print(f"[LOG] {config.optimizer_type} VQE complete: {evaluation_count} evaluations in {job_count} jobs "
+          f"({result.nit} iterations), best cost = {result.fun:.4f} - {result.message}")
+    if warm_start_store and result.fun < PENALTY_COST:
+        warm_start_store.record(ansatz, hamiltonian, result.x, result.fun)
+    
+    final_counts = _sample_final_counts(lease, isa_ansatz, result.x, config.sampler_shots)
+    best_bitstring = max(final_counts, key=final_counts.get)
+    
+    return {
+        'solution': best_bitstring,
+        'objective_value': result.fun,
+        'optimization_result': result,
+        'optimizer_type': config.optimizer_type,
+        'job_count': job_count,
+        'evaluation_count': evaluation_count,
+        'shot_count': shot_count,
+        'total_shots': shot_count + config.sampler_shots,
+        'shot_schedule': None,
+        'warm_start_distance': warm_starts[0].distance if warm_starts else None,
+        'final_counts': final_counts,
+        'backend_name': lease.backend_name,
+        'simulation_mode': simulation_mode
     }
 
 
@@ -624,38 +979,17 @@ def compute_expectation_from_counts(counts: dict, hamiltonian: SparsePauliOp) ->
     """
     Compute Hamiltonian expectation value from measurement counts
     
+    All distinct bitstrings are scored at once as the QUBO quadratic form
+    offset + lin·x + xᵀQx (see qubo_energy).
+    
     Args:
         counts: Measurement count dictionary
         hamiltonian: Problem Hamiltonian  
-        num_qubits: Number of qubits
         
     Returns:
         Expectation value
     """
-    expectation = 0.0
-    total_shots = sum(counts.values())
-    
-    for bitstring, count in counts.items():
-        probability = count / total_shots
-        
-        # Convert bitstring to Z eigenvalues (+1 for 0, -1 for 1)
-        z_values = np.array([1 - 2 * int(bit) for bit in bitstring])
-        
-        # Compute energy for this bitstring
-        energy = 0.0
-        for pauli_string, coeff in zip(hamiltonian.paulis.to_labels(), hamiltonian.coeffs):
-            term_value = coeff.real
-            
-            for qubit_idx, pauli_op in enumerate(pauli_string):
-                if pauli_op == 'Z':
-                    term_value *= z_values[qubit_idx]
-                # 'I' operations contribute factor of 1
-                    
-            energy += term_value
-        
-        expectation += probability * energy
-    
-    return expectation
+    return expectation_from_counts(counts, hamiltonian)
 
 
 def create_fast_test_result(periods_data: List[pd.DataFrame], total_qubits: int, config: DynamicOptimizationConfig = None) -> dict:
@@ -708,6 +1042,138 @@ def create_fast_test_result(periods_data: List[pd.DataFrame], total_qubits: int,
     return mock_result
 
 
+def _presolved_solution(presolved: PresolvedQubo, config: DynamicOptimizationConfig) -> dict:
+    """Optimization result for a QUBO that presolve fixed completely"""
+    solution = presolved.expand_bitstring("")
+    print(f"[LOG] Presolve fixed all {presolved.num_variables} variables, skipping the quantum optimization")
+    return {
+        'solution': solution,
+        'objective_value': presolved.offset,
+        'optimizer_type': "presolve",
+        'job_count': 0,
+        'evaluation_count': 0,
+        'total_shots': 0,
+        'final_counts': {solution: 1},
+        'backend_name': "presolve",
+        'simulation_mode': config.simulation_mode
+    }
+
+
+def run_simulated_annealing(linear: np.ndarray, quadratic: Union[np.ndarray, BlockSparseQubo], num_qubits: int,
+                            config: DynamicOptimizationConfig) -> dict:
+    """
+    Solve the QUBO classically with vectorized simulated annealing
+    
+    Args:
+        linear: Linear QUBO coefficients
+        quadratic: Quadratic QUBO matrix or BlockSparseQubo
+        num_qubits: Number of variables
+        config: Optimization configuration (annealing_replicas, annealing_sweeps)
+        
+    Returns:
+        Optimization result in the layout of the VQE runs; the final replica
+        states stand in for measurement counts
+    """
+    import time
+    
+    start = time.time()
+    annealed = simulated_annealing(linear, quadratic, num_qubits, num_replicas=config.annealing_replicas,
+                                   num_sweeps=config.annealing_sweeps,
+                                   dense_max_qubits=config.dense_qubo_max_qubits, seed=42)
+    print(f"[LOG] Simulated annealing: {config.annealing_replicas} replicas x {annealed.num_sweeps} sweeps "
+          f"on {num_qubits} qubits in {time.time() - start:.3f}s, best energy = {annealed.energy:.4f}")
+    return {
+        'solution': annealed.bitstring,
+        'objective_value': annealed.energy,
+        'optimizer_type': "simulated_annealing",
+        'job_count': 0,
+        'evaluation_count': config.annealing_replicas * annealed.num_sweeps,
+        'total_shots': 0,
+        'final_counts': annealed.counts(),
+        'backend_name': "simulated_annealing",
+        'simulation_mode': "classical"
+    }
+
+
+def _optimize_qubo(linear: np.ndarray, quadratic: Union[np.ndarray, BlockSparseQubo], num_qubits: int,
+                   config: DynamicOptimizationConfig, quantum_backend: Optional[str] = None) -> dict:
+    """Run the configured optimizer on a QUBO: simulated annealing directly, VQE on its Hamiltonian and ansatz"""
+    if config.optimizer_type == "simulated_annealing":
+        return run_simulated_annealing(linear, quadratic, num_qubits, config)
+    
+    # Convert to Hamiltonian  
+    hamiltonian = build_hamiltonian_from_qubo(linear, quadratic, num_qubits,
+                                              config.hamiltonian_relative_tolerance)
+    
+    # Create optimized ansatz
+    ansatz = create_optimized_ansatz(num_qubits, config)
+    ansatz.measure_all()
+    
+    # Run optimization
+    if config.optimizer_type == "differential_evolution":
+        return run_differential_evolution_vqe(ansatz, hamiltonian, config, quantum_backend)
+    return run_ask_tell_vqe(ansatz, hamiltonian, config, quantum_backend)
+
+
+def optimize_components(components: List[QuboComponent], num_qubits: int, config: DynamicOptimizationConfig,
+                        quantum_backend: Optional[str] = None) -> dict:
+    """
+    Optimize independent QUBO components concurrently and stitch their solutions
+    
+    Each component runs its own VQE on a leased backend, so the simulator
+    pool bounds how many circuits execute at once; config.max_parallel_jobs
+    bounds the component threads.
+    
+    Args:
+        components: Components from decompose_qubo
+        num_qubits: Number of variables of the decomposed QUBO
+        config: Optimization configuration
+        quantum_backend: Name of quantum backend to use (None for auto-selection)
+        
+    Returns:
+        Optimization result over all variables; objective value, jobs and shots
+        are summed over the components
+    """
+    sizes = [component.num_qubits for component in components]
+    workers = max(1, min(config.max_parallel_jobs, len(components)))
+    print(f"[LOG] Decomposed {num_qubits} qubits into {len(components)} independent components "
+          f"(sizes {sizes}), solving {workers} at a time")
+    
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="qubo-component") as executor:
+        futures = [executor.submit(_optimize_qubo, component.linear, component.quadratic,
+                                   component.num_qubits, config, quantum_backend)
+                   for component in components]
+        results = [future.result() for future in futures]
+    
+    # Energies carry no constant, so the stitched objective is the sum over components
+    solution = stitch_bitstrings(components, [result['solution'] for result in results], num_qubits)
+    final_counts = stitch_counts(components, [result['final_counts'] for result in results], num_qubits,
+                                 seed=42)
+    largest = results[int(np.argmax(sizes))]
+    return {
+        'solution': solution,
+        'objective_value': float(sum(result['objective_value'] for result in results)),
+        'optimizer_type': largest.get('optimizer_type', config.optimizer_type),
+        'job_count': sum(result['job_count'] for result in results),
+        'evaluation_count': sum(result.get('evaluation_count') or 0 for result in results),
+        'total_shots': sum(result.get('total_shots') or 0 for result in results),
+        'final_counts': final_counts,
+        'backend_name': largest.get('backend_name'),
+        'simulation_mode': largest.get('simulation_mode', config.simulation_mode),
+        'simulation_method': largest.get('simulation_method'),
+        'components': [
+            {
+                'qubits': component.indices.tolist(),
+                'objective_value': result['objective_value'],
+                'job_count': result['job_count'],
+                'backend_name': result.get('backend_name'),
+                'simulation_mode': result.get('simulation_mode')
+            }
+            for component, result in zip(components, results)
+        ]
+    }
+
+
 # Enhanced quantum optimization function
 def dynamic_quantum_optimize(prices: pd.DataFrame, config: DynamicOptimizationConfig,
                            previous_allocation: Optional[np.ndarray] = None,
@@ -726,6 +1192,11 @@ def dynamic_quantum_optimize(prices: pd.DataFrame, config: DynamicOptimizationCo
     """
     print(f"[LOG] Starting dynamic quantum optimization with {config.num_time_steps} periods")
     
+    if config.simulation_mode not in SIMULATION_MODES:
+        raise ValueError(f"simulation_mode must be one of {SIMULATION_MODES}, got '{config.simulation_mode}'")
+    if config.optimizer_type not in OPTIMIZER_TYPES:
+        raise ValueError(f"optimizer_type must be one of {OPTIMIZER_TYPES}, got '{config.optimizer_type}'")
+    
     # Prepare multi-period data
     periods_data = prepare_multi_period_data(prices, config)
     if not periods_data:
@@ -733,41 +1204,62 @@ def dynamic_quantum_optimize(prices: pd.DataFrame, config: DynamicOptimizationCo
         
     print(f"[LOG] Prepared {len(periods_data)} time periods")
     
-    # Build enhanced QUBO
-    linear, quadratic, total_qubits = build_dynamic_qubo(periods_data, config, previous_allocation)
+    # Build enhanced QUBO (per-period blocks once a dense matrix gets too large)
+    num_assets = periods_data[0].shape[1]
+    num_periods = len(periods_data)
+    use_sparse = calculate_total_qubits(num_assets, num_periods, config) > config.dense_qubo_max_qubits
+    linear, quadratic, total_qubits = build_dynamic_qubo(periods_data, config, previous_allocation,
+                                                         sparse=use_sparse)
     
     # Fast test mode - skip quantum simulation and return mock result
     if config.test_mode:
         print("[LOG] TEST MODE: Using fast classical approximation")
         return create_fast_test_result(periods_data, total_qubits, config)
     
-    # Convert to Hamiltonian  
-    hamiltonian = build_hamiltonian_from_qubo(linear, quadratic, total_qubits)
-    
-    # Create optimized ansatz
-    ansatz = create_optimized_ansatz(total_qubits, config)
-    ansatz.measure_all()
-    
-    # Run optimization
-    if config.optimizer_type == "differential_evolution":
-        result = run_differential_evolution_vqe(ansatz, hamiltonian, config, quantum_backend)
+    # Fix and merge variables the coefficients decide; only the rest become qubits
+    presolved = None
+    circuit_qubits = total_qubits
+    if config.presolve:
+        presolved = presolve_qubo(linear, quadratic, total_qubits)
+        print(f"[LOG] Presolve: {total_qubits} -> {presolved.num_reduced} qubits "
+              f"({presolved.num_fixed} fixed, {presolved.num_merged} merged)")
+        linear, quadratic, circuit_qubits = presolved.linear, presolved.quadratic, presolved.num_reduced
+    
+    if circuit_qubits == 0:
+        # Presolve decided every variable: the solution is exact, no circuit to run
+        result = _presolved_solution(presolved, config)
     else:
-        # Fallback to COBYLA
-        raise NotImplementedError("Only differential_evolution optimizer currently supported")
+        components = decompose_qubo(linear, quadratic, circuit_qubits) if config.decompose else []
+        if len(components) > 1:
+            result = optimize_components(components, circuit_qubits, config, quantum_backend)
+        else:
+            result = _optimize_qubo(linear, quadratic, circuit_qubits, config, quantum_backend)
+        
+        if presolved is not None:
+            # Back to the original variables and energy scale
+            result['solution'] = presolved.expand_bitstring(result['solution'])
+            result['final_counts'] = presolved.expand_counts(result['final_counts'])
+            result['objective_value'] = result['objective_value'] + presolved.offset
     
     # Decode solution
-    num_assets = periods_data[0].shape[1]
-    num_periods = len(periods_data)
     allocations = decode_quantum_solution(result['solution'], config, num_assets, num_periods)
     
     # Prepare final result
     final_result = {
         'allocations': allocations,
         'objective_value': result['objective_value'],
+        'optimizer_type': result.get('optimizer_type', config.optimizer_type),
         'quantum_jobs_executed': result['job_count'],
+        'quantum_evaluations_executed': result.get('evaluation_count'),
+        'quantum_shots_executed': result.get('total_shots'),
+        'shot_schedule': result.get('shot_schedule'),
         'solution_bitstring': result['solution'],
         'measurement_counts': result['final_counts'],
         'quantum_backend_used': result.get('backend_name', quantum_backend or 'auto-selected'),
+        'simulation_mode': result.get('simulation_mode', config.simulation_mode),
+        'simulation_method': result.get('simulation_method'),
+        'presolve': presolved.summary() if presolved is not None else None,
+        'components': result.get('components'),
         'configuration': config.__dict__
     }
     
@@ -775,6 +1267,55 @@ def dynamic_quantum_optimize(prices: pd.DataFrame, config: DynamicOptimizationCo
     return final_result
 
 
+def dynamic_quantum_sweep(prices: pd.DataFrame, config: DynamicOptimizationConfig,
+                          weightings: List[Tuple[float, float]],
+                          previous_allocation: Optional[np.ndarray] = None,
+                          quantum_backend: Optional[str] = None,
+                          should_stop: Optional[Callable[[], bool]] = None) -> List[dict]:
+    """
+    Optimize the same price data under many (risk_aversion, restriction_coefficient) pairs
+
+    The QUBO components are built from the prices once; every further pair
+    only re-weights the cached components.
+
+    Args:
+        prices: Historical price data
+        config: Base optimization configuration
+        weightings: List of (γ, ρ) pairs to evaluate
+        previous_allocation: Previous period allocation (for transaction costs)
+        quantum_backend: Name of quantum backend to use (None for auto-selection)
+        should_stop: Checked before each pair; once it returns True the sweep
+            stops and returns the results so far (e.g. after an API timeout)
+
+    Returns:
+        One optimization result per evaluated pair, in input order, each tagged
+        with its risk_aversion and restriction_coefficient
+    """
+    print(f"[LOG] Starting dynamic optimization sweep over {len(weightings)} weightings")
+
+    periods_data = prepare_multi_period_data(prices, config)
+    if not periods_data:
+        raise ValueError("Insufficient data for multi-period optimization")
+
+    # Warm the component cache once; each run below only re-weights
+    get_qubo_components(periods_data, config, previous_allocation)
+
+    results = []
+    for risk_aversion, restriction_coefficient in weightings:
+        if should_stop is not None and should_stop():
+            print(f"[LOG] Dynamic optimization sweep stopped after {len(results)} of {len(weightings)} weightings")
+            break
+        point_config = replace(config, risk_aversion=risk_aversion,
+                               restriction_coefficient=restriction_coefficient)
+        result = dynamic_quantum_optimize(prices, point_config, previous_allocation, quantum_backend)
+        result['risk_aversion'] = risk_aversion
+        result['restriction_coefficient'] = restriction_coefficient
+        results.append(result)
+
+    print(f"[LOG] Dynamic optimization sweep complete: {len(results)} weightings evaluated")
+    return results
+
+
 # Example usage and testing
 if __name__ == "__main__":
     print("[LOG] Enhanced Dynamic Portfolio Optimization - Test Mode")
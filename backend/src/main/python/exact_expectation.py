@@ -0,0 +1,62 @@
+"""
+Exact Statevector Expectation Values
+
+For small problems the cost function does not need shot sampling at all:
+the ansatz statevector gives the exact outcome probabilities, and since the
+problem Hamiltonian is diagonal,
+
+    ⟨H⟩ = Σ_k |ψ_k|² E_k
+
+where E is the 2^n energy table from qubo_energy. Aer's statevector method
+returns the probability vector directly (save_probabilities), so each cost
+evaluation is one noiseless simulation plus a dot product - no sampling
+noise, which lets the outer optimizer converge in fewer generations.
+
+Probabilities are little-endian over qubits, so index k is the bitstring
+format(k, f'0{n}b'), the same indexing as EnergyTable.
+"""
+
+from typing import Optional
+
+import numpy as np
+from qiskit import QuantumCircuit, transpile
+from qiskit.quantum_info import SparsePauliOp
+from qiskit_aer import AerSimulator
+
+from qubo_energy import EnergyTable, evaluator_for
+
+SIMULATION_MODES = ("sampling", "exact")
+EXACT_MAX_QUBITS = 25
+
+
+class StatevectorExpectation:
+    """Exact ⟨H⟩ of a parametrized ansatz for a diagonal Hamiltonian"""
+
+    def __init__(self, ansatz: QuantumCircuit, hamiltonian: SparsePauliOp,
+                 energies: Optional[np.ndarray] = None, max_qubits: int = EXACT_MAX_QUBITS):
+        """
+        Args:
+            ansatz: Parametrized circuit (final measurements are removed)
+            hamiltonian: Diagonal problem Hamiltonian
+            energies: Precomputed 2^n energy vector (built when None)
+            max_qubits: Refuse larger problems (statevector memory grows as 2^n)
+        """
+        num_qubits = ansatz.num_qubits
+        if num_qubits > max_qubits:
+            raise ValueError(f"Exact expectation limited to {max_qubits} qubits, got {num_qubits}")
+
+        circuit = ansatz.remove_final_measurements(inplace=False)
+        circuit.save_probabilities()
+        self.simulator = AerSimulator(method="statevector")
+        self.circuit = transpile(circuit, self.simulator)
+        self.energies = energies if energies is not None else EnergyTable(evaluator_for(hamiltonian)).energies
+        self.evaluations = 0
+
+    def probabilities(self, params: np.ndarray) -> np.ndarray:
+        """Outcome probabilities of the ansatz at the given parameters"""
+        bound = self.circuit.assign_parameters(params)
+        return np.asarray(self.simulator.run(bound).result().data(0)["probabilities"])
+
+    def __call__(self, params: np.ndarray) -> float:
+        self.evaluations += 1
+        return float(self.probabilities(params) @ self.energies)
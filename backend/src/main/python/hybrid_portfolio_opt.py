@@ -1,21 +1,29 @@
+import asyncio
 import sys
 import json
 import numpy as np
 import pandas as pd
-from pypfopt import EfficientFrontier, expected_returns
-from pypfopt.risk_models import CovarianceShrinkage
-from qiskit.quantum_info import SparsePauliOp
+from pypfopt import EfficientFrontier
+from portfolio_statistics import mean_historical_return, ledoit_wolf_covariance, portfolio_statistics
+from ising_hamiltonian import build_ising_hamiltonian
+from qubo_energy import ENERGY_TABLE_MAX_QUBITS, create_energy_lookup
+from exact_expectation import EXACT_MAX_QUBITS, SIMULATION_MODES, StatevectorExpectation
+from transpilation import get_transpile_cache, laid_out_observable, sampler_pub
+from quantum_backend_config import get_backend_manager
+from runtime_execution import IBMRuntimeAdapter
+from warm_start import get_warm_start_store
+from layerwise_qaoa import LAYER_STRATEGIES, run_layerwise_qaoa_async
+from variational_optimizers import OPTIMIZERS, create_optimizer, run_ask_tell_async
 from qiskit.circuit.library import QAOAAnsatz
-from qiskit.transpiler import generate_preset_pass_manager
 
 from qiskit_aer import AerSimulator
 from scipy.optimize import minimize
 
 def classical_optimize(prices):
     print("[LOG] [Classic] Step 1: Starting classical optimization")
-    mu = expected_returns.mean_historical_return(prices)
+    mu = mean_historical_return(prices)
     print(f"[LOG] [Classic] Step 2: Calculated expected returns: {mu}")
-    S = CovarianceShrinkage(prices).ledoit_wolf()
+    S = ledoit_wolf_covariance(prices)
     print(f"[LOG] [Classic] Step 3: Calculated covariance matrix: {S}")
     ef = EfficientFrontier(mu, S)
     print("[LOG] [Classic] Step 4: Created EfficientFrontier object")
@@ -31,8 +39,7 @@ def classical_optimize(prices):
 # Quantum optimization using Qiskit Optimization API (QUBO + VQE)
 def build_qubo(prices, risk_aversion):
     num_assets = prices.shape[1]
-    mu = expected_returns.mean_historical_return(prices)
-    S = CovarianceShrinkage(prices).ledoit_wolf()
+    mu, S = portfolio_statistics(prices)
     linear = np.array([-mu.iloc[i] for i in range(num_assets)])
     quadratic = np.zeros((num_assets, num_assets))
     for i in range(num_assets):
@@ -42,65 +49,48 @@ def build_qubo(prices, risk_aversion):
             quadratic[j, i] = risk_aversion * S.iloc[i, j]
     return linear, quadratic, num_assets
 
-def build_hamiltonian(linear, quadratic, num_assets):
-    pauli_terms = []
-    for i in range(num_assets):
-        coeff = linear[i]
-        label = 'I' * i + 'Z' + 'I' * (num_assets - i - 1)
-        pauli_terms.append((label, coeff))
-    for i in range(num_assets):
-        for j in range(i+1, num_assets):
-            coeff = quadratic[i, j]
-            label = ['I'] * num_assets
-            label[i] = 'Z'
-            label[j] = 'Z'
-            pauli_terms.append((''.join(label), coeff))
-    return SparsePauliOp.from_list(pauli_terms)
+def build_hamiltonian(linear, quadratic, num_assets, relative_tolerance=None):
+    # Z_i and Z_i Z_j (i < j) terms built from index arrays; None keeps every term
+    return build_ising_hamiltonian(linear, quadratic, num_assets, relative_tolerance)
+
+def run_simulator(ansatz, hamiltonian, num_assets, init_params, simulation_mode="sampling"):
+    # Lease a pooled, thread-budgeted simulator with its sampler and pass manager
+    manager = get_backend_manager()
+    with manager.lease_backend("aer_simulator") as lease:
+        simulation_method = manager.select_simulation_method(ansatz)
+        lease.apply_simulation_method(simulation_method)
+        print(f'[LOG] [Simulator] Aer method {simulation_method.method}, predicted memory {simulation_method.predicted_memory_mb:.1f} MB')
+        result = _run_simulator_on_lease(lease, ansatz, hamiltonian, num_assets, init_params, simulation_mode)
+        result['simulation_method'] = simulation_method.to_dict()
+        return result
 
-def run_simulator(ansatz, hamiltonian, num_assets, init_params):
-    from qiskit_aer import AerSimulator
-    from qiskit_ibm_runtime import SamplerV2 as Sampler
-    aer = AerSimulator()
-    pm = generate_preset_pass_manager(backend=aer, optimization_level=1)
-    def bitstring_to_z(bitstr, n):
-        bits = np.array([int(b) for b in format(bitstr, f'0{n}b')])
-        return 1 - 2 * bits
-    def compute_expectation(counts, hamiltonian, n):
-        exp = 0.0
-        shots = sum(counts.values())
-        for bitstr, prob in counts.items():
-            z = bitstring_to_z(bitstr, n)
-            value = 0.0
-            for label, coeff in zip(hamiltonian.paulis.to_labels(), hamiltonian.coeffs):
-                term = coeff.real
-                for idx, op in enumerate(label):
-                    if op == 'Z':
-                        term *= z[idx]
-                value += term
-            exp += (prob / shots) * value
-        return exp
+def _run_simulator_on_lease(lease, ansatz, hamiltonian, num_assets, init_params, simulation_mode):
+    # Transpile the unbound ansatz once (or reuse a cached ISA circuit); evaluations only pass parameter values
+    isa_ansatz = lease.transpile(ansatz, optimization_level=1)
+    sampler = lease.sampler
+    if simulation_mode == "exact" and num_assets > EXACT_MAX_QUBITS:
+        print(f'[LOG] [Simulator] {num_assets} qubits exceed the exact limit, sampling instead')
+        simulation_mode = "sampling"
+    # Exact mode: noiseless statevector expectation per evaluation, shots only for the final sample
+    exact = simulation_mode == "exact"
+    energy_lookup = create_energy_lookup(hamiltonian, num_assets if exact else ENERGY_TABLE_MAX_QUBITS)
+    exact_expectation = StatevectorExpectation(ansatz, hamiltonian, energy_lookup.energies) if exact else None
     sampler_job_count = 0
     def cost_func(params):
         nonlocal sampler_job_count
-        circ = ansatz.assign_parameters(params)
-        isa_circ = pm.run(circ)
-        sampler = Sampler(mode=aer)
+        if exact_expectation is not None:
+            return exact_expectation(params)
         sampler_job_count += 1
         print(f'[LOG] [Simulator] Submitting sampler job #{sampler_job_count}')
-        job = sampler.run([isa_circ], shots=1024)
+        job = sampler.run([sampler_pub(isa_ansatz, params)], shots=1024)
         print(f'[LOG] [Simulator] Sampler job id: {job.job_id()} (Job #{sampler_job_count})')
         result = job.result()
-        counts = result[0].data.meas.get_int_counts()
-        exp = compute_expectation(counts, hamiltonian, num_assets)
-        return exp
-    print('[LOG] [Simulator] Starting minimization with COByLA')
+        return energy_lookup.expectation_from_bit_array(result[0].data.meas)
+    print(f'[LOG] [Simulator] Starting minimization with COByLA ({simulation_mode} expectation values)')
     opt_result = minimize(cost_func, init_params, method="COBYLA", options={"maxiter": 50})
     print('[LOG] [Simulator] Minimization complete, submitting final sampler job')
-    final_circ = ansatz.assign_parameters(opt_result.x)
-    isa_final_circ = pm.run(final_circ)
-    sampler = Sampler(mode=aer)
     sampler_job_count += 1
-    job = sampler.run([isa_final_circ], shots=2048)
+    job = sampler.run([sampler_pub(isa_ansatz, opt_result.x)], shots=2048)
     print(f'[LOG] [Simulator] Final sampler job id: {job.job_id()} (Job #{sampler_job_count})')
     result = job.result()
     counts = result[0].data.meas.get_int_counts()
@@ -110,100 +100,91 @@ def run_simulator(ansatz, hamiltonian, num_assets, init_params):
     return {
         'solution': solution,
         'objective_value': opt_result.fun,
-        'simulator_sampler_jobs_executed': sampler_job_count
+        'optimal_parameters': opt_result.x.tolist(),
+        'cost_evaluations': int(opt_result.nfev),
+        'simulator_sampler_jobs_executed': sampler_job_count,
+        'simulation_mode': simulation_mode
     }
 
-def run_real_backend(ansatz, hamiltonian, num_assets, init_params):
-    from qiskit_ibm_runtime import QiskitRuntimeService, EstimatorV2 as Estimator, SamplerV2 as Sampler
-    import os
+async def run_real_backend(ansatz, hamiltonian, num_assets, init_params, adapter=None, execution_mode="session",
+                           optimizer=None, max_evaluations=60):
+    """
+    VQE on an IBM Runtime backend, COBYLA unless another optimizer is named
+
+    Every estimator and sampler job is awaited through the job monitor, so a
+    run waiting in the device queue holds no thread.
+
+    Args:
+        adapter: ExecutionAdapter providing backend and primitive options;
+            the least busy IBM device if omitted (LocalExecutionAdapter for tests)
+        execution_mode: "session" keeps the iterative loop on the device between
+            optimizer steps, "batch" or "job" submit without a session
+        optimizer: Registered ask/tell optimizer (e.g. "bayesian"); each batch it
+            asks for is one estimator job. None runs COBYLA (tol=1e-2) point by point
+        max_evaluations: Evaluation budget of the named optimizer
+    """
+    if optimizer is not None and optimizer not in OPTIMIZERS:
+        raise ValueError(f"optimizer must be one of {tuple(OPTIMIZERS)}, got '{optimizer}'")
     print('[LOG] [RealBackend] Step 1: Initializing QiskitRuntimeService')
     # COBYLA maxiter default is 1000, but we use tol=1e-2, so actual may be less
     # We can estimate from init_params size, but let's log the minimizer options
-    print(f'[LOG] [RealBackend] Minimizer options: method=COBYLA, tol=1e-2, init_params={len(init_params)}')
-    service = QiskitRuntimeService()
-    print('[LOG] [RealBackend] Step 2: Selecting least busy backend')
-    backend = service.least_busy()
+    if optimizer is None:
+        print(f'[LOG] [RealBackend] Minimizer options: method=COBYLA, tol=1e-2, init_params={len(init_params)}')
+    else:
+        print(f'[LOG] [RealBackend] Minimizer options: optimizer={optimizer}, max_evaluations={max_evaluations}, '
+              f'init_params={len(init_params)}')
+    if adapter is None:
+        print('[LOG] [RealBackend] Step 2: Selecting least busy backend')
+        adapter = IBMRuntimeAdapter.least_busy()
+    backend = adapter.backend
     print(f'[LOG] [RealBackend] Step 3: Selected backend: {backend}')
-    print('[LOG] [RealBackend] Step 4: Generating preset pass manager')
-    pm = generate_preset_pass_manager(optimization_level=3, backend=backend)
-    print('[LOG] [RealBackend] Step 5: Running pass manager on ansatz')
-    candidate_circuit = pm.run(ansatz)
+    print('[LOG] [RealBackend] Step 4: Looking up cached optimization_level=3 transpilation')
+    transpile_cache = get_transpile_cache()
+    print('[LOG] [RealBackend] Step 5: Transpiling ansatz (cache miss only)')
+    candidate_circuit = await asyncio.to_thread(transpile_cache.transpile, ansatz, backend, optimization_level=3)
+    print(f'[LOG] [RealBackend] Transpile cache: {transpile_cache.info()}')
+    # Layout is fixed by the single transpilation, so the observable is mapped once
+    isa_hamiltonian = laid_out_observable(hamiltonian, candidate_circuit)
     objective_func_vals = []
-    estimator_job_count = 0
-    sampler_job_count = 0
-    def cost_func_estimator(params, ansatz, hamiltonian, estimator):
-        nonlocal estimator_job_count
-        print('[LOG] [RealBackend] Step 6: Running cost_func_estimator')
-        isa_hamiltonian = hamiltonian.apply_layout(ansatz.layout)
-        pub = (ansatz, isa_hamiltonian, params)
-        print('[LOG] [RealBackend] Step 7: Submitting estimator job')
-        job = estimator.run([pub])
-        estimator_job_count += 1
-        print(f'[LOG] [RealBackend] Estimator job id: {job.job_id()} (Job #{estimator_job_count})')
-        import time
-        while not job.done():
-            status = getattr(job, 'status', lambda: None)()
-            print(f'[LOG] [RealBackend] Waiting for estimator job to complete. Status: {status}, Job ID: {job.job_id()}')
-            if status == 'ERROR':
-                print(f'[LOG] [RealBackend] Estimator job ERROR. Job ID: {job.job_id()}')
-                break
-            time.sleep(5)
-        if getattr(job, 'status', lambda: None)() == 'ERROR':
-            print(f'[LOG] [RealBackend] Estimator job ended in ERROR state. Job ID: {job.job_id()}')
-            # Do not raise, just return None to continue execution
-            return None
-        print('[LOG] [RealBackend] Step 9: Estimator job completed, fetching result')
-        results = job.result()[0]
-        cost = results.data.evs
-        print(f'[LOG] [RealBackend] Step 10: Cost function value: {cost}')
-        objective_func_vals.append(cost)
-        return cost
-    print('[LOG] [RealBackend] Step 11: Initializing Estimator in backend mode')
-    estimator = Estimator(mode=backend)
-    estimator.options.default_shots = 1000
-    estimator.options.dynamical_decoupling.enable = True
-    estimator.options.dynamical_decoupling.sequence_type = "XY4"
-    estimator.options.twirling.enable_gates = True
-    estimator.options.twirling.num_randomizations = "auto"
-    print('[LOG] [RealBackend] Step 12: Running minimization')
-    result = minimize(
-        cost_func_estimator,
-        init_params,
-        args=(candidate_circuit, hamiltonian, estimator),
-        method="COBYLA",
-        tol=1e-2,
-    )
-    print('[LOG] [RealBackend] Step 13: Minimization complete, assigning optimized parameters')
-    optimized_circuit = candidate_circuit.assign_parameters(result.x)
-    print('[LOG] [RealBackend] Step 14: Initializing Sampler in backend mode')
-    sampler = Sampler(mode=backend)
-    sampler.options.default_shots = 10000
-    sampler.options.dynamical_decoupling.enable = True
-    sampler.options.dynamical_decoupling.sequence_type = "XY4"
-    sampler.options.twirling.enable_gates = True
-    sampler.options.twirling.num_randomizations = "auto"
-    pub = (optimized_circuit,)
-    print('[LOG] [RealBackend] Step 15: Submitting sampler job')
-    job = sampler.run([pub], shots=int(1e4))
-    sampler_job_count += 1
-    print(f'[LOG] [RealBackend] Sampler job id: {job.job_id()} (Job #{sampler_job_count})')
-    import time
-    while not job.done():
-        status = getattr(job, 'status', lambda: None)()
-        print(f'[LOG] [RealBackend] Waiting for sampler job to complete. Status: {status}, Job ID: {job.job_id()}')
-        if status == 'ERROR':
-            print(f'[LOG] [RealBackend] Sampler job ERROR. Job ID: {job.job_id()}')
-            break
-        time.sleep(5)
-    if getattr(job, 'status', lambda: None)() == 'ERROR':
-        print(f'[LOG] [RealBackend] Sampler job ended in ERROR state. Job ID: {job.job_id()}')
+    failed_batches = []
+    async def batch_cost_estimator(points, execution):
+        # One estimator job scores the whole batch; a failed job yields NaN costs and stops the loop
+        result = await execution.estimate_async([(candidate_circuit, isa_hamiltonian, points)])
+        if result is None:
+            failed_batches.append(len(points))
+            return np.full(len(points), np.nan)
+        costs = np.asarray(result[0].data.evs, dtype=float).reshape(len(points))
+        objective_func_vals.extend(costs.tolist())
+        print(f'[LOG] [RealBackend] Estimator batch of {len(points)}: best cost {costs.min():.6f}')
+        return costs
+    # Estimator and sampler options are configured once; every job of the run shares the execution mode
+    print(f'[LOG] [RealBackend] Step 11: Opening {execution_mode} with configured Estimator and Sampler')
+    with adapter.open(execution_mode) as execution:
+        print('[LOG] [RealBackend] Step 12: Running minimization')
+        if optimizer is None:
+            # scipy's COBYLA defaults: up to 1000 evaluations, stopping at tol=1e-2
+            ask_tell = create_optimizer("cobyla", init_params, 1000, tol=1e-2)
+        else:
+            ask_tell = create_optimizer(optimizer, init_params, max_evaluations,
+                                        bounds=[(0, 2 * np.pi)] * len(init_params), seed=42)
+        result = await run_ask_tell_async(ask_tell, lambda points: batch_cost_estimator(points, execution),
+                                          callback=lambda: bool(failed_batches))
+        print('[LOG] [RealBackend] Step 13: Minimization complete, sampling optimized parameters')
+        print('[LOG] [RealBackend] Step 15: Submitting sampler job')
+        sampler_result = None
+        if np.isfinite(result.fun):
+            sampler_result = await execution.sample_async([sampler_pub(candidate_circuit, result.x)],
+                                                          shots=adapter.options.sampler_shots)
+    estimator_job_count = execution.estimator_jobs
+    sampler_job_count = execution.sampler_jobs
+    if sampler_result is None:
         # Do not raise, just return None to continue execution
         return {
             'solution': None,
             'objective_value': None
         }
     print('[LOG] [RealBackend] Step 17: Sampler job completed, fetching result')
-    counts_int = job.result()[0].data.meas.get_int_counts()
+    counts_int = sampler_result[0].data.meas.get_int_counts()
     shots = sum(counts_int.values())
     final_distribution_int = {key: val / shots for key, val in counts_int.items()}
     most_likely = max(final_distribution_int, key=final_distribution_int.get)
@@ -214,29 +195,84 @@ def run_real_backend(ansatz, hamiltonian, num_assets, init_params):
     return {
         'solution': solution,
         'objective_value': result.fun,
+        'optimal_parameters': result.x.tolist(),
+        'cost_evaluations': int(result.nfev),
         'estimator_jobs_executed': estimator_job_count,
-        'sampler_jobs_executed': sampler_job_count
+        'sampler_jobs_executed': sampler_job_count,
+        'execution_mode': execution.mode,
+        'backend_name': adapter.backend_name
     }
 
-def quantum_optimize(prices, risk_aversion=0.5):
+async def quantum_optimize(prices, risk_aversion=0.5, simulation_mode="sampling", warm_start=True,
+                           layerwise=False, max_reps=5, layer_tolerance=1e-3, layer_strategy="interp",
+                           optimizer=None, max_evaluations=60):
+    """
+    QAOA portfolio selection on the simulator or an IBM Quantum backend
+
+    A coroutine: simulator runs execute in a worker thread, IBM Quantum runs
+    await their runtime jobs on the event loop.
+
+    Args:
+        warm_start: Start from the optimum of the most similar recorded problem
+        layerwise: Grow the QAOA depth from p=1, starting each layer from the
+            interpolated previous solution, instead of a fixed reps=2
+        max_reps: Deepest layer in layerwise mode
+        layer_tolerance: Stop growing once a layer improves the energy by less
+            than this fraction of its magnitude
+        layer_strategy: "interp" or "fourier" extension of the angles
+        optimizer: Ask/tell optimizer for IBM Quantum backends (e.g. "bayesian");
+            COBYLA if None
+        max_evaluations: Evaluation budget of that optimizer
+    """
     print("[LOG] Starting quantum optimization", file=sys.stderr)
+    if simulation_mode not in SIMULATION_MODES:
+        raise ValueError(f"simulation_mode must be one of {SIMULATION_MODES}, got '{simulation_mode}'")
+    if layerwise and layer_strategy not in LAYER_STRATEGIES:
+        raise ValueError(f"layer_strategy must be one of {LAYER_STRATEGIES}, got '{layer_strategy}'")
     linear, quadratic, num_assets = build_qubo(prices, risk_aversion)
     print(f"[LOG] Quantum: Number of assets = {num_assets}", file=sys.stderr)
     print("[LOG] Quantum: Built QUBO coefficients", file=sys.stderr)
     hamiltonian = build_hamiltonian(linear, quadratic, num_assets)
     print("[LOG] Quantum: Built cost Hamiltonian", file=sys.stderr)
-    reps = 2
+    reps = 1 if layerwise else 2
     ansatz = QAOAAnsatz(cost_operator=hamiltonian, reps=reps)
     ansatz.measure_all()
     print("[LOG] Quantum: Built QAOA ansatz circuit", file=sys.stderr)
-    rng = np.random.default_rng(42)
-    init_params = rng.uniform(0, 2 * np.pi, ansatz.num_parameters)
-    if qc_simulator_mode:
-        print("[LOG] Using AerSimulator backend", file=sys.stderr)
-        return run_simulator(ansatz, hamiltonian, num_assets, init_params)
+    # Start COBYLA from the optimum of the most similar recorded problem, if any
+    warm_start_store = get_warm_start_store() if warm_start else None
+    warm_starts = warm_start_store.lookup(ansatz, hamiltonian) if warm_start_store else []
+    if warm_starts:
+        init_params = warm_starts[0].parameters
+        print(f"[LOG] Quantum: Warm start from a recorded problem at distance {warm_starts[0].distance:.4f}", file=sys.stderr)
+    else:
+        rng = np.random.default_rng(42)
+        init_params = rng.uniform(0, 2 * np.pi, ansatz.num_parameters)
+
+    async def run_layer(layer_ansatz, layer_init_params):
+        if qc_simulator_mode:
+            print("[LOG] Using AerSimulator backend", file=sys.stderr)
+            # CPU-bound local simulation stays off the event loop
+            result = await asyncio.to_thread(run_simulator, layer_ansatz, hamiltonian, num_assets, layer_init_params,
+                                             simulation_mode=simulation_mode)
+        else:
+            print("[LOG] Using IBM Quantum backend", file=sys.stderr)
+            result = await run_real_backend(layer_ansatz, hamiltonian, num_assets, layer_init_params,
+                                            optimizer=optimizer, max_evaluations=max_evaluations)
+        if isinstance(result, dict) and warm_start_store and result.get('optimal_parameters') is not None:
+            warm_start_store.record(layer_ansatz, hamiltonian, result['optimal_parameters'], result.get('objective_value'))
+        return result
+
+    if layerwise:
+        print(f"[LOG] Quantum: Layerwise QAOA up to p={max_reps} ({layer_strategy})", file=sys.stderr)
+        # Without a warm start, depth 1 starts from small angles, which interpolate well
+        result = await run_layerwise_qaoa_async(hamiltonian, run_layer, init_params if warm_starts else None,
+                                                max_reps=max_reps, tolerance=layer_tolerance,
+                                                strategy=layer_strategy)
     else:
-        print("[LOG] Using IBM Quantum backend", file=sys.stderr)
-        return run_real_backend(ansatz, hamiltonian, num_assets, init_params)
+        result = await run_layer(ansatz, init_params)
+    if isinstance(result, dict):
+        result['warm_start_distance'] = warm_starts[0].distance if warm_starts else None
+    return result
 
 import os
 
@@ -273,7 +309,7 @@ if __name__ == '__main__':
         print("[LOG] Running classical optimizer...", file=sys.stderr)
         weights, perf = classical_optimize(prices)
         print("[LOG] Running quantum optimizer...", file=sys.stderr)
-        quantum_result = quantum_optimize(prices)
+        quantum_result = asyncio.run(quantum_optimize(prices))
         print("[LOG] Both optimizations complete.", file=sys.stderr)
         result = {
             'classical_weights': weights,
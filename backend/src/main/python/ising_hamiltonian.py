@@ -0,0 +1,139 @@
+"""
+Sparse Ising Hamiltonian Construction
+
+Both engines map QUBO coefficients onto the diagonal Hamiltonian
+
+    H = Σ h_i Z_i + Σ_{i<j} Q_ij Z_i Z_j
+
+where variable i is character i of a measured bitstring, i.e. qiskit qubit
+num_qubits - 1 - i. Building one 'IIZ…I' label per term costs O(n) Python
+characters per term and O(n³) for a dense QUBO; here the non-zero terms are
+extracted as index/coefficient arrays and written straight into the
+symplectic Z table of a PauliList, with no per-term Python work.
+
+Pruning is relative: terms with |coefficient| <= relative_tolerance × the
+largest coefficient magnitude are dropped, so the threshold follows the
+scale of the problem rather than a fixed absolute cut-off.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+import numpy as np
+from qiskit.quantum_info import PauliList, SparsePauliOp
+
+from sparse_qubo import BlockSparseQubo
+
+
+@dataclass
+class IsingTerms:
+    """Non-zero terms of an Ising Hamiltonian in variable (bitstring) order"""
+    num_qubits: int
+    linear_indices: np.ndarray    # (num_linear,) variable of each Z_i term
+    linear_coeffs: np.ndarray     # (num_linear,)
+    coupling_rows: np.ndarray     # (num_couplings,) i of each Z_i Z_j term, i < j
+    coupling_cols: np.ndarray     # (num_couplings,) j of each Z_i Z_j term
+    coupling_coeffs: np.ndarray   # (num_couplings,)
+
+    @property
+    def num_terms(self) -> int:
+        return len(self.linear_coeffs) + len(self.coupling_coeffs)
+
+
+def upper_triangle_terms(quadratic: Union[np.ndarray, BlockSparseQubo],
+                         tolerance: float = 0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(i, j, Q_ij) for i < j and |Q_ij| > tolerance, in row-major order"""
+    if isinstance(quadratic, BlockSparseQubo):
+        return quadratic.upper_triangle_terms(tolerance)
+
+    quadratic = np.asarray(quadratic, dtype=float)
+    rows, cols = np.nonzero(np.abs(np.triu(quadratic, k=1)) > tolerance)
+    return rows, cols, quadratic[rows, cols]
+
+
+def _max_abs_coefficient(linear: np.ndarray, quadratic: Union[np.ndarray, BlockSparseQubo]) -> float:
+    couplings = quadratic.blocks if isinstance(quadratic, BlockSparseQubo) else np.asarray(quadratic)
+    scale = np.max(np.abs(linear)) if len(linear) else 0.0
+    if couplings.size:
+        scale = max(scale, np.max(np.abs(couplings)))
+    return float(scale)
+
+
+def extract_ising_terms(linear: np.ndarray, quadratic: Union[np.ndarray, BlockSparseQubo],
+                        num_qubits: int, relative_tolerance: Optional[float] = None) -> IsingTerms:
+    """
+    Vectorized extraction of the Hamiltonian terms of a QUBO
+
+    Args:
+        linear: Linear coefficients h_i
+        quadratic: Dense coupling matrix or BlockSparseQubo (upper triangle is used)
+        num_qubits: Number of variables
+        relative_tolerance: Drop terms with |coeff| <= relative_tolerance × max |coeff|;
+            None keeps every stored term, including exact zeros
+
+    Returns:
+        IsingTerms with linear terms in index order and couplings in row-major order
+    """
+    linear = np.asarray(linear, dtype=float)[:num_qubits]
+
+    if relative_tolerance is None:
+        linear_indices = np.arange(num_qubits)
+        if isinstance(quadratic, BlockSparseQubo):
+            rows, cols, values = quadratic.upper_triangle_terms(-1.0)
+        else:
+            rows, cols = np.triu_indices(num_qubits, k=1)
+            values = np.asarray(quadratic, dtype=float)[rows, cols]
+    else:
+        threshold = relative_tolerance * _max_abs_coefficient(linear, quadratic)
+        linear_indices = np.flatnonzero(np.abs(linear) > threshold)
+        rows, cols, values = upper_triangle_terms(quadratic, threshold)
+
+    return IsingTerms(
+        num_qubits=num_qubits,
+        linear_indices=linear_indices,
+        linear_coeffs=linear[linear_indices],
+        coupling_rows=rows,
+        coupling_cols=cols,
+        coupling_coeffs=values
+    )
+
+
+def ising_terms_to_operator(terms: IsingTerms) -> SparsePauliOp:
+    """
+    SparsePauliOp of the extracted terms (linear terms first, then couplings)
+
+    An empty term set gives the zero-coefficient identity.
+    """
+    n = terms.num_qubits
+    num_linear = len(terms.linear_coeffs)
+    if terms.num_terms == 0:
+        return SparsePauliOp.from_list([('I' * n, 0.0)])
+
+    z = np.zeros((terms.num_terms, n), dtype=bool)
+    linear_rows = np.arange(num_linear)
+    coupling_rows = np.arange(num_linear, terms.num_terms)
+    # Variable i is bitstring character i, i.e. qiskit qubit n - 1 - i
+    z[linear_rows, n - 1 - terms.linear_indices] = True
+    z[coupling_rows, n - 1 - terms.coupling_rows] = True
+    z[coupling_rows, n - 1 - terms.coupling_cols] = True
+
+    paulis = PauliList.from_symplectic(z, np.zeros_like(z))
+    coeffs = np.concatenate([terms.linear_coeffs, terms.coupling_coeffs]).astype(complex)
+    return SparsePauliOp(paulis, coeffs, ignore_pauli_phase=True, copy=False)
+
+
+def build_ising_hamiltonian(linear: np.ndarray, quadratic: Union[np.ndarray, BlockSparseQubo],
+                            num_qubits: int, relative_tolerance: Optional[float] = None) -> SparsePauliOp:
+    """
+    QUBO coefficients to SparsePauliOp without intermediate label strings
+
+    Args:
+        linear: Linear coefficients h_i
+        quadratic: Dense coupling matrix or BlockSparseQubo
+        num_qubits: Number of qubits
+        relative_tolerance: Relative pruning threshold (None keeps every term)
+
+    Returns:
+        Hamiltonian as SparsePauliOp
+    """
+    return ising_terms_to_operator(extract_ising_terms(linear, quadratic, num_qubits, relative_tolerance))
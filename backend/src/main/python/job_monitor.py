@@ -0,0 +1,228 @@
+"""
+Asynchronous Runtime Job Monitor
+
+Waiting on a hardware job with `while not job.done(): time.sleep(5)` holds a
+thread and issues a status request every five seconds for the whole queue
+time, per job. JobMonitor replaces those loops with one asyncio event loop
+(on a daemon thread) that tracks every outstanding job:
+
+- each job is polled when due, starting immediately and backing off
+  geometrically from min_interval to max_interval while it stays pending,
+- the loop sleeps until the earliest due poll or until a new job arrives,
+- every poll is its own task, and status and result calls run in the
+  default executor, so a slow or hung API call never stalls the other jobs
+  (a job is not polled again while its previous poll is in flight),
+- finished jobs resolve their future with job.result(); jobs ending in
+  ERROR or CANCELLED raise JobFailedError.
+
+Synchronous callers block on the concurrent.futures.Future from submit();
+coroutines await wait(). Jobs only need done(), status(), result() and
+job_id(), so the monitor runs offline against mock jobs.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+FAILED_STATUSES = ("ERROR", "CANCELLED")
+
+
+class JobFailedError(RuntimeError):
+    """A monitored job finished in a failed state"""
+
+    def __init__(self, job_id: str, status: str):
+        super().__init__(f"Job {job_id} ended in {status} state")
+        self.job_id = job_id
+        self.status = status
+
+
+def job_status_name(job) -> str:
+    """Job status as an upper-case name; runtime jobs report strings, local jobs JobStatus"""
+    status = getattr(job, 'status', lambda: None)()
+    return str(getattr(status, 'name', status)).upper()
+
+
+def _job_id(job) -> str:
+    return job.job_id() if callable(getattr(job, 'job_id', None)) else str(id(job))
+
+
+@dataclass
+class _TrackedJob:
+    job: Any
+    future: asyncio.Future
+    interval: float
+    next_poll: float
+    polls: int = 0
+    job_id: str = field(default="")
+    in_flight: bool = False
+
+
+class JobMonitor:
+    """Single event loop that polls all outstanding jobs with adaptive back-off"""
+
+    def __init__(self, min_interval: float = 1.0, max_interval: float = 30.0, backoff: float = 1.5):
+        """
+        Args:
+            min_interval: Seconds before the second poll of a job
+            max_interval: Upper bound on the seconds between polls of one job
+            backoff: Factor applied to a job's poll interval while it stays pending
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self._jobs: Dict[int, _TrackedJob] = {}
+        self._poll_tasks: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.polls = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                ready = threading.Event()
+                self._thread = threading.Thread(target=self._run_loop, args=(ready,),
+                                                name="job-monitor", daemon=True)
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    def _run_loop(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._wake = asyncio.Event()
+        ready.set()
+        loop.run_until_complete(self._poll_forever())
+
+    def submit(self, job) -> concurrent.futures.Future:
+        """
+        Track a submitted job
+
+        Returns:
+            Future resolving to job.result(), or raising JobFailedError
+        """
+        loop = self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(self._track(job), loop)
+
+    async def wait(self, job):
+        """Await a job's result from any event loop"""
+        return await asyncio.wrap_future(self.submit(job))
+
+    def result(self, job, timeout: Optional[float] = None):
+        """Block until a job finishes and return its result"""
+        return self.submit(job).result(timeout)
+
+    @property
+    def outstanding(self) -> int:
+        return len(self._jobs)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'outstanding': self.outstanding,
+            'polls': self.polls,
+            'completed': self.completed,
+            'failed': self.failed
+        }
+
+    def shutdown(self) -> None:
+        """Stop the monitor thread; outstanding futures are cancelled"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+
+        def stop():
+            for tracked in self._jobs.values():
+                tracked.future.cancel()
+            self._jobs.clear()
+            for task in asyncio.all_tasks(loop):
+                task.cancel()
+
+        loop.call_soon_threadsafe(stop)
+        thread.join()
+        loop.close()
+
+    async def _track(self, job):
+        loop = asyncio.get_running_loop()
+        tracked = _TrackedJob(job, loop.create_future(), self.min_interval, loop.time(), job_id=_job_id(job))
+        self._jobs[id(tracked)] = tracked
+        self._wake.set()
+        return await tracked.future
+
+    async def _poll_forever(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                now = loop.time()
+                idle = [tracked for tracked in self._jobs.values() if not tracked.in_flight]
+                for tracked in idle:
+                    if tracked.next_poll <= now:
+                        tracked.in_flight = True
+                        task = loop.create_task(self._poll(tracked))
+                        self._poll_tasks.add(task)
+                        task.add_done_callback(self._poll_tasks.discard)
+                # Finished polls set the event, so jobs in flight are rescheduled when their poll returns
+                self._wake.clear()
+                timeout = min((t.next_poll for t in idle if not t.in_flight), default=None)
+                try:
+                    await asyncio.wait_for(self._wake.wait(),
+                                           None if timeout is None else max(0.0, timeout - now))
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            pass
+
+    async def _poll(self, tracked: _TrackedJob) -> None:
+        try:
+            await self._poll_once(tracked)
+        finally:
+            tracked.in_flight = False
+            self._wake.set()
+
+    async def _poll_once(self, tracked: _TrackedJob) -> None:
+        loop = asyncio.get_running_loop()
+        tracked.polls += 1
+        self.polls += 1
+        try:
+            done, status = await asyncio.to_thread(lambda: (tracked.job.done(), job_status_name(tracked.job)))
+            if status in FAILED_STATUSES:
+                raise JobFailedError(tracked.job_id, status)
+            if not done:
+                logger.debug(f"Job {tracked.job_id} pending ({status}), next poll in {tracked.interval:.1f}s")
+                tracked.next_poll = loop.time() + tracked.interval
+                tracked.interval = min(self.max_interval, tracked.interval * self.backoff)
+                return
+            result = await asyncio.to_thread(tracked.job.result)
+        except Exception as e:
+            self._finish(tracked)
+            self.failed += 1
+            logger.warning(f"Job {tracked.job_id} failed after {tracked.polls} polls: {e}")
+            if not tracked.future.done():
+                tracked.future.set_exception(e)
+            return
+        self._finish(tracked)
+        self.completed += 1
+        logger.info(f"Job {tracked.job_id} finished after {tracked.polls} polls")
+        if not tracked.future.done():
+            tracked.future.set_result(result)
+
+    def _finish(self, tracked: _TrackedJob) -> None:
+        self._jobs.pop(id(tracked), None)
+
+
+_job_monitor = JobMonitor()
+
+
+def get_job_monitor() -> JobMonitor:
+    """Process-wide job monitor shared by all runtime executions"""
+    return _job_monitor
@@ -0,0 +1,302 @@
+"""
+Process-Parallel DE-VQE Cost Evaluation
+
+differential_evolution can only spread candidates across processes when its
+cost function pickles. VQECostFunction is a top-level callable that carries
+everything a worker needs in serializable form:
+- the transpiled ansatz as QPY bytes,
+- the Hamiltonian as its symplectic Pauli arrays and coefficients,
+- the local simulator as its Aer options.
+Executable objects (simulator, sampler, energy lookup, statevector
+expectation) are rebuilt lazily in whichever process evaluates.
+
+ParallelPopulationEvaluator owns a spawn-context process pool whose workers
+unpickle the cost once at start-up; afterwards only parameter arrays cross
+the process boundary. A generation is split into one chunk per worker, and
+each chunk is still scored as a single batched sampler job.
+
+With an AdaptiveShotScheduler, sampled populations are scored by a
+successive-halving race (see shot_scheduler) instead of a fixed shot count;
+the race runs in the optimizing process and only its sampling rounds are
+spread over the workers.
+"""
+
+import io
+import multiprocessing
+import os
+import time
+from typing import List, Optional
+
+import numpy as np
+from qiskit import QuantumCircuit, qpy
+from qiskit.quantum_info import PauliList, SparsePauliOp
+from qiskit_aer import AerSimulator
+
+from exact_expectation import StatevectorExpectation
+from qubo_energy import DEFAULT_ENERGY_CACHE_SIZE, ENERGY_TABLE_MAX_QUBITS, create_energy_lookup
+from shot_scheduler import AdaptiveShotScheduler
+from transpilation import sampler_pub
+
+# Cost assigned to candidates that are rejected (budget exhausted or failed job)
+PENALTY_COST = 1e6
+
+
+class VQECostFunction:
+    """Picklable expectation-value cost of a transpiled ansatz"""
+
+    def __init__(self, isa_ansatz: QuantumCircuit, hamiltonian: SparsePauliOp, backend,
+                 shots: int, use_exact: bool = False, exact_max_qubits: int = 25,
+                 energy_table_max_qubits: int = ENERGY_TABLE_MAX_QUBITS,
+                 energy_table_dir: Optional[str] = None,
+                 energy_cache_size: int = DEFAULT_ENERGY_CACHE_SIZE,
+                 deadline: Optional[float] = None, max_evaluations: Optional[int] = None,
+                 shot_scheduler: Optional[AdaptiveShotScheduler] = None):
+        """
+        Args:
+            isa_ansatz: Ansatz transpiled for the backend, parameters unbound
+            hamiltonian: Diagonal problem Hamiltonian
+            backend: Execution backend; only AerSimulator backends can be pickled
+            shots: Shots per parameter set
+            use_exact: Score with statevector probabilities instead of samples
+            exact_max_qubits: Size limit for the statevector path
+            energy_table_max_qubits: Largest problem that gets a full energy table
+            energy_table_dir: Directory for memory-mapped energy tables
+            energy_cache_size: Outcome cache size when no table is built
+            deadline: time.time() after which every candidate is rejected
+            max_evaluations: Candidate evaluations after which every candidate is rejected
+            shot_scheduler: Adaptive per-population shot allocation; shots is then only
+                used for single-point evaluations
+        """
+        buffer = io.BytesIO()
+        qpy.dump(isa_ansatz, buffer)
+        self.ansatz_qpy = buffer.getvalue()
+        self.num_parameters = isa_ansatz.num_parameters
+        self.pauli_z = np.asarray(hamiltonian.paulis.z)
+        self.pauli_x = np.asarray(hamiltonian.paulis.x)
+        self.coeffs = np.asarray(hamiltonian.coeffs)
+        self.backend_options = dict(backend.options.items()) if isinstance(backend, AerSimulator) else None
+
+        self.shots = shots
+        self.use_exact = use_exact
+        self.exact_max_qubits = exact_max_qubits
+        self.energy_table_max_qubits = energy_table_max_qubits
+        self.energy_table_dir = energy_table_dir
+        self.energy_cache_size = energy_cache_size
+        self.deadline = deadline
+        self.max_evaluations = max_evaluations
+        self.shot_scheduler = shot_scheduler if not use_exact else None
+
+        self.evaluation_count = 0
+        self.job_count = 0
+        self.shot_count = 0
+
+        # Live objects of the constructing process, never pickled
+        self._circuit = isa_ansatz
+        self._backend = backend
+        self._hamiltonian = hamiltonian
+        self._resources = None
+
+    @property
+    def picklable(self) -> bool:
+        return self.backend_options is not None
+
+    def __getstate__(self) -> dict:
+        if not self.picklable:
+            raise TypeError("Only local Aer simulator backends can be shipped to worker processes")
+        state = self.__dict__.copy()
+        state.update(_circuit=None, _backend=None, _hamiltonian=None, _resources=None)
+        return state
+
+    def _build_resources(self):
+        """Sampler, energy lookup and (exact mode) statevector expectation for this process"""
+        circuit = self._circuit
+        if circuit is None:
+            circuit = qpy.load(io.BytesIO(self.ansatz_qpy))[0]
+        backend = self._backend if self._backend is not None else AerSimulator(**self.backend_options)
+        hamiltonian = self._hamiltonian
+        if hamiltonian is None:
+            hamiltonian = SparsePauliOp(PauliList.from_symplectic(self.pauli_z, self.pauli_x), self.coeffs)
+
+        from qiskit_ibm_runtime import SamplerV2 as Sampler
+        sampler = Sampler(mode=backend)
+        table_max_qubits = hamiltonian.num_qubits if self.use_exact else self.energy_table_max_qubits
+        energy_lookup = create_energy_lookup(hamiltonian, table_max_qubits,
+                                             self.energy_table_dir, self.energy_cache_size)
+        exact = StatevectorExpectation(circuit, hamiltonian, energy_lookup.energies,
+                                       self.exact_max_qubits) if self.use_exact else None
+        return circuit, sampler, energy_lookup, exact
+
+    @property
+    def resources(self):
+        if self._resources is None:
+            self._resources = self._build_resources()
+        return self._resources
+
+    def reserve(self, num_candidates: int) -> int:
+        """
+        Count candidate evaluations against the time and evaluation budget
+
+        Returns:
+            How many of the candidates (taken in order) may still be evaluated:
+            none after the deadline, at most the remaining evaluation budget
+        """
+        previous = self.evaluation_count
+        self.evaluation_count += num_candidates
+        if self.deadline is not None and time.time() > self.deadline:
+            print("[LOG] Stopping optimization: timeout reached")
+            return 0
+        if self.max_evaluations is not None and self.evaluation_count > self.max_evaluations:
+            print(f"[LOG] Stopping optimization: reached max evaluations limit ({self.max_evaluations})")
+            return max(0, min(num_candidates, self.max_evaluations - previous))
+        return num_candidates
+
+    def sample(self, population: np.ndarray, shots: int):
+        """
+        Sample a (S, num_params) population as one PUB with the given shots
+
+        Returns:
+            (means, variances) of the per-shot energies of each candidate
+        """
+        circuit, sampler, energy_lookup, _ = self.resources
+        job = sampler.run([sampler_pub(circuit, population)], shots=shots)
+        self.job_count += 1
+        self.shot_count += shots * len(population)
+        return energy_lookup.expectations_from_bit_array(job.result()[0].data.meas, with_variance=True)
+
+    def evaluate(self, population: np.ndarray) -> np.ndarray:
+        """
+        Expectation values of a (S, num_params) population, without budget checks
+
+        Sampling mode submits the whole population as one PUB with the fixed shot count.
+        """
+        exact = self.resources[3]
+        if exact is not None:
+            self.job_count += len(population)
+            return np.array([exact(candidate) for candidate in population])
+        return self.sample(population, self.shots)[0]
+
+    def __call__(self, params):
+        """
+        Args:
+            params: Shape (num_params,), or (num_params, S) for a vectorized population
+
+        Returns:
+            Scalar cost, or an array of S costs for a population
+        """
+        params = np.asarray(params, dtype=float)
+        population = params.T.reshape(-1, self.num_parameters)
+        costs = np.full(len(population), PENALTY_COST)
+        allowed = self.reserve(len(population))
+        if allowed:
+            try:
+                if self.shot_scheduler is not None and params.ndim > 1:
+                    costs[:allowed] = self.shot_scheduler.race(population[:allowed], self.sample)
+                else:
+                    costs[:allowed] = self.evaluate(population[:allowed])
+                if len(population) > 1:
+                    print(f"[LOG] DE-VQE batch of {allowed} candidates: best expectation = {costs.min():.4f}")
+            except Exception as e:
+                print(f"[LOG] Cost function error: {e}")
+        return costs if params.ndim > 1 else float(costs[0])
+
+
+# Cost function of this worker process, installed by the pool initializer
+_WORKER_COST: Optional[VQECostFunction] = None
+
+
+def _init_worker(cost: VQECostFunction) -> None:
+    global _WORKER_COST
+    _WORKER_COST = cost
+    cost.resources  # build simulator and energy lookup before the first task
+
+
+def _evaluate_in_worker(population: np.ndarray) -> np.ndarray:
+    try:
+        return _WORKER_COST.evaluate(population)
+    except Exception as e:
+        print(f"[LOG] Worker cost function error: {e}")
+        return np.full(len(population), PENALTY_COST)
+
+
+def _sample_in_worker(task):
+    population, shots = task
+    try:
+        return _WORKER_COST.sample(population, shots)
+    except Exception as e:
+        print(f"[LOG] Worker cost function error: {e}")
+        return np.full(len(population), PENALTY_COST), np.zeros(len(population))
+
+
+class ParallelPopulationEvaluator:
+    """
+    Vectorized DE cost that scores each population across a process pool
+
+    Use as a context manager so the pool is shut down with the optimization.
+    """
+
+    def __init__(self, cost: VQECostFunction, workers: int, batch_population: bool = True):
+        """
+        Args:
+            cost: Picklable cost, budget checks stay in this process
+            workers: Number of worker processes
+            batch_population: One batched job per worker chunk; otherwise one job per candidate
+        """
+        if not cost.picklable:
+            raise ValueError("Parallel DE-VQE requires a local Aer simulator backend")
+        # Workers share the simulator's thread budget instead of each claiming it whole
+        threads = cost.backend_options.get("max_parallel_threads") or os.cpu_count() or 1
+        cost.backend_options = {**cost.backend_options, "max_parallel_threads": max(1, threads // workers)}
+        self.cost = cost
+        self.workers = workers
+        self.batch_population = batch_population
+        self._pool = None
+
+    def __enter__(self) -> 'ParallelPopulationEvaluator':
+        # spawn: forking a process that runs Aer or API threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        self._pool = context.Pool(self.workers, initializer=_init_worker, initargs=(self.cost,))
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._pool.terminate()
+        self._pool.join()
+        self._pool = None
+
+    def _chunks(self, population: np.ndarray) -> List[np.ndarray]:
+        if self.batch_population:
+            return [chunk for chunk in np.array_split(population, self.workers) if len(chunk)]
+        return [candidate[None, :] for candidate in population]
+
+    def sample(self, population: np.ndarray, shots: int):
+        """One race round of the shot scheduler, split across the workers"""
+        chunks = self._chunks(population)
+        self.cost.job_count += len(chunks)
+        self.cost.shot_count += shots * len(population)
+        results = self._pool.map(_sample_in_worker, [(chunk, shots) for chunk in chunks])
+        return (np.concatenate([means for means, _ in results]),
+                np.concatenate([variances for _, variances in results]))
+
+    def __call__(self, params):
+        params = np.asarray(params, dtype=float)
+        if params.ndim == 1:
+            # Polishing evaluates single points; no pool round-trip needed
+            return self.cost(params)
+
+        population = params.T
+        costs = np.full(len(population), PENALTY_COST)
+        allowed = self.cost.reserve(len(population))
+        if not allowed:
+            return costs
+        if self.cost.shot_scheduler is not None:
+            costs[:allowed] = self.cost.shot_scheduler.race(population[:allowed], self.sample)
+        else:
+            chunks = self._chunks(population[:allowed])
+            if self.cost.use_exact:
+                self.cost.job_count += allowed
+            else:
+                self.cost.job_count += len(chunks)
+                self.cost.shot_count += self.cost.shots * allowed
+            costs[:allowed] = np.concatenate(self._pool.map(_evaluate_in_worker, chunks))
+        print(f"[LOG] DE-VQE population of {len(population)} over {self.workers} workers: "
+              f"best expectation = {costs.min():.4f}")
+        return costs
@@ -6,7 +6,7 @@ Replaces temporary JSON file communication with REST API endpoints.
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Literal, Optional
 import logging
 import asyncio
 import traceback
@@ -138,6 +138,7 @@ class OptimizeRequest(BaseModel):
     stock_data: List[StockDataPoint] = Field(..., description="Historical stock price data")
     var_percent: float = Field(default=0.05, ge=0, le=1, description="Value at Risk percentage")
     qc_simulator: bool = Field(default=True, description="Use quantum simulator (true) or real backend (false)")
+    simulation_mode: Literal["sampling", "exact"] = Field(default="sampling", description="Simulator cost evaluation: shot sampling or exact statevector expectation")
 
 class ClassicalResult(BaseModel):
     weights: Dict[str, float] = Field(..., description="Portfolio weights by symbol")
@@ -486,7 +487,7 @@ async def optimize_hybrid(request: OptimizeRequest):
         
         # Classical optimization
         logger.info(f"[{request_id}] Running classical optimization...")
-        classical_weights, classical_perf = classical_optimize(prices)
+        classical_weights, classical_perf = await asyncio.to_thread(classical_optimize, prices)
         logger.info(f"[{request_id}] Classical optimization completed")
         logger.info(f"[{request_id}] Classical weights: {classical_weights}")
         
@@ -496,7 +497,8 @@ async def optimize_hybrid(request: OptimizeRequest):
         import hybrid_portfolio_opt
         hybrid_portfolio_opt.qc_simulator_mode = request.qc_simulator
         
-        quantum_result = quantum_optimize(prices)
+        # Hardware job waits are awaited on the event loop; simulator runs use a worker thread
+        quantum_result = await quantum_optimize(prices, simulation_mode=request.simulation_mode)
         logger.info(f"[{request_id}] Quantum optimization completed")
         logger.info(f"[{request_id}] Quantum result: {quantum_result}")
         
@@ -600,23 +602,26 @@ def run_classical_optimization(job_id: str, request: OptimizeRequest):
         logger.error(f"Background classical optimization failed for job {job_id}: {str(e)}")
         update_job_status(job_id, "failed", error=str(e))
 
-def run_hybrid_optimization(job_id: str, request: OptimizeRequest):
+def prepare_hybrid_prices(request: OptimizeRequest):
+    """Price table (dates × symbols) of a hybrid optimization request."""
+    import pandas as pd
+    df = pd.DataFrame(convert_stock_data_to_dict(request.stock_data))
+    return df.pivot(index='date', columns='symbol', values='close').sort_index()
+
+async def run_hybrid_optimization(job_id: str, request: OptimizeRequest):
     """Background task for hybrid optimization."""
     try:
         update_job_status(job_id, "running")
         
-        stock_data_dict = convert_stock_data_to_dict(request.stock_data)
-        
-        import pandas as pd
-        df = pd.DataFrame(stock_data_dict)
-        prices = df.pivot(index='date', columns='symbol', values='close').sort_index()
+        # Data prep and the classical step block, so they run in a worker thread, not on the event loop
+        prices = await asyncio.to_thread(prepare_hybrid_prices, request)
         
         # Set simulator mode
         import hybrid_portfolio_opt
         hybrid_portfolio_opt.qc_simulator_mode = request.qc_simulator
         
-        classical_weights, classical_perf = classical_optimize(prices)
-        quantum_result = quantum_optimize(prices)
+        classical_weights, classical_perf = await asyncio.to_thread(classical_optimize, prices)
+        quantum_result = await quantum_optimize(prices, simulation_mode=request.simulation_mode)
         
         result = {
             'classical_weights': classical_weights,
@@ -0,0 +1,131 @@
+"""
+Shared Portfolio Statistics Cache
+
+Expected returns and Ledoit-Wolf covariance are the inputs of every engine:
+classic_portfolio_opt, the classical and QUBO halves of hybrid_portfolio_opt
+and every period of the dynamic engine. The same price matrix is frequently
+seen several times per request (hybrid computes both statistics for the
+efficient frontier and again for the QUBO), so results are memoized here.
+
+Entries are keyed by a fingerprint of the price matrix (content hash of the
+values, index and column labels) plus the estimator parameters, and evicted
+least-recently-used once the cache is full. Callers always receive copies,
+so mutating a returned Series/DataFrame never corrupts the cache.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple, Union
+
+import pandas as pd
+from pypfopt import expected_returns
+from pypfopt.risk_models import CovarianceShrinkage
+
+DEFAULT_CACHE_SIZE = 128
+TRADING_DAYS_PER_YEAR = 252
+
+Statistic = Union[pd.Series, pd.DataFrame]
+
+
+def price_fingerprint(prices: pd.DataFrame) -> str:
+    """
+    Content hash of a price matrix
+
+    Two DataFrames with equal values, index and column labels share a
+    fingerprint regardless of object identity.
+    """
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(prices, index=True).to_numpy().tobytes())
+    digest.update(str(list(prices.columns)).encode())
+    return digest.hexdigest()
+
+
+class StatisticsCache:
+    """Size-bounded, thread-safe LRU of computed statistics"""
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Statistic]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], Statistic]) -> Statistic:
+        """Return a copy of the cached value for key, computing it on a miss
+
+        Values only need a copy() method, so batched results (e.g. rolling
+        window statistics) can share the cache with Series/DataFrames.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key].copy()
+            self.misses += 1
+
+        # Computed outside the lock; a concurrent miss on the same key only costs duplicate work
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value.copy()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+_statistics_cache = StatisticsCache()
+
+
+def get_statistics_cache() -> StatisticsCache:
+    """Get the process-wide statistics cache"""
+    return _statistics_cache
+
+
+def mean_historical_return(prices: pd.DataFrame, frequency: int = TRADING_DAYS_PER_YEAR,
+                           fingerprint: Optional[str] = None) -> pd.Series:
+    """Cached pypfopt.expected_returns.mean_historical_return"""
+    key = ("mean_historical_return", fingerprint or price_fingerprint(prices), frequency)
+    return _statistics_cache.get_or_compute(
+        key, lambda: expected_returns.mean_historical_return(prices, frequency=frequency))
+
+
+def ledoit_wolf_covariance(prices: pd.DataFrame, frequency: int = TRADING_DAYS_PER_YEAR,
+                           fingerprint: Optional[str] = None) -> pd.DataFrame:
+    """Cached pypfopt CovarianceShrinkage(prices).ledoit_wolf()"""
+    key = ("ledoit_wolf", fingerprint or price_fingerprint(prices), frequency)
+    return _statistics_cache.get_or_compute(
+        key, lambda: CovarianceShrinkage(prices, frequency=frequency).ledoit_wolf())
+
+
+def portfolio_statistics(prices: pd.DataFrame,
+                         frequency: int = TRADING_DAYS_PER_YEAR) -> Tuple[pd.Series, pd.DataFrame]:
+    """
+    Expected returns and Ledoit-Wolf covariance of a price matrix
+
+    Args:
+        prices: Price DataFrame (dates × assets)
+        frequency: Periods per year used for annualization
+
+    Returns:
+        Tuple of (mu, S), both served from the shared cache when possible
+    """
+    fingerprint = price_fingerprint(prices)
+    return (mean_historical_return(prices, frequency, fingerprint),
+            ledoit_wolf_covariance(prices, frequency, fingerprint))
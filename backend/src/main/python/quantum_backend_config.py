@@ -13,12 +13,16 @@ Features:
 - Device capability assessment
 - Queue status monitoring
 - Error handling and fallback strategies
+- Pooled local simulators with explicit thread budgets
+- Aer simulation-method selection from circuit size and structure
 """
 
 import os
 import json
 import logging
-from typing import Dict, List, Optional, Tuple, Any
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Any
 from dataclasses import dataclass, asdict
 from enum import Enum
 from datetime import datetime, timezone
@@ -28,7 +32,8 @@ import warnings
 try:
     from qiskit import QuantumCircuit
     from qiskit_aer import AerSimulator
-    from qiskit_ibm_runtime import QiskitRuntimeService
+    from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+    from transpilation import get_transpile_cache
     QISKIT_AVAILABLE = True
 except ImportError as e:
     logging.warning(f"Qiskit imports failed: {e}")
@@ -104,6 +109,309 @@ class QuantumBackendConfig:
     project: Optional[str] = None
 
 
+@dataclass
+class SimulatorPoolConfig:
+    """Size and thread budget of the pooled local simulators"""
+    pool_size: int = 2  # concurrent leases per simulator backend
+    max_parallel_threads: int = 0  # per instance; 0 splits the CPU cores evenly across the pool
+    max_parallel_experiments: int = 1
+    max_parallel_shots: int = 0  # 0 lets Aer choose
+
+    def thread_budget(self) -> int:
+        """Threads granted to each pooled simulator instance"""
+        if self.max_parallel_threads > 0:
+            return self.max_parallel_threads
+        return max(1, (os.cpu_count() or 1) // max(1, self.pool_size))
+
+    def simulator_options(self) -> Dict[str, int]:
+        """Aer run options applied to every pooled instance"""
+        return {
+            "max_parallel_threads": self.thread_budget(),
+            "max_parallel_experiments": self.max_parallel_experiments,
+            "max_parallel_shots": self.max_parallel_shots
+        }
+
+
+# Gates that keep stabilizer states stabilizer states (no cost for extended_stabilizer)
+CLIFFORD_GATES = frozenset({
+    "id", "x", "y", "z", "h", "s", "sdg", "sx", "sxdg", "cx", "cy", "cz", "swap", "iswap", "ecr", "dcx"
+})
+# Instructions that do not act on the quantum state
+NON_UNITARY_INSTRUCTIONS = frozenset({"measure", "barrier", "reset", "delay"})
+# Gate set circuits are unrolled to before their structure is analyzed
+STRUCTURE_BASIS = sorted(CLIFFORD_GATES | {"rx", "ry", "rz", "p", "u", "t", "tdg"})
+
+BYTES_PER_AMPLITUDE = 16  # complex128
+
+
+@dataclass
+class CircuitStructure:
+    """Size and entanglement summary of a circuit used to pick a simulation method"""
+    num_qubits: int
+    depth: int
+    two_qubit_gates: int
+    long_range_gates: int  # two-qubit gates between non-adjacent qubits
+    non_clifford_gates: int
+    max_cut_crossings: int  # most two-qubit gates crossing any cut between qubit k and k+1
+    cut_crossings: List[int]
+    
+    @classmethod
+    def from_circuit(cls, circuit) -> 'CircuitStructure':
+        """
+        Analyze a logical circuit, unrolled to one- and two-qubit gates
+        
+        No coupling map is applied, so circuits wider than any simulator
+        target can be analyzed before a simulation method is chosen.
+        """
+        if not set(circuit.count_ops()) <= set(STRUCTURE_BASIS) | NON_UNITARY_INSTRUCTIONS:
+            from qiskit import transpile
+            circuit = transpile(circuit, basis_gates=STRUCTURE_BASIS, optimization_level=0)
+        num_qubits = circuit.num_qubits
+        crossings = [0] * max(num_qubits - 1, 0)
+        two_qubit = long_range = non_clifford = 0
+        for instruction in circuit.data:
+            name = instruction.operation.name
+            if name in NON_UNITARY_INSTRUCTIONS or name.startswith("save_"):
+                continue
+            if name not in CLIFFORD_GATES:
+                non_clifford += 1
+            qubits = [circuit.find_bit(qubit).index for qubit in instruction.qubits]
+            if len(qubits) < 2:
+                continue
+            two_qubit += 1
+            low, high = min(qubits), max(qubits)
+            if high - low > 1:
+                long_range += 1
+            for cut in range(low, high):
+                crossings[cut] += 1
+        return cls(num_qubits, circuit.depth(), two_qubit, long_range, non_clifford,
+                   max(crossings, default=0), crossings)
+
+
+@dataclass
+class SimulationMethodChoice:
+    """Aer method picked for a circuit, with its predicted memory footprint"""
+    method: str
+    predicted_memory_mb: float
+    reason: str
+    options: Dict[str, Any]
+    structure: CircuitStructure
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization"""
+        result = asdict(self)
+        result["structure"].pop("cut_crossings")
+        return result
+
+
+def _physical_memory_mb() -> float:
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 2**20
+    except (ValueError, OSError, AttributeError):
+        return 8192.0
+
+
+@dataclass
+class SimulationMethodPolicy:
+    """
+    Choose statevector, extended_stabilizer or matrix_product_state for a circuit
+    
+    - statevector while 16·2^n bytes fit the memory budget,
+    - extended_stabilizer for larger, nearly-Clifford circuits,
+    - matrix_product_state otherwise. Bond dimensions are bounded by the
+      two-qubit gates crossing each cut (χ_k ≤ 2^crossings_k) and by the
+      Schmidt rank 2^min(k, n-k). If the exact MPS would not fit, the
+      bond dimension is capped, which makes the simulation approximate.
+    """
+    max_memory_mb: float = 0.0  # 0 uses half the physical memory divided by the pool size
+    mps_max_bond_dimension: int = 0  # 0 caps only when needed to fit the memory budget
+    mps_truncation_threshold: float = 1e-10
+    extended_stabilizer_max_non_clifford: int = 16
+    
+    def memory_budget_mb(self, pool_size: int = 1) -> float:
+        if self.max_memory_mb > 0:
+            return self.max_memory_mb
+        return _physical_memory_mb() / 2 / max(1, pool_size)
+    
+    @staticmethod
+    def statevector_memory_mb(num_qubits: int) -> float:
+        return BYTES_PER_AMPLITUDE * 2.0 ** num_qubits / 2**20
+    
+    @staticmethod
+    def mps_memory_mb(structure: CircuitStructure, max_bond_dimension: int = 0) -> float:
+        """Sum over sites of 2·χ_left·χ_right amplitudes at the predicted bond dimensions"""
+        n = structure.num_qubits
+        log_bonds = [min(crossings, cut + 1, n - cut - 1) for cut, crossings in enumerate(structure.cut_crossings)]
+        bonds = [2.0 ** log_bond for log_bond in log_bonds]
+        if max_bond_dimension > 0:
+            bonds = [min(bond, max_bond_dimension) for bond in bonds]
+        bonds = [1.0] + bonds + [1.0]
+        amplitudes = sum(2 * bonds[site] * bonds[site + 1] for site in range(n))
+        return BYTES_PER_AMPLITUDE * amplitudes / 2**20
+    
+    def choose(self, circuit, pool_size: int = 1) -> SimulationMethodChoice:
+        """
+        Args:
+            circuit: Circuit to simulate (gates on at most two qubits)
+            pool_size: Concurrent simulator instances sharing the machine
+        """
+        structure = CircuitStructure.from_circuit(circuit)
+        budget = self.memory_budget_mb(pool_size)
+        
+        statevector_mb = self.statevector_memory_mb(structure.num_qubits)
+        if statevector_mb <= budget:
+            return SimulationMethodChoice("statevector", statevector_mb,
+                                          f"statevector needs {statevector_mb:.3g} MB of {budget:.3g} MB",
+                                          {"method": "statevector"}, structure)
+        
+        if structure.non_clifford_gates <= self.extended_stabilizer_max_non_clifford:
+            # Stabilizer-rank decomposition: ~2^(0.23·t) tableaux of n² bits each
+            rank = 2.0 ** (0.23 * structure.non_clifford_gates)
+            stabilizer_mb = rank * structure.num_qubits ** 2 / 8 / 2**20
+            return SimulationMethodChoice("extended_stabilizer", stabilizer_mb,
+                                          f"{structure.non_clifford_gates} non-Clifford gates",
+                                          {"method": "extended_stabilizer"}, structure)
+        
+        bond_cap = self.mps_max_bond_dimension
+        mps_mb = self.mps_memory_mb(structure, bond_cap)
+        reason = (f"statevector needs {statevector_mb:.3g} MB; max {structure.max_cut_crossings} "
+                  f"two-qubit gates cross a cut")
+        if mps_mb > budget:
+            # Largest power-of-two bond dimension whose MPS fits the budget
+            bond_cap = bond_cap or 2 ** 20
+            while bond_cap > 1 and self.mps_memory_mb(structure, bond_cap) > budget:
+                bond_cap //= 2
+            mps_mb = self.mps_memory_mb(structure, bond_cap)
+            reason += f"; bond dimension capped at {bond_cap} to fit {budget:.3g} MB (approximate)"
+        
+        options = {"method": "matrix_product_state",
+                   "matrix_product_state_truncation_threshold": self.mps_truncation_threshold}
+        if bond_cap > 0:
+            options["matrix_product_state_max_bond_dimension"] = bond_cap
+        return SimulationMethodChoice("matrix_product_state", mps_mb, reason, options, structure)
+
+
+class BackendLease:
+    """A backend with the sampler and pass managers that execute on it"""
+    
+    def __init__(self, backend_name: str, backend):
+        self.backend_name = backend_name
+        self.backend = backend
+        self.sampler = Sampler(mode=backend)
+        self._default_options: Optional[Dict[str, Any]] = None
+    
+    def apply_simulation_method(self, choice: SimulationMethodChoice) -> None:
+        """Set the chosen Aer method for this lease; reset_options() restores the defaults"""
+        if self._default_options is None:
+            self._default_options = {name: getattr(self.backend.options, name) for name in (
+                "method", "matrix_product_state_truncation_threshold", "matrix_product_state_max_bond_dimension")}
+        self.backend.set_options(**choice.options)
+    
+    def reset_options(self) -> None:
+        if self._default_options is not None:
+            self.backend.set_options(**self._default_options)
+            self._default_options = None
+    
+    def pass_manager(self, optimization_level: int = 1):
+        """
+        Preset pass manager for this backend, built once per target and level
+        
+        Aer targets depend on the simulation method (statevector allows fewer
+        qubits than matrix_product_state), so the cache key follows the target.
+        """
+        return get_transpile_cache().pass_manager(self.backend, optimization_level)
+    
+    def transpile(self, ansatz, optimization_level: int = 1):
+        """ISA ansatz for this backend from the shared transpile cache"""
+        return get_transpile_cache().transpile(ansatz, self.backend, optimization_level)
+
+
+class SimulatorPool:
+    """
+    Bounded pool of pre-configured local simulators
+    
+    At most pool_size instances per backend name are leased at a time;
+    further callers wait for one to be returned, so concurrent jobs share
+    the configured thread budget instead of oversubscribing the CPU.
+    Instances (with their sampler and pass managers) are created on first
+    demand and reused by later leases.
+    """
+    
+    def __init__(self, config: SimulatorPoolConfig, factory: Callable[[str], Any]):
+        """
+        Args:
+            config: Pool size and Aer parallelism options
+            factory: Creates an unconfigured simulator for a backend name
+        """
+        self.config = config
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._idle: Dict[str, List[BackendLease]] = {}
+        self._shared: Dict[str, Any] = {}
+        self.created = 0
+        self.leases = 0
+    
+    def _create_backend(self, backend_name: str):
+        backend = self._factory(backend_name)
+        backend.set_options(**self.config.simulator_options())
+        return backend
+    
+    def shared_backend(self, backend_name: str):
+        """Configured instance for callers that only need a backend handle"""
+        with self._lock:
+            if backend_name not in self._shared:
+                self._shared[backend_name] = self._create_backend(backend_name)
+            return self._shared[backend_name]
+    
+    @contextmanager
+    def lease(self, backend_name: str, timeout: Optional[float] = None) -> Iterator[BackendLease]:
+        """
+        Lease a pooled simulator for the duration of a job
+        
+        Args:
+            backend_name: Local simulator name
+            timeout: Seconds to wait for a free instance (None waits indefinitely)
+            
+        Raises:
+            TimeoutError: if no instance became free in time
+        """
+        with self._lock:
+            slot = self._slots.setdefault(backend_name, threading.BoundedSemaphore(self.config.pool_size))
+        if not slot.acquire(timeout=timeout):
+            raise TimeoutError(f"No pooled {backend_name} instance available within {timeout}s")
+        
+        lease = None
+        try:
+            with self._lock:
+                idle = self._idle.setdefault(backend_name, [])
+                lease = idle.pop() if idle else None
+                self.leases += 1
+            if lease is None:
+                lease = BackendLease(backend_name, self._create_backend(backend_name))
+                with self._lock:
+                    self.created += 1
+                logger.info(f"Created pooled simulator {backend_name} ({self.created} total)")
+            yield lease
+        finally:
+            if lease is not None:
+                lease.reset_options()
+                with self._lock:
+                    self._idle[backend_name].append(lease)
+            slot.release()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Pool usage counters"""
+        with self._lock:
+            return {
+                "pool_size": self.config.pool_size,
+                "threads_per_instance": self.config.thread_budget(),
+                "instances_created": self.created,
+                "idle_instances": {name: len(idle) for name, idle in self._idle.items()},
+                "total_leases": self.leases
+            }
+
+
 class QuantumBackendManager:
     """Manages quantum computing backends and execution"""
     
@@ -122,6 +430,11 @@ class QuantumBackendManager:
         # Load configuration
         self.config = self._load_config()
         
+        # Local simulators are leased from a pool instead of created per job
+        self.simulator_pool = SimulatorPool(SimulatorPoolConfig(**self.config.get("simulator_pool", {})),
+                                            self._create_local_simulator)
+        self.simulation_method_policy = SimulationMethodPolicy(**self.config.get("simulation_method", {}))
+        
         # Initialize quantum services if available
         if QISKIT_AVAILABLE:
             self._initialize_quantum_services()
@@ -147,7 +460,9 @@ class QuantumBackendManager:
             "fallback": {
                 "enabled": True,
                 "order": ["aer_simulator", "ibm_simulator", "least_busy_hardware"]
-            }
+            },
+            "simulator_pool": asdict(SimulatorPoolConfig()),
+            "simulation_method": asdict(SimulationMethodPolicy())
         }
         
         if os.path.exists(self.config_file):
@@ -508,15 +823,7 @@ class QuantumBackendManager:
             raise ValueError(f"Backend {backend_name} not found")
         
         if backend_info.backend_type == BackendType.SIMULATOR_LOCAL:
-            if backend_name == "aer_simulator":
-                return AerSimulator()
-            elif backend_name == "aer_simulator_noisy":
-                from qiskit_aer.noise import NoiseModel
-                # Create a simple noise model
-                noise_model = NoiseModel()
-                return AerSimulator(noise_model=noise_model)
-            else:
-                return AerSimulator()  # Fallback
+            return self.simulator_pool.shared_backend(backend_name)
         
         elif backend_info.backend_type in [BackendType.HARDWARE_IBM, BackendType.SIMULATOR_CLOUD]:
             if not self.service:
@@ -527,6 +834,48 @@ class QuantumBackendManager:
         else:
             raise ValueError(f"Unsupported backend type: {backend_info.backend_type}")
     
+    def _create_local_simulator(self, backend_name: str):
+        """New local Aer simulator for a pooled backend name"""
+        if backend_name == "aer_simulator_noisy":
+            from qiskit_aer.noise import NoiseModel
+            # Create a simple noise model
+            noise_model = NoiseModel()
+            return AerSimulator(noise_model=noise_model)
+        return AerSimulator()
+    
+    @contextmanager
+    def lease_backend(self, backend_name: str, timeout: Optional[float] = None) -> Iterator[BackendLease]:
+        """
+        Backend, sampler and pass managers for one job
+        
+        Local simulators come from the pool and are returned when the job
+        finishes; remote backends get a fresh lease around the service handle.
+        
+        Args:
+            backend_name: Name of the backend to execute on
+            timeout: Seconds to wait for a pooled simulator
+        """
+        backend_info = self.get_backend_info(backend_name)
+        if backend_info and backend_info.backend_type == BackendType.SIMULATOR_LOCAL:
+            with self.simulator_pool.lease(backend_name, timeout) as lease:
+                yield lease
+        else:
+            yield BackendLease(backend_name, self.get_backend_instance(backend_name))
+    
+    def select_simulation_method(self, circuit) -> SimulationMethodChoice:
+        """
+        Pick the Aer simulation method for a circuit on a pooled simulator
+        
+        Args:
+            circuit: Logical circuit to simulate (unrolled internally)
+            
+        Returns:
+            SimulationMethodChoice with the Aer options and predicted memory
+        """
+        choice = self.simulation_method_policy.choose(circuit, self.simulator_pool.config.pool_size)
+        logger.info(f"Simulation method {choice.method} (~{choice.predicted_memory_mb:.1f} MB): {choice.reason}")
+        return choice
+    
     def save_config(self) -> None:
         """Save current configuration to file"""
         try:
@@ -545,7 +894,9 @@ class QuantumBackendManager:
             "total_backends": len(self.available_backends),
             "by_type": {},
             "by_status": {},
-            "recommended": {}
+            "recommended": {},
+            "simulator_pool": self.simulator_pool.stats(),
+            "transpile_cache": get_transpile_cache().info()
         }
         
         # Count by type and status
@@ -571,12 +922,16 @@ class QuantumBackendManager:
 
 # Global backend manager instance
 _backend_manager: Optional[QuantumBackendManager] = None
+_backend_manager_lock = threading.Lock()
 
 def get_backend_manager() -> QuantumBackendManager:
-    """Get global backend manager instance (singleton)"""
+    """Get global backend manager instance (singleton, safe to call from worker threads)"""
     global _backend_manager
     if _backend_manager is None:
-        _backend_manager = QuantumBackendManager()
+        with _backend_manager_lock:
+            # Re-check: another thread may have created it while this one waited
+            if _backend_manager is None:
+                _backend_manager = QuantumBackendManager()
     return _backend_manager
 
 
@@ -0,0 +1,425 @@
+"""
+Vectorized QUBO Energy Evaluation
+
+Sampler results are scored against a diagonal Ising Hamiltonian
+
+    H = c + Σ h_i Z_i + Σ_{i<j} J_ij Z_i Z_j
+
+where label position i is character i of a measured bitstring. With
+Z_i = 1 - 2 x_i this is the QUBO quadratic form
+
+    E(x) = offset + lin · x + xᵀ Q x
+
+with offset = c + Σh + ΣJ, lin_i = -2 h_i - 2 Σ_j J_ij (J symmetrized) and
+Q = 2 J_sym (zero diagonal). QuboEnergyEvaluator converts the Hamiltonian
+once, turns counts dictionaries or the sampler's packed BitArray into a
+(unique samples × qubits) bit matrix, and scores all samples with two
+matrix products instead of looping over bitstrings, terms and characters.
+
+Because the Hamiltonian is diagonal, a bitstring's energy never changes
+during an optimization. Two lookups exploit that across cost evaluations:
+- EnergyTable: the full 2^n energy vector for small problems, so an
+  expectation value is a gather and a dot product with the frequencies.
+- CachedQuboEnergy: a bounded LRU of per-outcome energies for problems too
+  large to tabulate.
+create_energy_lookup picks between the two.
+"""
+
+import hashlib
+import os
+import weakref
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+from qiskit.quantum_info import SparsePauliOp
+
+# Couplings are kept as a CSR matrix when at most this fraction of entries is non-zero
+SPARSE_COUPLING_DENSITY = 0.1
+
+# Full energy tables up to this many qubits by default (2^22 float64 = 32 MB)
+ENERGY_TABLE_MAX_QUBITS = 22
+# Hard ceiling for tables, memory-mapped or not (2^26 float64 = 512 MB)
+ENERGY_TABLE_LIMIT_QUBITS = 26
+DEFAULT_ENERGY_CACHE_SIZE = 1_000_000
+
+
+class QuboEnergyEvaluator:
+    """Batched energies and expectation values of one diagonal Hamiltonian"""
+
+    def __init__(self, offset: float, linear: np.ndarray,
+                 quadratic: Union[np.ndarray, sparse.spmatrix], num_qubits: int):
+        self.offset = float(offset)
+        self.linear = np.asarray(linear, dtype=float)
+        self.quadratic = quadratic
+        self.num_qubits = num_qubits
+
+    @classmethod
+    def from_hamiltonian(cls, hamiltonian: SparsePauliOp) -> 'QuboEnergyEvaluator':
+        """
+        Convert a SparsePauliOp of I/Z terms (at most two Z per term)
+
+        Raises:
+            ValueError: if the Hamiltonian has X/Y components or higher-order terms
+        """
+        n = hamiltonian.num_qubits
+        paulis = hamiltonian.paulis
+        if np.any(paulis.x):
+            raise ValueError("Energy evaluation requires a diagonal (I/Z only) Hamiltonian")
+
+        # Label position i is qiskit qubit n - 1 - i
+        z = paulis.z[:, ::-1]
+        coeffs = np.real(hamiltonian.coeffs)
+        weight = z.sum(axis=1)
+        if np.any(weight > 2):
+            raise ValueError("Energy evaluation supports terms with at most two Z operators")
+
+        constant = coeffs[weight == 0].sum()
+
+        single = weight == 1
+        h = np.zeros(n)
+        np.add.at(h, np.argmax(z[single], axis=1), coeffs[single])
+
+        pair = weight == 2
+        pair_positions = np.nonzero(z[pair])[1].reshape(-1, 2)
+        rows, cols, values = pair_positions[:, 0], pair_positions[:, 1], coeffs[pair]
+        couplings = sparse.coo_matrix((np.concatenate([values, values]),
+                                       (np.concatenate([rows, cols]), np.concatenate([cols, rows]))),
+                                      shape=(n, n)).tocsr()   # symmetric J, duplicates summed
+
+        offset = constant + h.sum() + values.sum()
+        linear = -2.0 * h - 2.0 * np.asarray(couplings.sum(axis=1)).ravel()
+        quadratic = 2.0 * couplings
+        if quadratic.nnz > SPARSE_COUPLING_DENSITY * n * n:
+            quadratic = quadratic.toarray()
+        return cls(offset, linear, quadratic, n)
+
+    def energies(self, bits: np.ndarray) -> np.ndarray:
+        """Energy of each row of a (num_samples, num_qubits) 0/1 matrix"""
+        x = np.asarray(bits, dtype=float)
+        if sparse.issparse(self.quadratic):
+            coupled = (self.quadratic @ x.T).T
+        else:
+            coupled = x @ self.quadratic
+        return self.offset + x @ self.linear + np.einsum('si,si->s', coupled, x)
+
+    def expectation(self, bits: np.ndarray, frequencies: np.ndarray) -> float:
+        """Frequency-weighted mean energy of a set of samples"""
+        frequencies = np.asarray(frequencies, dtype=float)
+        return float(self.energies(bits) @ frequencies / frequencies.sum())
+
+    def expectation_from_counts(self, counts: Dict[Union[str, int], int]) -> float:
+        """Expectation value from get_counts() or get_int_counts() results"""
+        return self.expectation(*counts_to_bit_matrix(counts, self.num_qubits))
+
+    def expectation_from_bit_array(self, bit_array) -> float:
+        """Expectation value straight from a sampler BitArray (no counts dictionary)"""
+        return self.expectation(*bit_array_to_bit_matrix(bit_array))
+
+    def expectations_from_bit_array(self, bit_array, with_variance: bool = False):
+        """
+        One expectation value per parameter set of a batched BitArray
+
+        With with_variance=True, returns (means, variances) of the per-shot energies.
+        """
+        unique, inverse = _unique_shots(bit_array)
+        bits = np.unpackbits(unique, axis=1)[:, -bit_array.num_bits:]
+        return _per_parameter_mean(self.energies(bits)[inverse], bit_array, with_variance)
+
+
+def counts_to_bit_matrix(counts: Dict[Union[str, int], int], num_qubits: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Unique samples of a counts dictionary as a 0/1 matrix
+
+    String keys map character i to column i. Integer keys (get_int_counts)
+    are read most-significant bit first, matching format(key, f'0{n}b').
+
+    Returns:
+        (bits, frequencies) with bits of shape (num_unique, num_qubits), uint8
+    """
+    keys = list(counts.keys())
+    frequencies = np.fromiter(counts.values(), dtype=float, count=len(keys))
+    if not keys:
+        return np.zeros((0, num_qubits), dtype=np.uint8), frequencies
+
+    if isinstance(keys[0], str):
+        if any(len(key) != num_qubits for key in keys):
+            keys = [key.zfill(num_qubits)[-num_qubits:] for key in keys]
+        bits = np.frombuffer(''.join(keys).encode('ascii'), dtype=np.uint8).reshape(len(keys), num_qubits) - ord('0')
+    elif num_qubits <= 63:
+        values = np.array(keys, dtype=np.uint64)
+        shifts = np.arange(num_qubits - 1, -1, -1, dtype=np.uint64)
+        bits = ((values[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+    else:
+        return counts_to_bit_matrix({format(key, f'0{num_qubits}b'): value for key, value in counts.items()},
+                                    num_qubits)
+    return bits, frequencies
+
+
+def bit_array_to_bit_matrix(bit_array) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Unique shots of a qiskit BitArray as a 0/1 matrix
+
+    Shots are de-duplicated on the packed bytes before unpacking, so the
+    unpacked matrix has one row per distinct outcome.
+
+    Returns:
+        (bits, frequencies) with columns in bitstring character order
+    """
+    packed = np.ascontiguousarray(bit_array.array.reshape(-1, bit_array.array.shape[-1]))
+    unique, frequencies = np.unique(packed, axis=0, return_counts=True)
+    bits = np.unpackbits(unique, axis=1)[:, -bit_array.num_bits:]
+    return bits, frequencies.astype(float)
+
+
+def _unique_shots(bit_array) -> Tuple[np.ndarray, np.ndarray]:
+    """Distinct packed outcomes over every shot of a (possibly batched) BitArray"""
+    packed = np.ascontiguousarray(bit_array.array.reshape(-1, bit_array.array.shape[-1]))
+    unique, inverse = np.unique(packed, axis=0, return_inverse=True)
+    return unique, inverse.ravel()
+
+
+def _per_parameter_mean(shot_energies: np.ndarray, bit_array, with_variance: bool = False):
+    """Average flattened per-shot energies over the shots of each parameter set"""
+    per_parameter = shot_energies.reshape(-1, bit_array.num_shots)
+    if with_variance:
+        return per_parameter.mean(axis=1), per_parameter.var(axis=1)
+    return per_parameter.mean(axis=1)
+
+
+def _packed_to_indices(packed: np.ndarray) -> np.ndarray:
+    """Big-endian packed bit rows to basis-state indices (bitstring read as binary)"""
+    indices = np.zeros(len(packed), dtype=np.int64)
+    for column in range(packed.shape[1]):
+        indices = (indices << 8) | packed[:, column]
+    return indices
+
+
+class EnergyTable:
+    """
+    Energy of every basis state of a diagonal Hamiltonian
+
+    Entry k is the energy of the bitstring format(k, f'0{n}b'). The table is
+    filled chunk by chunk: the last chunk_bits qubits are enumerated once,
+    and each chunk of leading-bit assignments only adds a constant and a
+    (chunk × chunk_bits) field product, so construction is O(2^n · chunk_bits).
+    """
+
+    def __init__(self, evaluator: QuboEnergyEvaluator, path: Optional[str] = None,
+                 chunk_bits: int = 16, max_chunk_elements: int = 1 << 22):
+        n = evaluator.num_qubits
+        if n > ENERGY_TABLE_LIMIT_QUBITS:
+            raise ValueError(f"Energy table limited to {ENERGY_TABLE_LIMIT_QUBITS} qubits, got {n}")
+        self.evaluator = evaluator
+        self.num_qubits = n
+        self.path = path
+
+        size = 1 << n
+        if path is not None and os.path.exists(path) and os.path.getsize(path) >= size * 8:
+            # Reuse a table written by an earlier run of the same problem
+            self.energies = np.load(path, mmap_mode='r')
+            if self.energies.shape == (size,):
+                return
+
+        if path is None:
+            self._fill(np.empty(size), chunk_bits, max_chunk_elements)
+        else:
+            partial_path = f"{path}.partial.npy"
+            table = np.lib.format.open_memmap(partial_path, mode='w+', dtype=np.float64, shape=(size,))
+            self._fill(table, chunk_bits, max_chunk_elements)
+            table.flush()
+            del table
+            os.replace(partial_path, path)
+            self.energies = np.load(path, mmap_mode='r')
+
+    def _fill(self, table: np.ndarray, chunk_bits: int, max_chunk_elements: int) -> None:
+        evaluator = self.evaluator
+        n = self.num_qubits
+        low = min(n, chunk_bits)
+        high = n - low
+
+        quadratic = evaluator.quadratic
+        quadratic = quadratic.toarray() if sparse.issparse(quadratic) else np.asarray(quadratic)
+        linear = evaluator.linear
+
+        low_bits = _index_bits(np.arange(1 << low), low).astype(float)
+        q_low = quadratic[high:, high:]
+        low_energies = low_bits @ linear[high:] + np.einsum('si,si->s', low_bits @ q_low, low_bits)
+
+        if high == 0:
+            table[:] = evaluator.offset + low_energies
+            self.energies = table
+            return
+
+        q_high = quadratic[:high, :high]
+        q_cross = 2.0 * quadratic[:high, high:]
+        rows_per_chunk = max(1, max_chunk_elements >> low)
+        for first in range(0, 1 << high, rows_per_chunk):
+            prefixes = np.arange(first, min(first + rows_per_chunk, 1 << high))
+            high_bits = _index_bits(prefixes, high).astype(float)
+            high_energies = (evaluator.offset + high_bits @ linear[:high]
+                             + np.einsum('si,si->s', high_bits @ q_high, high_bits))
+            chunk = high_energies[:, None] + low_energies[None, :] + (high_bits @ q_cross) @ low_bits.T
+            table[first << low:(first + len(prefixes)) << low] = chunk.ravel()
+        self.energies = table
+
+    def expectation_from_indices(self, indices: np.ndarray, frequencies: np.ndarray) -> float:
+        frequencies = np.asarray(frequencies, dtype=float)
+        return float(np.asarray(self.energies[indices]) @ frequencies / frequencies.sum())
+
+    def expectation_from_counts(self, counts: Dict[Union[str, int], int]) -> float:
+        """Expectation value from get_counts() or get_int_counts() results"""
+        keys = list(counts.keys())
+        frequencies = np.fromiter(counts.values(), dtype=float, count=len(keys))
+        if keys and not isinstance(keys[0], str):
+            return self.expectation_from_indices(np.array(keys, dtype=np.int64), frequencies)
+        bits, frequencies = counts_to_bit_matrix(counts, self.num_qubits)
+        powers = 1 << np.arange(self.num_qubits - 1, -1, -1, dtype=np.int64)
+        return self.expectation_from_indices(bits.astype(np.int64) @ powers, frequencies)
+
+    def expectation_from_bit_array(self, bit_array) -> float:
+        """Expectation value from a sampler BitArray: one gather over all shots"""
+        packed = bit_array.array.reshape(-1, bit_array.array.shape[-1])
+        indices = _packed_to_indices(packed) & ((1 << self.num_qubits) - 1)
+        return float(np.mean(self.energies[indices]))
+
+    def expectations_from_bit_array(self, bit_array, with_variance: bool = False):
+        """
+        One expectation value per parameter set of a batched BitArray
+
+        With with_variance=True, returns (means, variances) of the per-shot energies.
+        """
+        packed = bit_array.array.reshape(-1, bit_array.array.shape[-1])
+        indices = _packed_to_indices(packed) & ((1 << self.num_qubits) - 1)
+        return _per_parameter_mean(np.asarray(self.energies[indices]), bit_array, with_variance)
+
+
+class CachedQuboEnergy:
+    """
+    QUBO energies with a bounded LRU of per-outcome results
+
+    Outcomes are keyed by their packed measurement bytes; only outcomes not
+    seen in earlier cost evaluations are scored by the evaluator.
+    """
+
+    def __init__(self, evaluator: QuboEnergyEvaluator, max_entries: int = DEFAULT_ENERGY_CACHE_SIZE):
+        self.evaluator = evaluator
+        self.num_qubits = evaluator.num_qubits
+        self.max_entries = max_entries
+        self._energies: "OrderedDict[bytes, float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _packed_energies(self, packed: np.ndarray) -> np.ndarray:
+        """Energies of unique packed rows, scoring only the cache misses"""
+        energies = np.empty(len(packed))
+        missing = []
+        for row, key in enumerate(map(bytes, packed)):
+            energy = self._energies.get(key)
+            if energy is None:
+                missing.append(row)
+            else:
+                self._energies.move_to_end(key)
+                energies[row] = energy
+        self.hits += len(packed) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            missing = np.array(missing)
+            bits = np.unpackbits(packed[missing], axis=1)[:, -self.num_qubits:]
+            computed = self.evaluator.energies(bits)
+            energies[missing] = computed
+            for row, energy in zip(missing, computed):
+                self._energies[bytes(packed[row])] = float(energy)
+            while len(self._energies) > self.max_entries:
+                self._energies.popitem(last=False)
+        return energies
+
+    def expectation_from_bit_array(self, bit_array) -> float:
+        packed = np.ascontiguousarray(bit_array.array.reshape(-1, bit_array.array.shape[-1]))
+        unique, frequencies = np.unique(packed, axis=0, return_counts=True)
+        return float(self._packed_energies(unique) @ frequencies / frequencies.sum())
+
+    def expectations_from_bit_array(self, bit_array, with_variance: bool = False):
+        """
+        One expectation value per parameter set of a batched BitArray
+
+        With with_variance=True, returns (means, variances) of the per-shot energies.
+        """
+        unique, inverse = _unique_shots(bit_array)
+        return _per_parameter_mean(self._packed_energies(unique)[inverse], bit_array, with_variance)
+
+    def expectation_from_counts(self, counts: Dict[Union[str, int], int]) -> float:
+        bits, frequencies = counts_to_bit_matrix(counts, self.num_qubits)
+        packed = np.packbits(np.pad(bits, ((0, 0), (-self.num_qubits % 8, 0))), axis=1)
+        return float(self._packed_energies(packed) @ frequencies / frequencies.sum())
+
+
+def _index_bits(indices: np.ndarray, num_bits: int) -> np.ndarray:
+    """Basis-state indices to bit rows, most significant bit first"""
+    shifts = np.arange(num_bits - 1, -1, -1, dtype=np.int64)
+    return ((indices[:, None] >> shifts) & 1).astype(np.uint8)
+
+
+def hamiltonian_fingerprint(hamiltonian: SparsePauliOp) -> str:
+    """Content hash of a Pauli operator, used to name persisted energy tables"""
+    digest = hashlib.sha256()
+    digest.update(np.packbits(hamiltonian.paulis.z).tobytes())
+    digest.update(np.packbits(hamiltonian.paulis.x).tobytes())
+    digest.update(np.asarray(hamiltonian.coeffs).tobytes())
+    return digest.hexdigest()[:24]
+
+
+def create_energy_lookup(hamiltonian: SparsePauliOp,
+                         table_max_qubits: int = ENERGY_TABLE_MAX_QUBITS,
+                         table_dir: Optional[str] = None,
+                         cache_size: int = DEFAULT_ENERGY_CACHE_SIZE) -> Union[EnergyTable, CachedQuboEnergy]:
+    """
+    Energy lookup shared by all cost evaluations of one problem
+
+    Args:
+        hamiltonian: Diagonal problem Hamiltonian
+        table_max_qubits: Largest problem that gets a full 2^n table
+        table_dir: Directory for memory-mapped tables (in memory when None)
+        cache_size: Maximum cached outcomes when no table is built
+
+    Returns:
+        EnergyTable or CachedQuboEnergy, both exposing expectation_from_counts
+        and expectation_from_bit_array
+    """
+    evaluator = evaluator_for(hamiltonian)
+    n = hamiltonian.num_qubits
+    if n <= min(table_max_qubits, ENERGY_TABLE_LIMIT_QUBITS):
+        path = None
+        if table_dir is not None:
+            os.makedirs(table_dir, exist_ok=True)
+            path = os.path.join(table_dir, f"energies_{hamiltonian_fingerprint(hamiltonian)}.npy")
+        return EnergyTable(evaluator, path=path)
+    return CachedQuboEnergy(evaluator, max_entries=cache_size)
+
+
+# Evaluators of recently used Hamiltonians, keyed by object identity
+_EVALUATORS: Dict[int, Tuple[weakref.ref, QuboEnergyEvaluator]] = {}
+
+
+def evaluator_for(hamiltonian: SparsePauliOp) -> QuboEnergyEvaluator:
+    """QuboEnergyEvaluator of a Hamiltonian, converted once per Hamiltonian object"""
+    key = id(hamiltonian)
+    entry = _EVALUATORS.get(key)
+    if entry is not None and entry[0]() is hamiltonian:
+        return entry[1]
+
+    evaluator = QuboEnergyEvaluator.from_hamiltonian(hamiltonian)
+    _EVALUATORS[key] = (weakref.ref(hamiltonian, lambda _: _EVALUATORS.pop(key, None)), evaluator)
+    return evaluator
+
+
+def expectation_from_counts(counts: Dict[Union[str, int], int], hamiltonian: SparsePauliOp) -> float:
+    """Expectation value of a diagonal Hamiltonian over measurement counts"""
+    return evaluator_for(hamiltonian).expectation_from_counts(counts)
+
+
+def expectation_from_bit_array(bit_array, hamiltonian: SparsePauliOp) -> float:
+    """Expectation value of a diagonal Hamiltonian over a sampler BitArray"""
+    return evaluator_for(hamiltonian).expectation_from_bit_array(bit_array)
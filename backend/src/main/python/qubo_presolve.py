@@ -0,0 +1,199 @@
+"""
+QUBO Presolve: Variable Fixing and Merging
+
+Every variable left in the QUBO becomes a qubit, and each qubit doubles
+the simulated state space. Many portfolio QUBO variables are decided by
+the coefficients alone. The presolve works on the problem Hamiltonian of
+enhanced_dynamic_portfolio_opt,
+
+    E(s) = Σ h_i s_i + Σ_{i<j} J_ij s_i s_j,   s_i = +1 for bit 0, -1 for bit 1
+
+and applies two persistency rules (the first-order special cases of roof
+duality) until neither fires:
+
+- Fixing: if |h_i| > Σ_j |J_ij|, the field outweighs every coupling, and
+  s_i = -sign(h_i) in every ground state. A variable without couplings
+  and without a field is fixed to bit 0 (either value is optimal).
+- Merging: if |J_ij| > |h_i| + Σ_{k≠j} |J_ik|, one coupling outweighs
+  everything else acting on i, and s_i = -sign(J_ij) · s_j in every
+  ground state; i is replaced by ±s_j.
+
+Fixed and merged variables are folded into the fields, the couplings of
+their partners and a constant offset, so for every reduced assignment
+E(expanded) = E_reduced + offset. PresolvedQubo keeps the mapping to
+rebuild full bitstrings from measured reduced ones.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Union
+
+import numpy as np
+
+from ising_hamiltonian import upper_triangle_terms
+from sparse_qubo import BlockSparseQubo
+
+
+@dataclass
+class PresolvedQubo:
+    """Reduced QUBO and the mapping back to the original variables"""
+    num_variables: int
+    linear: np.ndarray        # (num_reduced,) fields of the remaining variables
+    quadratic: np.ndarray     # (num_reduced, num_reduced) symmetric couplings
+    offset: float             # energy of the fixed and merged terms
+    fixed_bits: np.ndarray    # (num_variables,) bit of fixed variables, -1 if not fixed
+    reduced_index: np.ndarray  # (num_variables,) reduced variable that decides each free variable
+    flipped: np.ndarray       # (num_variables,) True where the bit is the complement of that variable
+
+    @property
+    def num_reduced(self) -> int:
+        return len(self.linear)
+
+    @property
+    def num_fixed(self) -> int:
+        return int(np.count_nonzero(self.fixed_bits >= 0))
+
+    @property
+    def num_merged(self) -> int:
+        return self.num_variables - self.num_fixed - self.num_reduced
+
+    def expand_bits(self, reduced_bits: np.ndarray) -> np.ndarray:
+        """Bits of all original variables from (..., num_reduced) reduced bits"""
+        reduced_bits = np.asarray(reduced_bits, dtype=np.int64)
+        bits = np.broadcast_to(self.fixed_bits, reduced_bits.shape[:-1] + (self.num_variables,)).copy()
+        free = self.fixed_bits < 0
+        bits[..., free] = reduced_bits[..., self.reduced_index[free]] ^ self.flipped[free]
+        return bits
+
+    def expand_bitstring(self, bitstring: str) -> str:
+        """Full bitstring (variable i = character i) from a measured reduced bitstring"""
+        reduced_bits = np.frombuffer(bitstring.encode('ascii'), dtype=np.uint8)[:self.num_reduced] - ord('0')
+        return ''.join('01'[bit] for bit in self.expand_bits(reduced_bits))
+
+    def expand_counts(self, counts: Dict[str, int]) -> Dict[str, int]:
+        """Measurement counts keyed by full bitstrings"""
+        expanded: Dict[str, int] = {}
+        for bitstring, count in counts.items():
+            full = self.expand_bitstring(bitstring)
+            expanded[full] = expanded.get(full, 0) + count
+        return expanded
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            'original_qubits': self.num_variables,
+            'reduced_qubits': self.num_reduced,
+            'fixed_variables': self.num_fixed,
+            'merged_variables': self.num_merged,
+            'energy_offset': self.offset
+        }
+
+
+def presolve_qubo(linear: np.ndarray, quadratic: Union[np.ndarray, BlockSparseQubo], num_qubits: int,
+                  relative_tolerance: float = 1e-9) -> PresolvedQubo:
+    """
+    Fix and merge variables decided by the coefficients alone
+
+    Args:
+        linear: Fields h_i
+        quadratic: Dense coupling matrix or BlockSparseQubo (upper triangle is used)
+        num_qubits: Number of variables
+        relative_tolerance: Margin, relative to the largest coefficient, by which
+            a rule's inequality must hold
+
+    Returns:
+        PresolvedQubo with a dense reduced coupling matrix
+    """
+    fields = np.array(linear, dtype=float)[:num_qubits]
+    rows, cols, values = upper_triangle_terms(quadratic)
+    neighbours: List[Dict[int, float]] = [{} for _ in range(num_qubits)]
+    for i, j, value in zip(rows.tolist(), cols.tolist(), values.tolist()):
+        if value != 0.0:
+            neighbours[i][j] = neighbours[i].get(j, 0.0) + value
+            neighbours[j][i] = neighbours[j].get(i, 0.0) + value
+
+    scale = max(np.max(np.abs(fields), initial=0.0), np.max(np.abs(values), initial=0.0))
+    margin = relative_tolerance * scale
+    offset = 0.0
+    spins = np.zeros(num_qubits, dtype=np.int64)   # fixed spin, 0 while free
+    parent = np.full(num_qubits, -1, dtype=np.int64)  # merged into this variable
+    parent_sign = np.ones(num_qubits, dtype=np.int64)
+    alive = set(range(num_qubits))
+
+    def fix(i: int, spin: int) -> None:
+        nonlocal offset
+        offset += fields[i] * spin
+        for j, coupling in neighbours[i].items():
+            fields[j] += coupling * spin
+            del neighbours[j][i]
+        neighbours[i] = {}
+        spins[i] = spin
+        alive.discard(i)
+
+    def merge(i: int, j: int, sign: int) -> None:
+        # s_i = sign · s_j
+        nonlocal offset
+        offset += neighbours[i].pop(j) * sign
+        del neighbours[j][i]
+        fields[j] += fields[i] * sign
+        for k, coupling in neighbours[i].items():
+            del neighbours[k][i]
+            combined = neighbours[j].get(k, 0.0) + coupling * sign
+            if combined == 0.0:
+                neighbours[j].pop(k, None)
+                neighbours[k].pop(j, None)
+            else:
+                neighbours[j][k] = combined
+                neighbours[k][j] = combined
+        neighbours[i] = {}
+        parent[i] = j
+        parent_sign[i] = sign
+        alive.discard(i)
+
+    changed = True
+    while changed:
+        changed = False
+        for i in sorted(alive):
+            if i not in alive:
+                continue
+            couplings = neighbours[i]
+            total = sum(abs(coupling) for coupling in couplings.values())
+            if not couplings or abs(fields[i]) > total + margin:
+                fix(i, -1 if fields[i] > 0 else 1)
+                changed = True
+                continue
+            j, strongest = max(couplings.items(), key=lambda item: abs(item[1]))
+            if abs(strongest) > abs(fields[i]) + total - abs(strongest) + margin:
+                merge(i, j, -1 if strongest > 0 else 1)
+                changed = True
+
+    # Resolve merge chains to a fixed spin or a surviving variable
+    remaining = np.array(sorted(alive), dtype=np.int64)
+    position = np.full(num_qubits, -1, dtype=np.int64)
+    position[remaining] = np.arange(len(remaining))
+    fixed_bits = np.full(num_qubits, -1, dtype=np.int64)
+    reduced_index = np.zeros(num_qubits, dtype=np.int64)
+    flipped = np.zeros(num_qubits, dtype=np.int64)
+    for i in range(num_qubits):
+        root, sign = i, 1
+        while parent[root] >= 0:
+            sign *= parent_sign[root]
+            root = parent[root]
+        if spins[root] != 0:
+            fixed_bits[i] = 0 if spins[root] * sign > 0 else 1
+        else:
+            reduced_index[i] = position[root]
+            flipped[i] = 0 if sign > 0 else 1
+
+    reduced_quadratic = np.zeros((len(remaining), len(remaining)))
+    for a, i in enumerate(remaining.tolist()):
+        for j, coupling in neighbours[i].items():
+            reduced_quadratic[a, position[j]] = coupling
+
+    return PresolvedQubo(
+        num_variables=num_qubits,
+        linear=fields[remaining].copy(),
+        quadratic=reduced_quadratic,
+        offset=float(offset),
+        fixed_bits=fixed_bits,
+        reduced_index=reduced_index,
+        flipped=flipped
+    )
@@ -0,0 +1,289 @@
+"""
+Rolling-Window Return and Ledoit-Wolf Covariance Engine
+
+prepare_multi_period_data cuts the price history into windows that are two
+rebalance periods long and start one rebalance period apart, so consecutive
+windows share half of their returns. Instead of re-estimating every window
+from scratch, RollingLedoitWolf keeps running (prefix) sums of the daily
+returns and their cross-products:
+
+    M1[k]  = Σ_{t<k} r_t                 (num_assets,)
+    M11[k] = Σ_{t<k} r_t r_tᵀ            (num_assets, num_assets)
+    M21[k] = Σ_{t<k} ‖r_t‖² r_t          (num_assets,)
+    M22[k] = Σ_{t<k} ‖r_t‖⁴              scalar
+    L[k]   = Σ_{t<k} log(1 + r_t)        (num_assets,)
+
+Any window is then a difference of two prefix entries, which is all the
+Ledoit-Wolf shrinkage (sklearn / pypfopt "constant_variance" target) and the
+compounded mean historical return need. Appending a trading day costs one
+O(num_assets²) update; sliding a window costs nothing beyond the lookup, and
+all windows are shrunk together in one batched (windows × assets × assets)
+pass.
+
+Results match pypfopt's mean_historical_return and
+CovarianceShrinkage(...).ledoit_wolf() to floating point accuracy. Price
+matrices with missing values or non-positive prices are delegated to the
+exact per-window estimators in portfolio_statistics.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pypfopt.risk_models import fix_nonpositive_semidefinite
+
+from portfolio_statistics import (
+    TRADING_DAYS_PER_YEAR,
+    get_statistics_cache,
+    ledoit_wolf_covariance,
+    mean_historical_return,
+    price_fingerprint
+)
+
+
+@dataclass
+class WindowStatistics:
+    """Annualized expected returns and shrunk covariances of a batch of windows"""
+    mu: np.ndarray          # (num_windows, num_assets)
+    covariance: np.ndarray  # (num_windows, num_assets, num_assets)
+    shrinkage: np.ndarray   # (num_windows,) Ledoit-Wolf shrinkage constants (NaN when not computed)
+
+    def copy(self) -> 'WindowStatistics':
+        return WindowStatistics(self.mu.copy(), self.covariance.copy(), self.shrinkage.copy())
+
+
+class RollingLedoitWolf:
+    """
+    Running-sum estimator over a growing price history
+
+    Windows are addressed by price rows [start, end), exactly like
+    prices.iloc[start:end]; such a window holds end - start - 1 daily returns.
+    """
+
+    def __init__(self, prices: pd.DataFrame, frequency: int = TRADING_DAYS_PER_YEAR):
+        if len(prices) < 1:
+            raise ValueError("At least one price row is required")
+        values = prices.to_numpy(dtype=float)
+        if not np.all(np.isfinite(values)) or np.any(values <= 0):
+            raise ValueError("Prices must be finite and positive for the rolling estimator")
+
+        self.columns = prices.columns
+        self.index = prices.index
+        self.frequency = frequency
+        self._last_prices = values[-1].copy()
+
+        returns = values[1:] / values[:-1] - 1
+        # Moments are accumulated around a fixed shift to limit cancellation in long histories;
+        # covariance and shrinkage are shift-invariant
+        self._shift = returns.mean(axis=0) if len(returns) else np.zeros(values.shape[1])
+
+        num_assets = values.shape[1]
+        self._m1 = np.zeros((1, num_assets))
+        self._m11 = np.zeros((1, num_assets, num_assets))
+        self._m21 = np.zeros((1, num_assets))
+        self._m22 = np.zeros(1)
+        self._log_growth = np.zeros((1, num_assets))
+        self._extend(returns)
+
+    @property
+    def num_assets(self) -> int:
+        return len(self.columns)
+
+    @property
+    def num_prices(self) -> int:
+        return len(self.index)
+
+    def _extend(self, returns: np.ndarray) -> None:
+        """Append the running sums of a (num_days, num_assets) block of returns"""
+        if len(returns) == 0:
+            return
+        centered = returns - self._shift
+        squared_norm = np.sum(centered * centered, axis=1)
+
+        def cumulative(previous: np.ndarray, increments: np.ndarray) -> np.ndarray:
+            return np.concatenate([previous, previous[-1] + np.cumsum(increments, axis=0)])
+
+        self._m1 = cumulative(self._m1, centered)
+        self._m11 = cumulative(self._m11, centered[:, :, None] * centered[:, None, :])
+        self._m21 = cumulative(self._m21, squared_norm[:, None] * centered)
+        self._m22 = cumulative(self._m22, squared_norm ** 2)
+        self._log_growth = cumulative(self._log_growth, np.log1p(returns))
+
+    def append(self, new_prices: pd.DataFrame) -> None:
+        """
+        Append one or more trading days (rows in the same column order)
+
+        Only the new returns are accumulated; previously computed sums are
+        left untouched.
+        """
+        new_prices = new_prices.reindex(columns=self.columns)
+        values = new_prices.to_numpy(dtype=float)
+        if not np.all(np.isfinite(values)) or np.any(values <= 0):
+            raise ValueError("Prices must be finite and positive for the rolling estimator")
+
+        chained = np.vstack([self._last_prices, values])
+        self._extend(chained[1:] / chained[:-1] - 1)
+        self._last_prices = values[-1].copy()
+        self.index = self.index.append(new_prices.index)
+
+    def window_statistics(self, windows: Sequence[Tuple[int, int]]) -> WindowStatistics:
+        """
+        Batched statistics for price-row windows [start, end)
+
+        Args:
+            windows: Sequence of (start, end) price row bounds
+
+        Returns:
+            WindowStatistics with one entry per window
+        """
+        bounds = np.asarray(windows, dtype=np.int64).reshape(-1, 2)
+        starts, ends = bounds[:, 0], bounds[:, 1] - 1   # return rows [start, end - 1)
+        if np.any(bounds[:, 0] < 0) or np.any(bounds[:, 1] > self.num_prices) or np.any(ends - starts < 1):
+            raise ValueError("Windows must lie inside the price history and contain at least two prices")
+
+        n = (ends - starts).astype(float)
+        num_assets = self.num_assets
+
+        # Compounded mean historical return: Π(1 + r)^(frequency / n) - 1
+        log_growth = self._log_growth[ends] - self._log_growth[starts]
+        mu = np.expm1(log_growth * (self.frequency / n)[:, None])
+
+        # Window sums of the shifted returns
+        s1 = self._m1[ends] - self._m1[starts]
+        s11 = self._m11[ends] - self._m11[starts]
+        s21 = self._m21[ends] - self._m21[starts]
+        s22 = self._m22[ends] - self._m22[starts]
+
+        mean = s1 / n[:, None]
+        emp_cov = s11 / n[:, None, None] - mean[:, :, None] * mean[:, None, :]
+        # A single return has zero sample covariance; keep it exact instead of rounding noise
+        emp_cov[n == 1] = 0.0
+
+        if num_assets == 1:
+            shrinkage = np.zeros(len(bounds))
+            shrunk = emp_cov
+        else:
+            # Σ_t ‖x_t‖⁴ of the window-centered returns x_t = r_t - mean, expanded in raw sums
+            trace_total = np.trace(s11, axis1=1, axis2=2)
+            mean_sq = np.sum(mean * mean, axis=1)
+            quad_mean = np.einsum('wi,wij,wj->w', mean, s11, mean)
+            fourth_moment = (s22 + 4 * quad_mean + n * mean_sq ** 2
+                             - 4 * np.einsum('wi,wi->w', mean, s21)
+                             + 2 * mean_sq * trace_total
+                             - 4 * mean_sq * np.einsum('wi,wi->w', mean, s1))
+
+            emp_cov_trace = np.trace(emp_cov, axis1=1, axis2=2)
+            target = emp_cov_trace / num_assets
+            delta_sum = np.sum(emp_cov * emp_cov, axis=(1, 2))
+            beta = (fourth_moment / n - delta_sum) / (num_assets * n)
+            delta = (delta_sum - 2 * target * emp_cov_trace + num_assets * target ** 2) / num_assets
+            beta = np.minimum(beta, delta)
+            shrinkage = np.where(beta == 0, 0.0, beta / np.where(delta == 0, 1.0, delta))
+            # Near-degenerate windows (constant prices) only carry rounding noise here
+            shrinkage = np.clip(shrinkage, 0.0, 1.0)
+
+            shrunk = (1 - shrinkage)[:, None, None] * emp_cov
+            shrunk += (shrinkage * target)[:, None, None] * np.eye(num_assets)
+
+        covariance = shrunk * self.frequency
+        covariance = _fix_nonpositive_semidefinite_batch(covariance, self.columns)
+        return WindowStatistics(mu=mu, covariance=covariance, shrinkage=shrinkage)
+
+    def tail_statistics(self, num_prices: int) -> Tuple[pd.Series, pd.DataFrame]:
+        """
+        Statistics of the most recent num_prices rows
+
+        Intended for the daily "append one bar and re-optimize" workflow.
+        """
+        end = self.num_prices
+        stats = self.window_statistics([(max(end - num_prices, 0), end)])
+        return (pd.Series(stats.mu[0], index=self.columns),
+                pd.DataFrame(stats.covariance[0], index=self.columns, columns=self.columns))
+
+
+def _fix_nonpositive_semidefinite_batch(covariance: np.ndarray, columns: pd.Index) -> np.ndarray:
+    """pypfopt's spectral PSD repair, applied only to windows that need it"""
+    jitter = 1e-16 * np.eye(covariance.shape[-1])
+    try:
+        np.linalg.cholesky(covariance + jitter)
+        return covariance
+    except np.linalg.LinAlgError:
+        pass
+
+    fixed = covariance.copy()
+    for idx, matrix in enumerate(covariance):
+        frame = pd.DataFrame(matrix, index=columns, columns=columns)
+        fixed[idx] = fix_nonpositive_semidefinite(frame, fix_method="spectral").to_numpy()
+    return fixed
+
+
+def _contiguous_windows(periods_data: List[pd.DataFrame]) -> Optional[Tuple[pd.DataFrame, List[Tuple[int, int]]]]:
+    """
+    Recover the price history behind a list of period slices
+
+    Returns:
+        (prices, windows) when every period is a contiguous row slice of one
+        common price frame, otherwise None
+    """
+    columns = periods_data[0].columns
+    if any(not period.columns.equals(columns) or len(period) < 2 for period in periods_data):
+        return None
+
+    combined = pd.concat(periods_data)
+    prices = combined[~combined.index.duplicated(keep='first')]
+    if not prices.index.is_monotonic_increasing:
+        return None
+
+    windows = []
+    for period in periods_data:
+        start = prices.index.get_loc(period.index[0])
+        if not isinstance(start, (int, np.integer)):
+            return None
+        end = start + len(period)
+        candidate = prices.iloc[start:end]
+        if not candidate.index.equals(period.index) or not np.array_equal(
+                candidate.to_numpy(), period.to_numpy(), equal_nan=True):
+            return None
+        windows.append((int(start), int(end)))
+
+    return prices, windows
+
+
+def _exact_period_statistics(periods_data: List[pd.DataFrame], frequency: int) -> WindowStatistics:
+    """Per-window pypfopt estimates through the shared statistics cache"""
+    mu = np.array([mean_historical_return(period, frequency).to_numpy() for period in periods_data])
+    covariance = np.array([ledoit_wolf_covariance(period, frequency).to_numpy() for period in periods_data])
+    return WindowStatistics(mu=mu, covariance=covariance, shrinkage=np.full(len(periods_data), np.nan))
+
+
+def period_statistics(periods_data: List[pd.DataFrame],
+                      frequency: int = TRADING_DAYS_PER_YEAR) -> WindowStatistics:
+    """
+    Expected returns and Ledoit-Wolf covariances of every period
+
+    Overlapping periods from prepare_multi_period_data are served by one
+    RollingLedoitWolf pass; anything else (gaps, missing prices, mismatched
+    columns) falls back to the exact per-period estimators. Results are kept
+    in the shared statistics cache.
+
+    Args:
+        periods_data: Price data for each period
+        frequency: Periods per year used for annualization
+
+    Returns:
+        WindowStatistics in period order
+    """
+    key = ("period_statistics", tuple(price_fingerprint(period) for period in periods_data), frequency)
+
+    def compute() -> WindowStatistics:
+        layout = _contiguous_windows(periods_data)
+        if layout is not None:
+            prices, windows = layout
+            try:
+                return RollingLedoitWolf(prices, frequency).window_statistics(windows)
+            except ValueError:
+                pass
+        return _exact_period_statistics(periods_data, frequency)
+
+    return get_statistics_cache().get_or_compute(key, compute)
@@ -0,0 +1,218 @@
+"""
+IBM Runtime Execution Modes
+
+Standalone primitive jobs queue individually, so an iterative VQE pays the
+device queue on every optimizer step. Runtime execution modes avoid that:
+- session: jobs of one iterative workload run back-to-back on the device
+  once the first is scheduled (COBYLA/DE VQE loops),
+- batch: independent jobs are submitted together and scheduled as a group
+  (parameter sweeps, final sampling of several candidates),
+- job: the previous behaviour, every job queues on its own.
+
+An ExecutionAdapter owns the backend and the primitive options, which are
+configured once per opened execution. IBMRuntimeAdapter selects a device
+through QiskitRuntimeService; LocalExecutionAdapter runs the identical code
+path on a fake backend or Aer simulator through qiskit-ibm-runtime's local
+testing mode, where Session and Batch accept local backends.
+
+Submitted jobs are handed to the shared JobMonitor instead of being polled
+by the submitting thread. estimate_async/sample_async await the monitor's
+future, which is how hybrid_portfolio_opt.run_real_backend waits for its
+jobs; run_estimator/run_sampler block on it for synchronous callers.
+"""
+
+import asyncio
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Iterator, Optional, Union
+
+from job_monitor import JobFailedError, JobMonitor, get_job_monitor
+
+EXECUTION_MODES = ("session", "batch", "job")
+
+# Local jobs finish in milliseconds, so their monitor polls at a matching cadence
+_local_monitor = JobMonitor(min_interval=0.005, max_interval=0.1)
+
+
+@dataclass
+class PrimitiveOptions:
+    """Estimator and sampler options applied once per execution"""
+    estimator_shots: int = 1000
+    sampler_shots: int = 10000
+    dynamical_decoupling: bool = True
+    dd_sequence: str = "XY4"
+    twirling: bool = True
+    num_randomizations: Union[int, str] = "auto"
+
+    def configure(self, primitive, shots: int):
+        """Apply shots, dynamical decoupling and gate twirling to a V2 primitive"""
+        primitive.options.default_shots = shots
+        primitive.options.dynamical_decoupling.enable = self.dynamical_decoupling
+        if self.dynamical_decoupling:
+            primitive.options.dynamical_decoupling.sequence_type = self.dd_sequence
+        primitive.options.twirling.enable_gates = self.twirling
+        if self.twirling:
+            primitive.options.twirling.num_randomizations = self.num_randomizations
+        return primitive
+
+
+class RuntimeExecution:
+    """Estimator and sampler bound to one open session, batch or plain backend"""
+
+    def __init__(self, mode: str, estimator, sampler, label: str, monitor: Optional[JobMonitor] = None):
+        self.mode = mode
+        self.estimator = estimator
+        self.sampler = sampler
+        self.label = label
+        self.monitor = monitor or get_job_monitor()
+        self.estimator_jobs = 0
+        self.sampler_jobs = 0
+        self.job_ids = []
+
+    def _submitted(self, job, kind: str, number: int):
+        print(f'[LOG] [{self.label}] {kind} job id: {job.job_id()} (Job #{number}, mode: {self.mode})')
+        self.job_ids.append(job.job_id())
+        return self.monitor.submit(job)
+
+    def _failed(self, kind: str, error: JobFailedError) -> None:
+        print(f'[LOG] [{self.label}] {kind} job ended in {error.status} state. Job ID: {error.job_id}')
+
+    def submit_estimator(self, pubs):
+        """Submit estimator PUBs; the monitor's future resolves to the result"""
+        job = self.estimator.run(pubs)
+        self.estimator_jobs += 1
+        return self._submitted(job, 'Estimator', self.estimator_jobs)
+
+    def submit_sampler(self, pubs, shots: Optional[int] = None):
+        """Submit sampler PUBs; the monitor's future resolves to the result"""
+        job = self.sampler.run(pubs, shots=shots)
+        self.sampler_jobs += 1
+        return self._submitted(job, 'Sampler', self.sampler_jobs)
+
+    def run_estimator(self, pubs):
+        """Submit estimator PUBs and wait; None if the job failed"""
+        try:
+            return self.submit_estimator(pubs).result()
+        except JobFailedError as e:
+            self._failed('Estimator', e)
+            return None
+
+    def run_sampler(self, pubs, shots: Optional[int] = None):
+        """Submit sampler PUBs and wait; None if the job failed"""
+        try:
+            return self.submit_sampler(pubs, shots).result()
+        except JobFailedError as e:
+            self._failed('Sampler', e)
+            return None
+
+    async def estimate_async(self, pubs):
+        """Awaitable run_estimator"""
+        try:
+            return await asyncio.wrap_future(self.submit_estimator(pubs))
+        except JobFailedError as e:
+            self._failed('Estimator', e)
+            return None
+
+    async def sample_async(self, pubs, shots: Optional[int] = None):
+        """Awaitable run_sampler"""
+        try:
+            return await asyncio.wrap_future(self.submit_sampler(pubs, shots))
+        except JobFailedError as e:
+            self._failed('Sampler', e)
+            return None
+
+
+class ExecutionAdapter:
+    """Backend plus primitive options; opens runtime executions on it"""
+
+    label = 'Runtime'
+
+    def __init__(self, backend, options: Optional[PrimitiveOptions] = None,
+                 monitor: Optional[JobMonitor] = None):
+        """
+        Args:
+            backend: Runtime device, fake backend or Aer simulator
+            options: Primitive options, configured once per execution
+            monitor: Job monitor; the process-wide monitor if omitted
+        """
+        self.backend = backend
+        self.options = options or PrimitiveOptions()
+        self.monitor = monitor
+
+    @property
+    def backend_name(self) -> str:
+        return getattr(self.backend, 'name', str(self.backend))
+
+    def _execution_context(self, mode: str):
+        from qiskit_ibm_runtime import Batch, Session
+        if mode == "session":
+            return Session(backend=self.backend)
+        if mode == "batch":
+            return Batch(backend=self.backend)
+        return nullcontext(self.backend)
+
+    @contextmanager
+    def open(self, mode: str = "session") -> Iterator[RuntimeExecution]:
+        """
+        Open a session, batch or plain job context with configured primitives
+
+        Args:
+            mode: "session" for iterative workloads, "batch" for independent
+                evaluations, "job" for standalone jobs
+
+        Yields:
+            RuntimeExecution whose primitives submit into the opened mode
+        """
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"execution mode must be one of {EXECUTION_MODES}, got '{mode}'")
+        from qiskit_ibm_runtime import EstimatorV2 as Estimator, SamplerV2 as Sampler
+
+        with self._execution_context(mode) as execution_mode:
+            session_id = getattr(execution_mode, 'session_id', None)
+            print(f'[LOG] [{self.label}] Opened {mode} on {self.backend_name}'
+                  + (f' (id: {session_id})' if session_id else ''))
+            estimator = self.options.configure(Estimator(mode=execution_mode), self.options.estimator_shots)
+            sampler = self.options.configure(Sampler(mode=execution_mode), self.options.sampler_shots)
+            yield RuntimeExecution(mode, estimator, sampler, self.label, self.monitor)
+
+
+class IBMRuntimeAdapter(ExecutionAdapter):
+    """IBM Quantum device selected through QiskitRuntimeService"""
+
+    label = 'RealBackend'
+
+    @classmethod
+    def least_busy(cls, service=None, options: Optional[PrimitiveOptions] = None,
+                   **filters) -> 'IBMRuntimeAdapter':
+        """
+        Adapter for the least busy operational device
+
+        Args:
+            service: QiskitRuntimeService; the saved account is used if omitted
+            options: Primitive options
+            **filters: Passed to service.least_busy (e.g. min_num_qubits)
+        """
+        if service is None:
+            from qiskit_ibm_runtime import QiskitRuntimeService
+            service = QiskitRuntimeService()
+        return cls(service.least_busy(**filters), options)
+
+
+class LocalExecutionAdapter(ExecutionAdapter):
+    """Fake backend or Aer stand-in for the runtime path, via local testing mode"""
+
+    label = 'LocalRuntime'
+
+    def __init__(self, backend=None, options: Optional[PrimitiveOptions] = None,
+                 monitor: Optional[JobMonitor] = None):
+        """
+        Args:
+            backend: Fake backend (qiskit_ibm_runtime.fake_provider) or Aer simulator;
+                a noiseless AerSimulator if omitted
+            options: Primitive options
+            monitor: Job monitor; the process-wide monitor if omitted
+        """
+        if backend is None:
+            from qiskit_aer import AerSimulator
+            backend = AerSimulator()
+        super().__init__(backend, options, monitor or _local_monitor)
@@ -0,0 +1,256 @@
+"""
+Transpile-Once Helpers for Variational Circuits
+
+The ansatz structure is fixed for a whole optimization run; only parameter
+values change between cost evaluations. Running the pass manager on the
+unbound circuit once and handing the primitives (circuit, values) PUBs
+removes transpilation from the per-evaluation cost entirely. The laid-out
+Hamiltonian for estimator runs is likewise computed once from the
+transpiled circuit's layout.
+
+Across runs, TranspileCache keeps pass managers and ISA circuits keyed by
+ansatz structure, backend target and optimization level: an in-memory LRU
+backed by QPY files on disk (TRANSPILE_CACHE_DIR), so a restarted process
+serves its first request without transpiling again.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from qiskit import QuantumCircuit, qpy
+from qiskit.circuit import Gate, ParameterExpression
+from qiskit.circuit.library import get_standard_gate_name_mapping
+from qiskit.quantum_info import SparsePauliOp
+from qiskit.transpiler import generate_preset_pass_manager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRANSPILE_CACHE_SIZE = 64
+_STANDARD_GATES = frozenset(get_standard_gate_name_mapping())
+
+
+def transpile_parameterized(ansatz: QuantumCircuit, pass_manager) -> QuantumCircuit:
+    """
+    Transpile an unbound ansatz once
+
+    Args:
+        ansatz: Parameterized circuit
+        pass_manager: Preset pass manager for the target backend
+
+    Returns:
+        ISA circuit with the same parameters, ready for (circuit, values) PUBs
+
+    Raises:
+        ValueError: if transpilation dropped or renamed parameters, which
+            would shift the positional parameter values of every PUB
+    """
+    isa_circuit = pass_manager.run(ansatz)
+    if [p.name for p in isa_circuit.parameters] != [p.name for p in ansatz.parameters]:
+        raise ValueError("Transpilation changed the ansatz parameters; cannot bind values positionally")
+    return isa_circuit
+
+
+def laid_out_observable(hamiltonian: SparsePauliOp, isa_circuit: QuantumCircuit) -> SparsePauliOp:
+    """Hamiltonian mapped onto the physical qubits of a transpiled circuit"""
+    return hamiltonian.apply_layout(isa_circuit.layout)
+
+
+def sampler_pub(isa_circuit: QuantumCircuit, params) -> Tuple[QuantumCircuit, np.ndarray]:
+    """(circuit, parameter values) PUB for SamplerV2.run"""
+    return isa_circuit, np.asarray(params, dtype=float)
+
+
+def _parameter_token(param) -> str:
+    if isinstance(param, ParameterExpression):
+        return str(param)  # parameter names, or the symbolic expression
+    if isinstance(param, np.ndarray):
+        return hashlib.sha256(np.ascontiguousarray(param).tobytes()).hexdigest()
+    if isinstance(param, (int, float, complex, np.number)):
+        return repr(complex(param))
+    return repr(param)
+
+
+def _hash_instructions(circuit: QuantumCircuit, digest) -> None:
+    for instruction in circuit.data:
+        operation = instruction.operation
+        digest.update(operation.name.encode())
+        digest.update(repr([circuit.find_bit(q).index for q in instruction.qubits]).encode())
+        digest.update(repr([circuit.find_bit(c).index for c in instruction.clbits]).encode())
+        for param in operation.params:
+            digest.update(_parameter_token(param).encode())
+        # Composite gates (ansatz blocks, Pauli evolutions) carry their content in the definition
+        if isinstance(operation, Gate) and operation.name not in _STANDARD_GATES and operation.definition is not None:
+            digest.update(b"(")
+            _hash_instructions(operation.definition, digest)
+            digest.update(b")")
+
+
+def circuit_structure_hash(circuit: QuantumCircuit) -> str:
+    """
+    Content hash of a parameterized circuit
+
+    Parameters enter by name, so separately constructed but identical
+    ansätze (same qubits, reps, entanglement and coefficients) share a hash.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{circuit.num_qubits}:{circuit.num_clbits}".encode())
+    _hash_instructions(circuit, digest)
+    return digest.hexdigest()[:32]
+
+
+def backend_fingerprint(backend) -> str:
+    """
+    Hash of a backend's name, version and transpilation target
+
+    Covers the qubit count, supported operations and coupling map; Aer
+    targets change with the simulation method, so those are distinguished
+    too. Calibration drift within one backend version is not tracked.
+    """
+    target = backend.target
+    coupling_map = target.build_coupling_map()
+    edges = sorted(coupling_map.get_edges()) if coupling_map is not None else None
+    digest = hashlib.sha256()
+    digest.update(repr((getattr(backend, "name", type(backend).__name__),
+                        getattr(backend, "backend_version", None),
+                        target.num_qubits, sorted(target.operation_names), edges)).encode())
+    return digest.hexdigest()[:32]
+
+
+class TranspileCache:
+    """
+    Two-tier cache of preset pass managers and ISA circuits
+
+    Pass managers live in memory only. ISA circuits are kept in a
+    size-bounded, thread-safe LRU and, when a directory is configured,
+    written as QPY files that later processes load instead of transpiling.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_entries: int = DEFAULT_TRANSPILE_CACHE_SIZE):
+        """
+        Args:
+            directory: QPY cache directory (memory only when None)
+            max_entries: Circuits and pass managers kept in memory
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self._circuits: "OrderedDict[Tuple[str, str, int], QuantumCircuit]" = OrderedDict()
+        self._pass_managers: "OrderedDict[Tuple[str, int], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _remember(self, entries: OrderedDict, key, value) -> None:
+        with self._lock:
+            entries[key] = value
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def pass_manager(self, backend, optimization_level: int, fingerprint: Optional[str] = None):
+        """Preset pass manager for a backend target, built once per optimization level"""
+        key = (fingerprint or backend_fingerprint(backend), optimization_level)
+        with self._lock:
+            if key in self._pass_managers:
+                self._pass_managers.move_to_end(key)
+                return self._pass_managers[key]
+        pass_manager = generate_preset_pass_manager(backend=backend, optimization_level=optimization_level)
+        self._remember(self._pass_managers, key, pass_manager)
+        return pass_manager
+
+    def _path(self, key: Tuple[str, str, int]) -> Optional[str]:
+        if self.directory is None:
+            return None
+        circuit_hash, target_hash, optimization_level = key
+        return os.path.join(self.directory, f"isa_{circuit_hash}_{target_hash}_o{optimization_level}.qpy")
+
+    def _load(self, path: Optional[str]) -> Optional[QuantumCircuit]:
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                return qpy.load(f)[0]
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable transpile cache file {path}: {e}")
+            return None
+
+    def _store(self, path: Optional[str], circuit: QuantumCircuit) -> None:
+        if path is None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            partial_path = f"{path}.{os.getpid()}.partial"
+            with open(partial_path, "wb") as f:
+                qpy.dump(circuit, f)
+            os.replace(partial_path, path)  # readers never see a half-written file
+        except Exception as e:
+            logger.warning(f"Failed to write transpile cache file {path}: {e}")
+
+    def transpile(self, ansatz: QuantumCircuit, backend, optimization_level: int = 1) -> QuantumCircuit:
+        """
+        ISA version of a parameterized ansatz, transpiled at most once per key
+
+        Args:
+            ansatz: Unbound ansatz
+            backend: Target backend (name, version and target form the key)
+            optimization_level: Preset pass manager level
+
+        Returns:
+            Copy of the cached ISA circuit, with the ansatz parameters unbound
+        """
+        target_hash = backend_fingerprint(backend)
+        key = (circuit_structure_hash(ansatz), target_hash, optimization_level)
+        with self._lock:
+            cached = self._circuits.get(key)
+            if cached is not None:
+                self._circuits.move_to_end(key)
+                self.hits += 1
+                return cached.copy()
+
+        path = self._path(key)
+        isa_circuit = self._load(path)
+        if isa_circuit is not None and [p.name for p in isa_circuit.parameters] == [p.name for p in ansatz.parameters]:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            with self._lock:
+                self.misses += 1
+            isa_circuit = transpile_parameterized(ansatz, self.pass_manager(backend, optimization_level, target_hash))
+            self._store(path, isa_circuit)
+        self._remember(self._circuits, key, isa_circuit)
+        return isa_circuit.copy()
+
+    def clear(self) -> None:
+        """Drop the in-memory tier (QPY files are kept)"""
+        with self._lock:
+            self._circuits.clear()
+            self._pass_managers.clear()
+            self.hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "circuits": len(self._circuits),
+                "pass_managers": len(self._pass_managers),
+                "max_entries": self.max_entries,
+                "directory": self.directory,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses
+            }
+
+
+_transpile_cache = TranspileCache(os.getenv("TRANSPILE_CACHE_DIR"))
+
+
+def get_transpile_cache() -> TranspileCache:
+    """Get the process-wide transpile cache"""
+    return _transpile_cache
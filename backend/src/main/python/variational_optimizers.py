@@ -0,0 +1,514 @@
+"""
+Ask/Tell Variational Optimizers
+
+Differential evolution spends thousands of cost evaluations on a noisy
+VQE objective. The optimizers here are cheaper alternatives behind one
+ask/tell interface, so the caller decides how candidates are evaluated
+(a whole ask() batch becomes one sampler job) and every optimizer stops
+at the same evaluation budget:
+
+- "spsa": simultaneous perturbation stochastic approximation, a gradient
+  estimate from 2 evaluations per iteration whatever the parameter count
+  (Spall gains a_k = a/(k+1+A)^0.602, c_k = c/(k+1)^0.101; a is calibrated
+  from the mean magnitude of the first few gradient estimates so the first
+  step has a fixed size)
+- "cobyla", "nelder_mead": scipy.optimize.minimize driven point by point
+  from a helper thread
+- "parameter_shift": gradient descent on parameter-shift gradients; each
+  iteration evaluates the current point and its 2n shifted copies as one
+  batch. The rule is exact for ansätze whose parameters each enter a
+  single Pauli rotation (RealAmplitudes), and a finite-difference estimate
+  otherwise.
+- "bayesian": Gaussian-process surrogate (scikit-learn) with expected
+  improvement; every round fits the GP to all evaluations so far and
+  proposes a batch of points (kriging believer: each pick is added to the
+  model at its predicted mean before the next), submitted as one job.
+  For hardware runs where an evaluation costs minutes, the model's cost
+  is negligible and far fewer jobs are needed.
+
+Results are scipy OptimizeResult objects (x, fun, nfev, nit) holding the
+best evaluated point. run_ask_tell drives an optimizer with a blocking
+objective; run_ask_tell_async awaits a coroutine objective, so runtime
+jobs are waited for on the event loop instead of in a thread, while the
+optimizer's own steps (GP fits, scipy handoffs) run in a worker thread.
+"""
+
+import abc
+import asyncio
+import queue
+import threading
+import warnings
+from typing import Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.optimize import OptimizeResult, minimize
+
+
+class AskTellOptimizer(abc.ABC):
+    """Optimizer that proposes batches of points and is told their costs"""
+
+    name = "ask_tell"
+
+    def __init__(self, x0, max_evaluations: int):
+        """
+        Args:
+            x0: Starting parameters
+            max_evaluations: Cost evaluations after which the optimizer is done
+        """
+        self.x = np.array(x0, dtype=float)
+        self.max_evaluations = max_evaluations
+        self.evaluations = 0
+        self.iterations = 0
+        self.best_x = self.x.copy()
+        self.best_fun = np.inf
+        self.message = "Evaluation budget exhausted"
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.max_evaluations - self.evaluations)
+
+    @property
+    def done(self) -> bool:
+        return self.remaining == 0
+
+    @abc.abstractmethod
+    def ask(self) -> np.ndarray:
+        """
+        Returns:
+            Points to evaluate next, shape (k, num_params); empty once done
+        """
+
+    def tell(self, points: np.ndarray, values: np.ndarray) -> None:
+        """Costs of the points returned by the last ask()"""
+        values = np.asarray(values, dtype=float)
+        self.evaluations += len(values)
+        if not np.isfinite(values).any():
+            return
+        best = int(np.nanargmin(np.where(np.isfinite(values), values, np.nan)))
+        if values[best] < self.best_fun:
+            self.best_fun = float(values[best])
+            self.best_x = np.array(points[best], dtype=float)
+
+    def close(self) -> None:
+        """Release resources held between ask() and tell()"""
+
+    def result(self) -> OptimizeResult:
+        return OptimizeResult(x=self.best_x, fun=self.best_fun, nfev=self.evaluations, nit=self.iterations,
+                              success=np.isfinite(self.best_fun), message=self.message, optimizer=self.name)
+
+    def _empty(self) -> np.ndarray:
+        return np.empty((0, len(self.x)))
+
+
+class SPSA(AskTellOptimizer):
+    """Simultaneous perturbation stochastic approximation, 2 evaluations per iteration"""
+
+    name = "spsa"
+
+    def __init__(self, x0, max_evaluations: int, learning_rate: Optional[float] = None,
+                 perturbation: float = 0.1, target_step: float = 0.2, alpha: float = 0.602,
+                 gamma: float = 0.101, stability: Optional[float] = None, calibration_steps: int = 5,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            learning_rate: Gain a; calibrated from the first gradient estimates if None
+            perturbation: Gain c of the perturbation size
+            target_step: Size of the first step when calibrating a
+            alpha, gamma: Decay exponents of the step and perturbation sizes
+            stability: Offset A of the step decay; 10% of the iterations if None
+            calibration_steps: Gradient estimates averaged to calibrate a (no steps are taken meanwhile)
+            seed: Seed of the ±1 perturbation directions
+        """
+        super().__init__(x0, max_evaluations)
+        self.learning_rate = learning_rate
+        self.perturbation = perturbation
+        self.target_step = target_step
+        self.alpha = alpha
+        self.gamma = gamma
+        self.stability = 0.1 * max_evaluations / 2 if stability is None else stability
+        self.calibration_steps = max(1, calibration_steps)
+        self.rng = np.random.default_rng(seed)
+        self._delta = None
+        self._calibration: list = []
+
+    def ask(self) -> np.ndarray:
+        if self.remaining < 2:
+            return self._empty()
+        ck = self.perturbation / (self.iterations + 1) ** self.gamma
+        self._delta = self.rng.choice([-1.0, 1.0], size=len(self.x))
+        return np.stack([self.x + ck * self._delta, self.x - ck * self._delta])
+
+    def tell(self, points: np.ndarray, values: np.ndarray) -> None:
+        super().tell(points, values)
+        ck = self.perturbation / (self.iterations + 1) ** self.gamma
+        gradient = (values[0] - values[1]) / (2 * ck) * self._delta
+        if self.learning_rate is None:
+            self._calibration.append(float(np.mean(np.abs(gradient))))
+            if len(self._calibration) < self.calibration_steps:
+                self.iterations += 1
+                return
+            magnitude = float(np.mean(self._calibration)) or 1.0
+            self.learning_rate = self.target_step * (self.stability + 1) ** self.alpha / magnitude
+        ak = self.learning_rate / (self.iterations + 1 + self.stability) ** self.alpha
+        self.x = self.x - ak * gradient
+        self.iterations += 1
+
+
+class ParameterShiftGradientDescent(AskTellOptimizer):
+    """Gradient descent on parameter-shift gradients, one batch of 2n+1 points per iteration"""
+
+    name = "parameter_shift"
+
+    def __init__(self, x0, max_evaluations: int, learning_rate: float = 0.1, shift: float = np.pi / 2,
+                 momentum: float = 0.0, tolerance: float = 1e-6):
+        """
+        Args:
+            learning_rate: Step size along the negative gradient
+            shift: Parameter shift s; the gradient is (f(x+s) - f(x-s)) / (2 sin s)
+            momentum: Heavy-ball momentum of the steps
+            tolerance: Stop once the gradient norm falls below this
+        """
+        super().__init__(x0, max_evaluations)
+        self.learning_rate = learning_rate
+        self.shift = shift
+        self.momentum = momentum
+        self.tolerance = tolerance
+        self._velocity = np.zeros_like(self.x)
+        self._converged = False
+
+    @property
+    def done(self) -> bool:
+        return self._converged or self.remaining < 2 * len(self.x) + 1
+
+    def ask(self) -> np.ndarray:
+        if self.done:
+            return self._empty()
+        shifts = self.shift * np.eye(len(self.x))
+        return np.vstack([self.x[None, :], self.x + shifts, self.x - shifts])
+
+    def tell(self, points: np.ndarray, values: np.ndarray) -> None:
+        super().tell(points, values)
+        n = len(self.x)
+        gradient = (values[1:n + 1] - values[n + 1:]) / (2 * np.sin(self.shift))
+        if np.linalg.norm(gradient) < self.tolerance:
+            self._converged = True
+            self.message = "Gradient norm below tolerance"
+        self._velocity = self.momentum * self._velocity - self.learning_rate * gradient
+        self.x = self.x + self._velocity
+        self.iterations += 1
+
+
+class _Stop(Exception):
+    """Raised inside the scipy thread when the driver stops asking"""
+
+
+class ScipyAskTell(AskTellOptimizer):
+    """
+    scipy.optimize.minimize turned inside out
+
+    minimize runs in a helper thread; each cost call hands its point to
+    ask() and blocks until tell() returns the value.
+    """
+
+    method = ""
+
+    def __init__(self, x0, max_evaluations: int, bounds: Optional[Sequence[Tuple[float, float]]] = None,
+                 options: Optional[dict] = None):
+        """
+        Args:
+            bounds: Parameter bounds passed to scipy
+            options: Extra scipy method options
+        """
+        super().__init__(x0, max_evaluations)
+        self.bounds = bounds
+        self.options = dict(options or {})
+        self._points: queue.Queue = queue.Queue(maxsize=1)
+        self._values: queue.Queue = queue.Queue(maxsize=1)
+        self._thread: Optional[threading.Thread] = None
+        self._finished = False
+        self._scipy_result = None
+
+    @abc.abstractmethod
+    def _budget_options(self) -> dict:
+        """scipy options that stop the method within max_evaluations"""
+
+    def _objective(self, x: np.ndarray) -> float:
+        if self.remaining == 0:
+            raise _Stop()
+        self._points.put(np.array(x, dtype=float))
+        value = self._values.get()
+        if value is None:
+            raise _Stop()
+        return value
+
+    def _run(self) -> None:
+        try:
+            self._scipy_result = minimize(self._objective, self.x, method=self.method, bounds=self.bounds,
+                                          options={**self._budget_options(), **self.options})
+        except _Stop:
+            pass
+        finally:
+            self._points.put(None)
+
+    @property
+    def done(self) -> bool:
+        return self._finished or self.remaining == 0
+
+    def ask(self) -> np.ndarray:
+        if self.done:
+            return self._empty()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-ask-tell", daemon=True)
+            self._thread.start()
+        point = self._points.get()
+        if point is None:
+            self._finished = True
+            if self._scipy_result is not None:
+                self.message = str(self._scipy_result.message)
+            return self._empty()
+        return point[None, :]
+
+    def tell(self, points: np.ndarray, values: np.ndarray) -> None:
+        super().tell(points, values)
+        self.iterations = self.evaluations
+        self._values.put(float(values[0]))
+
+    def close(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            return
+        # Unblock a pending cost call (or the final sentinel) and let minimize unwind
+        while self._thread.is_alive():
+            try:
+                self._values.put_nowait(None)
+            except queue.Full:
+                pass
+            try:
+                self._points.get(timeout=0.01)
+            except queue.Empty:
+                pass
+        self._finished = True
+
+
+class COBYLA(ScipyAskTell):
+    """Constrained optimization by linear approximation, one evaluation per step"""
+
+    name = "cobyla"
+    method = "COBYLA"
+
+    def _budget_options(self) -> dict:
+        return {'maxiter': self.max_evaluations}
+
+
+class NelderMead(ScipyAskTell):
+    """Downhill simplex, one evaluation per step"""
+
+    name = "nelder_mead"
+    method = "Nelder-Mead"
+
+    def _budget_options(self) -> dict:
+        return {'maxfev': self.max_evaluations, 'adaptive': len(self.x) > 10}
+
+
+class BayesianOptimizer(AskTellOptimizer):
+    """Gaussian-process expected-improvement search, one batch of points per round"""
+
+    name = "bayesian"
+
+    def __init__(self, x0, max_evaluations: int, bounds: Optional[Sequence[Tuple[float, float]]] = None,
+                 batch_size: int = 4, initial_points: Optional[int] = None, num_candidates: int = 2000,
+                 exploration: float = 0.01, seed: Optional[int] = None):
+        """
+        Args:
+            bounds: Search box; [0, 2π] per parameter if None
+            batch_size: Points proposed per round
+            initial_points: Size of the first (space-filling) batch, x0 included;
+                max(batch_size, num_params + 1) if None
+            num_candidates: Random candidates scored by expected improvement per pick
+            exploration: Improvement margin ξ of the acquisition, relative to the cost spread
+            seed: Seed of the initial design and candidates
+        """
+        super().__init__(x0, max_evaluations)
+        n = len(self.x)
+        box = np.asarray(bounds if bounds is not None else [(0.0, 2 * np.pi)] * n, dtype=float)
+        self.low, self.high = box[:, 0], box[:, 1]
+        self.batch_size = max(1, batch_size)
+        self.initial_points = initial_points or max(self.batch_size, n + 1)
+        self.num_candidates = num_candidates
+        self.exploration = exploration
+        self.rng = np.random.default_rng(seed)
+        self._observed_x: list = []
+        self._observed_y: list = []
+
+    def _to_unit(self, points: np.ndarray) -> np.ndarray:
+        return (points - self.low) / (self.high - self.low)
+
+    def _from_unit(self, points: np.ndarray) -> np.ndarray:
+        return self.low + points * (self.high - self.low)
+
+    def _initial_design(self, size: int) -> np.ndarray:
+        from scipy.stats import qmc
+        design = qmc.LatinHypercube(d=len(self.x), seed=self.rng).random(max(size - 1, 1))[:size - 1]
+        return np.vstack([np.clip(self._to_unit(self.x), 0, 1)[None, :], design])
+
+    def _surrogate(self):
+        from sklearn.gaussian_process import GaussianProcessRegressor
+        from sklearn.gaussian_process.kernels import ConstantKernel, Matern, WhiteKernel
+        n = len(self.x)
+        kernel = (ConstantKernel(1.0, (1e-3, 1e3)) * Matern(np.full(n, 0.5), (1e-2, 1e1), nu=2.5)
+                  + WhiteKernel(1e-2, (1e-6, 1e0)))
+        return GaussianProcessRegressor(kernel, normalize_y=True, n_restarts_optimizer=1,
+                                        random_state=int(self.rng.integers(2 ** 31)))
+
+    def _candidates(self, best: np.ndarray) -> np.ndarray:
+        # Half spread over the box, half refining around the best point
+        n = len(self.x)
+        uniform = self.rng.random((self.num_candidates // 2, n))
+        local = best + self.rng.normal(0.0, 0.05, (self.num_candidates - len(uniform), n))
+        return np.clip(np.vstack([uniform, local]), 0, 1)
+
+    @staticmethod
+    def expected_improvement(mean: np.ndarray, std: np.ndarray, best: float, margin: float) -> np.ndarray:
+        """EI of a minimization: E[max(best - margin - f, 0)] under N(mean, std²)"""
+        from scipy.stats import norm
+        std = np.maximum(std, 1e-12)
+        improvement = best - margin - mean
+        z = improvement / std
+        return improvement * norm.cdf(z) + std * norm.pdf(z)
+
+    def ask(self) -> np.ndarray:
+        if self.done:
+            return self._empty()
+        if not self._observed_y:
+            return self._from_unit(self._initial_design(min(self.initial_points, self.remaining)))
+
+        from sklearn.exceptions import ConvergenceWarning
+        x_seen = self._to_unit(np.array(self._observed_x))
+        y_seen = np.array(self._observed_y)
+        with warnings.catch_warnings():
+            # Hyperparameters at their bounds are expected for nearly flat or noise-free costs
+            warnings.simplefilter("ignore", ConvergenceWarning)
+            model = self._surrogate().fit(x_seen, y_seen)
+        # Refits while fantasizing keep the fitted hyperparameters
+        believer = self._surrogate().set_params(kernel=model.kernel_, optimizer=None)
+        best_y = float(y_seen.min())
+        margin = self.exploration * float(np.ptp(y_seen) or 1.0)
+        candidates = self._candidates(x_seen[np.argmin(y_seen)])
+
+        batch = []
+        x_model, y_model = x_seen, y_seen
+        for _ in range(min(self.batch_size, self.remaining)):
+            mean, std = model.predict(candidates, return_std=True)
+            pick = int(np.argmax(self.expected_improvement(mean, std, best_y, margin)))
+            batch.append(candidates[pick])
+            x_model = np.vstack([x_model, candidates[pick]])
+            y_model = np.append(y_model, mean[pick])
+            candidates = np.delete(candidates, pick, axis=0)
+            model = believer.fit(x_model, y_model)
+        return self._from_unit(np.array(batch))
+
+    def tell(self, points: np.ndarray, values: np.ndarray) -> None:
+        super().tell(points, values)
+        for point, value in zip(points, np.asarray(values, dtype=float)):
+            if np.isfinite(value):
+                self._observed_x.append(np.array(point, dtype=float))
+                self._observed_y.append(float(value))
+        self.iterations += 1
+
+
+OPTIMIZERS: Dict[str, type] = {
+    SPSA.name: SPSA,
+    COBYLA.name: COBYLA,
+    NelderMead.name: NelderMead,
+    ParameterShiftGradientDescent.name: ParameterShiftGradientDescent,
+    BayesianOptimizer.name: BayesianOptimizer
+}
+
+
+def create_optimizer(name: str, x0, max_evaluations: int,
+                     bounds: Optional[Sequence[Tuple[float, float]]] = None,
+                     seed: Optional[int] = None, **options) -> AskTellOptimizer:
+    """
+    Registered optimizer by name
+
+    Args:
+        name: Key of OPTIMIZERS
+        x0: Starting parameters
+        max_evaluations: Evaluation budget
+        bounds: Parameter bounds (scipy methods and the Bayesian search box;
+            rotation angles are periodic for the gradient methods)
+        seed: Random seed (SPSA and Bayesian)
+        options: Optimizer-specific keyword arguments
+
+    Raises:
+        ValueError: For an unknown optimizer name
+    """
+    if name not in OPTIMIZERS:
+        raise ValueError(f"optimizer must be one of {tuple(OPTIMIZERS)}, got '{name}'")
+    optimizer_class = OPTIMIZERS[name]
+    if issubclass(optimizer_class, ScipyAskTell):
+        return optimizer_class(x0, max_evaluations, bounds=bounds, options=options)
+    if optimizer_class is BayesianOptimizer:
+        options.setdefault('bounds', bounds)
+    if optimizer_class in (SPSA, BayesianOptimizer):
+        options.setdefault('seed', seed)
+    return optimizer_class(x0, max_evaluations, **options)
+
+
+def run_ask_tell(optimizer: AskTellOptimizer, objective: Callable[[np.ndarray], np.ndarray],
+                 callback: Optional[Callable[[], bool]] = None) -> OptimizeResult:
+    """
+    Drive an optimizer until it is done
+
+    Args:
+        optimizer: Ask/tell optimizer
+        objective: Costs of a (k, num_params) batch of points
+        callback: Called after every tell(); returning True stops early
+
+    Returns:
+        OptimizeResult of the best evaluated point
+    """
+    try:
+        while not optimizer.done:
+            points = optimizer.ask()
+            if len(points) == 0:
+                break
+            optimizer.tell(points, np.asarray(objective(points), dtype=float))
+            if callback is not None and callback():
+                optimizer.message = "Stopped by callback"
+                break
+    finally:
+        optimizer.close()
+    return optimizer.result()
+
+
+async def run_ask_tell_async(optimizer: AskTellOptimizer,
+                             objective: Callable[[np.ndarray], Awaitable[np.ndarray]],
+                             callback: Optional[Callable[[], bool]] = None) -> OptimizeResult:
+    """
+    run_ask_tell with an awaitable objective
+
+    ask(), tell() and close() can block (a Bayesian ask fits the GP, scipy
+    optimizers wait on their minimize thread), so they run in a worker
+    thread and the event loop stays free while the optimizer computes.
+
+    Args:
+        optimizer: Ask/tell optimizer
+        objective: Coroutine function returning the costs of a (k, num_params) batch
+        callback: Called after every tell(); returning True stops early
+
+    Returns:
+        OptimizeResult of the best evaluated point
+    """
+    try:
+        while not optimizer.done:
+            points = await asyncio.to_thread(optimizer.ask)
+            if len(points) == 0:
+                break
+            values = np.asarray(await objective(points), dtype=float)
+            await asyncio.to_thread(optimizer.tell, points, values)
+            if callback is not None and callback():
+                optimizer.message = "Stopped by callback"
+                break
+    finally:
+        await asyncio.to_thread(optimizer.close)
+    return optimizer.result()
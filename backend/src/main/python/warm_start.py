@@ -0,0 +1,230 @@
+"""
+Warm-Start Parameter Store
+
+Re-optimizing nearly the same portfolio every day should not restart the
+variational search from random angles. WarmStartStore records optimized
+ansatz parameters per problem and returns the parameters of the most
+similar recorded problems.
+
+Problems are grouped by an ansatz key (qubit count, ansatz type, reps and
+parameter count), since parameters only transfer between identical
+circuits. Within a group, problems are compared by a coefficient
+signature: the Ising fields h_i and couplings J_ij of the diagonal
+Hamiltonian as one vector scaled to unit length, so an overall rescaling
+of the QUBO does not change it. Lookup is a nearest-neighbour search by
+Euclidean distance between signatures, limited to max_distance.
+
+Entries live in memory; with a directory (WARM_START_DIR) each ansatz key
+is also persisted as a JSON file, so warm starts survive restarts.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+from qiskit.quantum_info import SparsePauliOp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_DISTANCE = 0.2
+
+# Signatures closer than this describe the same problem; the newer parameters replace the older
+SAME_PROBLEM_DISTANCE = 1e-6
+
+
+@dataclass
+class WarmStart:
+    """Recorded parameters of a similar problem"""
+    parameters: np.ndarray
+    distance: float
+    objective: Optional[float] = None
+
+
+def ansatz_key(ansatz) -> str:
+    """Group key of circuits whose parameters are interchangeable"""
+    reps = getattr(ansatz, 'reps', None)
+    return f"{ansatz.num_qubits}q_{ansatz.name}_r{reps}_p{ansatz.num_parameters}".replace(" ", "")
+
+
+def problem_signature(hamiltonian: SparsePauliOp) -> np.ndarray:
+    """
+    Normalized coefficient vector of a diagonal Ising Hamiltonian
+
+    Returns:
+        Fields h followed by the upper-triangle couplings J (row-major),
+        scaled to unit Euclidean norm; constant terms are ignored
+    """
+    num_qubits = hamiltonian.num_qubits
+    z = np.asarray(hamiltonian.paulis.z)
+    coeffs = np.real(np.asarray(hamiltonian.coeffs))
+    weights = z.sum(axis=1)
+
+    fields = np.zeros(num_qubits)
+    single = weights == 1
+    np.add.at(fields, np.argmax(z[single], axis=1), coeffs[single])
+
+    couplings = np.zeros((num_qubits, num_qubits))
+    pair = weights == 2
+    if pair.any():
+        first = np.argmax(z[pair], axis=1)
+        second = num_qubits - 1 - np.argmax(z[pair][:, ::-1], axis=1)
+        np.add.at(couplings, (first, second), coeffs[pair])
+
+    signature = np.concatenate([fields, couplings[np.triu_indices(num_qubits, 1)]])
+    norm = np.linalg.norm(signature)
+    return signature / norm if norm > 0 else signature
+
+
+class WarmStartStore:
+    """Optimized parameters by ansatz key, searched by problem signature"""
+
+    def __init__(self, directory: Optional[str] = None, max_entries: int = 256,
+                 max_distance: float = DEFAULT_MAX_DISTANCE):
+        """
+        Args:
+            directory: Persist entries here as one JSON file per ansatz key
+            max_entries: Entries kept per ansatz key; the oldest are dropped
+            max_distance: Largest signature distance considered similar
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self._entries: Dict[str, List[dict]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"warm_start_{key}.json")
+
+    def _load(self, key: str) -> List[dict]:
+        if key in self._entries:
+            return self._entries[key]
+        entries = []
+        if self.directory and os.path.exists(self._path(key)):
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    entries = [{
+                        'signature': np.asarray(entry['signature'], dtype=float),
+                        'parameters': np.asarray(entry['parameters'], dtype=float),
+                        'objective': entry.get('objective'),
+                        'updated_at': entry.get('updated_at', 0.0)
+                    } for entry in json.load(f)]
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable warm-start file {self._path(key)}: {e}")
+                entries = []
+        self._entries[key] = entries
+        return entries
+
+    def _save(self, key: str, entries: List[dict]) -> None:
+        if not self.directory:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            partial = f"{self._path(key)}.{os.getpid()}.partial"
+            with open(partial, 'w', encoding='utf-8') as f:
+                json.dump([{
+                    'signature': entry['signature'].tolist(),
+                    'parameters': entry['parameters'].tolist(),
+                    'objective': entry['objective'],
+                    'updated_at': entry['updated_at']
+                } for entry in entries], f)
+            os.replace(partial, self._path(key))
+        except OSError as e:
+            logger.warning(f"Could not persist warm starts for {key}: {e}")
+
+    def lookup(self, ansatz, hamiltonian: SparsePauliOp, k: int = 1) -> List[WarmStart]:
+        """
+        Parameters of the k most similar recorded problems
+
+        Returns:
+            Up to k warm starts within max_distance, nearest first
+        """
+        key = ansatz_key(ansatz)
+        signature = problem_signature(hamiltonian)
+        with self._lock:
+            entries = [entry for entry in self._load(key) if len(entry['signature']) == len(signature)]
+            if not entries:
+                self.misses += 1
+                return []
+            distances = np.linalg.norm(np.stack([entry['signature'] for entry in entries]) - signature, axis=1)
+            order = [i for i in np.argsort(distances, kind='stable')[:k] if distances[i] <= self.max_distance]
+            if not order:
+                self.misses += 1
+                return []
+            self.hits += 1
+            return [WarmStart(entries[i]['parameters'].copy(), float(distances[i]), entries[i]['objective'])
+                    for i in order]
+
+    def record(self, ansatz, hamiltonian: SparsePauliOp, parameters, objective: Optional[float] = None) -> None:
+        """Store optimized parameters, replacing an entry for the same problem"""
+        parameters = np.asarray(parameters, dtype=float)
+        if len(parameters) != ansatz.num_parameters or not np.all(np.isfinite(parameters)):
+            return
+        key = ansatz_key(ansatz)
+        signature = problem_signature(hamiltonian)
+        entry = {
+            'signature': signature,
+            'parameters': parameters.copy(),
+            'objective': None if objective is None else float(objective),
+            'updated_at': time.time()
+        }
+        with self._lock:
+            entries = [existing for existing in self._load(key)
+                       if len(existing['signature']) != len(signature)
+                       or np.linalg.norm(existing['signature'] - signature) > SAME_PROBLEM_DISTANCE]
+            entries.append(entry)
+            entries = entries[-self.max_entries:]
+            self._entries[key] = entries
+            self._save(key, entries)
+
+    def clear(self) -> None:
+        """Forget the in-memory entries (files are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> Dict[str, object]:
+        return {
+            'keys': len(self._entries),
+            'entries': sum(len(entries) for entries in self._entries.values()),
+            'directory': self.directory,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+def seeded_population(warm_starts: List[WarmStart], size: int, num_parameters: int,
+                      rng: np.random.Generator, low: float = 0.0, high: float = 2 * np.pi,
+                      perturbed_fraction: float = 0.25, spread: float = 0.05) -> np.ndarray:
+    """
+    DE initial population around warm starts
+
+    The warm starts come first, then perturbations of the nearest one
+    (Gaussian, spread relative to the bounds), and uniform random members
+    for the rest so the population keeps its diversity.
+
+    Returns:
+        Array of shape (size, num_parameters) within [low, high]
+    """
+    population = rng.uniform(low, high, (size, num_parameters))
+    seeds = [start.parameters for start in warm_starts][:size]
+    for i, parameters in enumerate(seeds):
+        population[i] = parameters
+    if seeds:
+        num_perturbed = min(size - len(seeds), int(round(perturbed_fraction * size)))
+        noise = rng.normal(0.0, spread * (high - low), (num_perturbed, num_parameters))
+        population[len(seeds):len(seeds) + num_perturbed] = seeds[0] + noise
+    return np.clip(population, low, high)
+
+
+_warm_start_store = WarmStartStore(os.getenv("WARM_START_DIR"))
+
+
+def get_warm_start_store() -> WarmStartStore:
+    """Process-wide warm-start store (persisted when WARM_START_DIR is set)"""
+    return _warm_start_store
@@ -0,0 +1,275 @@
+"""
+Tests for the vectorized dynamic QUBO assembly in enhanced_dynamic_portfolio_opt.py
+
+The reference builder below is the original per-(asset, asset, bit, bit) loop
+formulation. The vectorized builder must reproduce it up to floating-point
+rounding (objective weights are applied to cached unit-weight components, so
+the last bits may differ), and the scaling benchmark reports how much faster
+it is.
+
+Run the benchmark on its own with:
+    python -m pytest test_dynamic_qubo_assembly.py -m performance -s
+"""
+
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from pypfopt import expected_returns
+from pypfopt.risk_models import CovarianceShrinkage
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+import enhanced_dynamic_portfolio_opt
+from enhanced_dynamic_portfolio_opt import (
+    DynamicOptimizationConfig,
+    OptimizationObjective,
+    _get_qubit_index,
+    _period_qubit_indices,
+    build_dynamic_qubo,
+    build_qubo_components,
+    calculate_total_qubits,
+    dynamic_quantum_sweep,
+    get_qubo_components,
+    prepare_multi_period_data
+)
+
+
+def generate_prices(num_assets: int, days: int, seed: int = 7) -> pd.DataFrame:
+    """Correlated geometric random walk prices (dates × assets)"""
+    rng = np.random.default_rng(seed)
+    mixing = rng.normal(0, 1, (num_assets, num_assets)) / np.sqrt(num_assets)
+    returns = rng.normal(0.0005, 0.01, (days, num_assets)) @ mixing
+    dates = pd.date_range('2023-01-01', periods=days, freq='D')
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=dates,
+                        columns=[f"A{i}" for i in range(num_assets)])
+
+
+def assert_qubo_equal(actual, expected):
+    """Equal up to accumulated rounding of the weighted component sum"""
+    np.testing.assert_allclose(actual, expected, rtol=1e-12, atol=1e-12)
+
+
+def reference_build_dynamic_qubo(periods_data, config, previous_allocation=None):
+    """Original loop-based QUBO builder, kept as the correctness oracle"""
+    num_assets = periods_data[0].shape[1]
+    num_periods = len(periods_data)
+    total_qubits = calculate_total_qubits(num_assets, num_periods, config)
+    linear = np.zeros(total_qubits)
+    quadratic = np.zeros((total_qubits, total_qubits))
+    max_value = (2 ** config.bit_resolution) - 1
+
+    for period_idx, period_prices in enumerate(periods_data):
+        mu = expected_returns.mean_historical_return(period_prices)
+        for asset_idx in range(num_assets):
+            for bit_idx in range(config.bit_resolution):
+                qubit_idx = _get_qubit_index(asset_idx, period_idx, bit_idx, config, num_periods)
+                linear[qubit_idx] -= mu.iloc[asset_idx] * (2 ** bit_idx / max_value)
+
+    for period_idx, period_prices in enumerate(periods_data):
+        S = CovarianceShrinkage(period_prices).ledoit_wolf()
+        for i in range(num_assets):
+            for j in range(num_assets):
+                for bit_i in range(config.bit_resolution):
+                    for bit_j in range(config.bit_resolution):
+                        qubit_i = _get_qubit_index(i, period_idx, bit_i, config, num_periods)
+                        qubit_j = _get_qubit_index(j, period_idx, bit_j, config, num_periods)
+                        risk_coeff = config.risk_aversion * S.iloc[i, j] * (2 ** bit_i / max_value) * (2 ** bit_j / max_value)
+                        if i == j and bit_i == bit_j:
+                            linear[qubit_i] += risk_coeff
+                        else:
+                            quadratic[qubit_i, qubit_j] += risk_coeff / 2
+
+    if previous_allocation is not None and num_periods > 1:
+        for period_idx in range(1, num_periods):
+            for asset_idx in range(len(previous_allocation)):
+                for bit_idx in range(config.bit_resolution):
+                    qubit_idx = _get_qubit_index(asset_idx, period_idx, bit_idx, config, num_periods)
+                    linear[qubit_idx] += config.transaction_fee * previous_allocation[asset_idx]
+
+    for period_idx in range(num_periods):
+        for asset_i in range(num_assets):
+            for asset_j in range(num_assets):
+                for bit_i in range(config.bit_resolution):
+                    for bit_j in range(config.bit_resolution):
+                        qubit_i = _get_qubit_index(asset_i, period_idx, bit_i, config, num_periods)
+                        qubit_j = _get_qubit_index(asset_j, period_idx, bit_j, config, num_periods)
+                        weight_i = 2 ** bit_i / max_value
+                        weight_j = 2 ** bit_j / max_value
+                        if asset_i == asset_j and bit_i == bit_j:
+                            linear[qubit_i] += config.restriction_coefficient * weight_i * (weight_i - 2)
+                        else:
+                            quadratic[qubit_i, qubit_j] += config.restriction_coefficient * weight_i * weight_j / 2
+
+    return linear, quadratic, total_qubits
+
+
+class TestVectorizedQuboAssembly:
+    """The vectorized builder must agree with the loop builder term for term."""
+
+    @pytest.mark.parametrize("num_assets,num_periods,bits", [
+        (2, 2, 1),
+        (3, 3, 2),
+        (4, 2, 3),
+        (5, 4, 4),
+    ])
+    def test_matches_loop_builder(self, num_assets, num_periods, bits):
+        config = DynamicOptimizationConfig(num_time_steps=num_periods, rebalance_frequency_days=15,
+                                           bit_resolution=bits, risk_aversion=750.0,
+                                           restriction_coefficient=1.7)
+        prices = generate_prices(num_assets, 15 * (num_periods + 1))
+        periods_data = prepare_multi_period_data(prices, config)
+
+        linear, quadratic, total_qubits = build_dynamic_qubo(periods_data, config)
+        ref_linear, ref_quadratic, ref_total = reference_build_dynamic_qubo(periods_data, config)
+
+        assert total_qubits == ref_total
+        assert_qubo_equal(linear, ref_linear)
+        assert_qubo_equal(quadratic, ref_quadratic)
+
+    def test_matches_loop_builder_with_transaction_costs(self):
+        config = DynamicOptimizationConfig(num_time_steps=3, rebalance_frequency_days=10,
+                                           bit_resolution=2, transaction_fee=0.03)
+        prices = generate_prices(3, 40)
+        periods_data = prepare_multi_period_data(prices, config)
+        previous_allocation = np.array([0.5, 0.3, 0.2])
+
+        linear, quadratic, _ = build_dynamic_qubo(periods_data, config, previous_allocation)
+        ref_linear, ref_quadratic, _ = reference_build_dynamic_qubo(periods_data, config, previous_allocation)
+
+        assert_qubo_equal(linear, ref_linear)
+        assert_qubo_equal(quadratic, ref_quadratic)
+
+    def test_period_qubit_indices_match_scalar_index(self):
+        config = DynamicOptimizationConfig(bit_resolution=3)
+        num_assets, num_periods = 4, 5
+        period_qubits = _period_qubit_indices(num_assets, num_periods, config)
+
+        assert period_qubits.shape == (num_periods, num_assets * config.bit_resolution)
+        for period_idx in range(num_periods):
+            expected = [_get_qubit_index(a, period_idx, b, config, num_periods)
+                        for a in range(num_assets) for b in range(config.bit_resolution)]
+            assert period_qubits[period_idx].tolist() == expected
+        # Every qubit belongs to exactly one period
+        assert sorted(period_qubits.ravel().tolist()) == list(range(num_assets * num_periods * config.bit_resolution))
+
+
+class TestQuboComponents:
+    """Objective weights re-weight cached components instead of rebuilding them."""
+
+    def setup_method(self):
+        self.config = DynamicOptimizationConfig(num_time_steps=3, rebalance_frequency_days=10,
+                                                bit_resolution=2, test_mode=True)
+        self.prices = generate_prices(3, 40, seed=21)
+        self.periods_data = prepare_multi_period_data(self.prices, self.config)
+        enhanced_dynamic_portfolio_opt._QUBO_COMPONENT_CACHE.clear()
+
+    def test_components_cover_every_objective(self):
+        components = build_qubo_components(self.periods_data, self.config, np.array([0.3, 0.3, 0.4]))
+        assert set(components.terms) == set(OptimizationObjective)
+        # Return and transaction costs are purely linear
+        assert not np.any(components.terms[OptimizationObjective.RETURN].blocks)
+        assert not np.any(components.terms[OptimizationObjective.TRANSACTION].blocks)
+        assert np.any(components.terms[OptimizationObjective.RISK].blocks)
+
+    @pytest.mark.parametrize("risk_aversion,fee,rho", [(10.0, 0.0, 0.5), (2500.0, 0.05, 3.0)])
+    def test_reweighting_matches_reference(self, risk_aversion, fee, rho):
+        previous_allocation = np.array([0.3, 0.3, 0.4])
+        get_qubo_components(self.periods_data, self.config, previous_allocation)
+
+        config = DynamicOptimizationConfig(num_time_steps=3, rebalance_frequency_days=10, bit_resolution=2,
+                                           risk_aversion=risk_aversion, transaction_fee=fee,
+                                           restriction_coefficient=rho)
+        linear, quadratic, _ = build_dynamic_qubo(self.periods_data, config, previous_allocation)
+        ref_linear, ref_quadratic, _ = reference_build_dynamic_qubo(self.periods_data, config, previous_allocation)
+
+        assert_qubo_equal(linear, ref_linear)
+        assert_qubo_equal(quadratic, ref_quadratic)
+
+    def test_weight_changes_hit_the_cache(self):
+        with patch.object(enhanced_dynamic_portfolio_opt, 'build_qubo_components',
+                          wraps=build_qubo_components) as build_spy:
+            for risk_aversion in (1.0, 100.0, 1000.0):
+                config = DynamicOptimizationConfig(num_time_steps=3, rebalance_frequency_days=10,
+                                                   bit_resolution=2, risk_aversion=risk_aversion)
+                build_dynamic_qubo(self.periods_data, config)
+            assert build_spy.call_count == 1
+
+            # Different prices or layout are a cache miss
+            build_dynamic_qubo(prepare_multi_period_data(generate_prices(3, 40, seed=22), self.config), self.config)
+            assert build_spy.call_count == 2
+
+    def test_concurrent_lookups_and_evictions(self):
+        from concurrent.futures import ThreadPoolExecutor
+        allocations = [np.array([0.1 * k, 0.5, 0.5 - 0.1 * k]) for k in range(12)]
+
+        def lookup(call):
+            return get_qubo_components(self.periods_data, self.config, allocations[call % len(allocations)])
+
+        # More distinct keys than cache entries, so threads keep evicting each other's entries
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lookup, range(240)))
+
+        assert all(result.num_qubits == 18 for result in results)
+        assert len(enhanced_dynamic_portfolio_opt._QUBO_COMPONENT_CACHE) == \
+            enhanced_dynamic_portfolio_opt._QUBO_COMPONENT_CACHE_SIZE
+
+    def test_sweep_builds_components_once(self):
+        weightings = [(100.0, 1.0), (500.0, 1.0), (1000.0, 2.0)]
+        with patch.object(enhanced_dynamic_portfolio_opt, 'build_qubo_components',
+                          wraps=build_qubo_components) as build_spy:
+            results = dynamic_quantum_sweep(self.prices, self.config, weightings)
+
+        assert build_spy.call_count == 1
+        assert [(r['risk_aversion'], r['restriction_coefficient']) for r in results] == weightings
+        assert all('allocations' in r for r in results)
+
+    def test_sweep_stops_when_asked(self):
+        weightings = [(100.0, 1.0), (500.0, 1.0), (1000.0, 2.0)]
+        checks = []
+
+        def should_stop():
+            checks.append(True)
+            return len(checks) > 1  # stop before the second pair
+
+        results = dynamic_quantum_sweep(self.prices, self.config, weightings, should_stop=should_stop)
+        assert [(r['risk_aversion'], r['restriction_coefficient']) for r in results] == weightings[:1]
+
+
+@pytest.mark.performance
+class TestQuboAssemblyScaling:
+    """Scaling benchmark: loop builder vs vectorized builder."""
+
+    def test_scaling_benchmark(self):
+        sizes = [(5, 4, 2), (10, 6, 3), (20, 12, 4)]
+        print(f"\n{'Assets':>6} {'Periods':>7} {'Bits':>4} {'Qubits':>6} {'Loop (s)':>9} {'Vector (s)':>10} {'Speedup':>8}")
+
+        speedups = []
+        for num_assets, num_periods, bits in sizes:
+            config = DynamicOptimizationConfig(num_time_steps=num_periods, rebalance_frequency_days=10,
+                                               bit_resolution=bits)
+            prices = generate_prices(num_assets, 10 * (num_periods + 1))
+            periods_data = prepare_multi_period_data(prices, config)
+
+            start = time.perf_counter()
+            ref_linear, ref_quadratic, total_qubits = reference_build_dynamic_qubo(periods_data, config)
+            loop_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            linear, quadratic, _ = build_dynamic_qubo(periods_data, config)
+            vector_time = time.perf_counter() - start
+
+            assert_qubo_equal(linear, ref_linear)
+            assert_qubo_equal(quadratic, ref_quadratic)
+
+            speedups.append(loop_time / vector_time)
+            print(f"{num_assets:>6} {num_periods:>7} {bits:>4} {total_qubits:>6} "
+                  f"{loop_time:>9.3f} {vector_time:>10.4f} {speedups[-1]:>7.1f}x")
+
+        # The gap must widen with problem size and be substantial at 960 qubits
+        assert speedups[-1] > speedups[0]
+        assert speedups[-1] > 10
@@ -0,0 +1,98 @@
+"""
+Tests for exact_expectation.py and the simulation_mode="exact" engine paths
+"""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from qiskit.circuit.library import QAOAAnsatz, RealAmplitudes
+from qiskit.quantum_info import Statevector
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+from ising_hamiltonian import build_ising_hamiltonian
+from exact_expectation import StatevectorExpectation
+from hybrid_portfolio_opt import quantum_optimize, run_simulator
+from enhanced_dynamic_portfolio_opt import DynamicOptimizationConfig, dynamic_quantum_optimize
+
+
+def random_hamiltonian(num_qubits: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    quadratic = np.triu(rng.normal(size=(num_qubits, num_qubits)), 1)
+    return build_ising_hamiltonian(rng.normal(size=num_qubits), quadratic + quadratic.T, num_qubits)
+
+
+def generate_prices(num_assets: int, days: int, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.001, 0.01, (days, num_assets))
+    dates = pd.date_range('2023-01-01', periods=days, freq='D')
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=dates,
+                        columns=[f"A{i}" for i in range(num_assets)])
+
+
+class TestStatevectorExpectation:
+    """Exact expectation values from Aer probabilities and the energy table."""
+
+    def test_matches_statevector_expectation(self):
+        hamiltonian = random_hamiltonian(5)
+        ansatz = RealAmplitudes(5, reps=2)
+        ansatz.measure_all()
+        exact = StatevectorExpectation(ansatz, hamiltonian)
+
+        rng = np.random.default_rng(1)
+        for _ in range(3):
+            params = rng.uniform(0, 2 * np.pi, ansatz.num_parameters)
+            state = Statevector(ansatz.remove_final_measurements(inplace=False).assign_parameters(params))
+            assert exact(params) == pytest.approx(state.expectation_value(hamiltonian).real, abs=1e-10)
+        assert exact.evaluations == 3
+
+    def test_deterministic_between_calls(self):
+        hamiltonian = random_hamiltonian(4, seed=2)
+        ansatz = QAOAAnsatz(cost_operator=hamiltonian, reps=1)
+        exact = StatevectorExpectation(ansatz, hamiltonian)
+        params = np.array([0.4, 1.1])
+        assert exact(params) == exact(params)
+        assert exact.probabilities(params).sum() == pytest.approx(1.0)
+
+    def test_rejects_large_problems(self):
+        ansatz = RealAmplitudes(6, reps=1)
+        with pytest.raises(ValueError):
+            StatevectorExpectation(ansatz, random_hamiltonian(6), max_qubits=5)
+
+
+class TestExactSimulationMode:
+    """Both engines accept simulation_mode="exact"."""
+
+    def test_hybrid_run_simulator_exact(self):
+        hamiltonian = random_hamiltonian(3, seed=4)
+        ansatz = QAOAAnsatz(cost_operator=hamiltonian, reps=1)
+        ansatz.measure_all()
+        result = run_simulator(ansatz, hamiltonian, 3, np.array([0.3, 0.7]), simulation_mode="exact")
+
+        assert result['simulation_mode'] == "exact"
+        assert len(result['solution']) == 3
+        # Only the final solution sample is a sampler job
+        assert result['simulator_sampler_jobs_executed'] == 1
+
+    def test_hybrid_rejects_unknown_mode(self):
+        with pytest.raises(ValueError):
+            asyncio.run(quantum_optimize(generate_prices(2, 20), simulation_mode="approximate"))
+
+    def test_dynamic_exact_mode(self):
+        config = DynamicOptimizationConfig(num_time_steps=2, rebalance_frequency_days=10, bit_resolution=1,
+                                           num_generations=1, population_size=2, ansatz_reps=1,
+                                           sampler_shots=256, simulation_mode="exact", presolve=False)
+        result = dynamic_quantum_optimize(generate_prices(2, 30), config, quantum_backend="aer_simulator")
+
+        assert result['simulation_mode'] == "exact"
+        assert set(result['allocations']) == {"time_step_0", "time_step_1"}
+        assert sum(result['measurement_counts'].values()) == 256
+
+    def test_dynamic_rejects_unknown_mode(self):
+        config = DynamicOptimizationConfig(simulation_mode="statevector")
+        with pytest.raises(ValueError):
+            dynamic_quantum_optimize(generate_prices(2, 130), config)
@@ -8,6 +8,7 @@ import pandas as pd
 import numpy as np
 import tempfile
 import json
+import asyncio
 import os
 import sys
 import subprocess
@@ -170,7 +171,7 @@ class TestQuantumPortfolioOptimization(unittest.TestCase):
         prices = df.pivot(index='date', columns='symbol', values='close').sort_index()
         
         with patch.object(hybrid_portfolio_opt, 'qc_simulator_mode', True, create=True):
-            result = quantum_optimize(prices, risk_aversion=0.05)
+            result = asyncio.run(quantum_optimize(prices, risk_aversion=0.05))
         
         self.assertIsInstance(result, dict)
         self.assertIn('solution', result)
@@ -190,7 +191,7 @@ class TestQuantumPortfolioOptimization(unittest.TestCase):
         prices = df.pivot(index='date', columns='symbol', values='close').sort_index()
         
         with patch.object(hybrid_portfolio_opt, 'qc_simulator_mode', False, create=True):
-            result = quantum_optimize(prices, risk_aversion=0.05)
+            result = asyncio.run(quantum_optimize(prices, risk_aversion=0.05))
         
         self.assertIsInstance(result, dict)
         self.assertIn('solution', result)
@@ -207,9 +208,20 @@ class TestQuantumPortfolioOptimization(unittest.TestCase):
             for risk in [0.01, 0.05, 0.10]:
                 with self.subTest(risk=risk):
                     with patch.object(hybrid_portfolio_opt, 'qc_simulator_mode', True, create=True):
-                        result = quantum_optimize(prices, risk_aversion=risk)
+                        result = asyncio.run(quantum_optimize(prices, risk_aversion=risk))
                     self.assertIsInstance(result, dict)
 
+    def test_quantum_optimize_result_is_json_serializable(self):
+        """The CLI and API send the simulator result as JSON."""
+        df = pd.DataFrame(self.stock_data)
+        prices = df.pivot(index='date', columns='symbol', values='close').sort_index()
+
+        with patch.object(hybrid_portfolio_opt, 'qc_simulator_mode', True, create=True):
+            result = asyncio.run(quantum_optimize(prices, risk_aversion=0.05, simulation_mode="exact",
+                                                  warm_start=False))
+
+        self.assertEqual(json.loads(json.dumps(result))['cost_evaluations'], result['cost_evaluations'])
+
     def test_run_real_backend_error_handling(self):
         """Test real backend with proper error handling."""
         df = pd.DataFrame(self.stock_data)
@@ -222,7 +234,7 @@ class TestQuantumPortfolioOptimization(unittest.TestCase):
             mock_service.side_effect = Exception("Backend connection failed")
             
             try:
-                result = run_real_backend(None, hamiltonian, num_assets, None)
+                result = asyncio.run(run_real_backend(None, hamiltonian, num_assets, None))
                 # Should handle errors gracefully
                 self.assertIsInstance(result, dict)
             except Exception:
@@ -7,6 +7,7 @@ import unittest
 import pandas as pd
 import numpy as np
 import sys
+import asyncio
 import os
 from unittest.mock import patch
 
@@ -95,7 +96,7 @@ class TestHybridPortfolioOptimization(unittest.TestCase):
         mock_run_simulator.return_value = ([1, 0], -0.5)
         
         try:
-            result = quantum_optimize(self.prices_df, risk_aversion=0.5)
+            result = asyncio.run(quantum_optimize(self.prices_df, risk_aversion=0.5))
             
             # Should return weights and performance
             self.assertIsInstance(result, tuple)
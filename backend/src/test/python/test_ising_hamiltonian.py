@@ -0,0 +1,103 @@
+"""
+Tests for ising_hamiltonian.py - label-free SparsePauliOp construction
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+from qiskit.quantum_info import SparsePauliOp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+from sparse_qubo import BlockSparseQubo
+from ising_hamiltonian import build_ising_hamiltonian, extract_ising_terms
+from hybrid_portfolio_opt import build_hamiltonian
+from enhanced_dynamic_portfolio_opt import build_hamiltonian_from_qubo
+
+
+def reference_label_hamiltonian(linear, quadratic, num_qubits, tolerance=None):
+    """The original string-label construction"""
+    pauli_terms = []
+    for i in range(num_qubits):
+        if tolerance is None or abs(linear[i]) > tolerance:
+            pauli_terms.append(('I' * i + 'Z' + 'I' * (num_qubits - i - 1), linear[i]))
+    for i in range(num_qubits):
+        for j in range(i + 1, num_qubits):
+            if tolerance is None or abs(quadratic[i, j]) > tolerance:
+                label = ['I'] * num_qubits
+                label[i] = 'Z'
+                label[j] = 'Z'
+                pauli_terms.append((''.join(label), quadratic[i, j]))
+    return SparsePauliOp.from_list(pauli_terms)
+
+
+def random_qubo(num_qubits: int, density: float = 0.5, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    linear = rng.normal(size=num_qubits)
+    quadratic = rng.normal(size=(num_qubits, num_qubits))
+    quadratic = np.where(rng.random((num_qubits, num_qubits)) < density, quadratic, 0.0)
+    quadratic = np.triu(quadratic, 1)
+    return linear, quadratic + quadratic.T
+
+
+def assert_same_operator(actual: SparsePauliOp, expected: SparsePauliOp):
+    assert actual.paulis.to_labels() == expected.paulis.to_labels()
+    np.testing.assert_array_equal(actual.coeffs, expected.coeffs)
+
+
+class TestIsingHamiltonian:
+    """Array-built operators must equal the label-string construction term for term."""
+
+    def test_unpruned_matches_hybrid_labels(self):
+        linear, quadratic = random_qubo(6)
+        assert_same_operator(build_hamiltonian(linear, quadratic, 6),
+                             reference_label_hamiltonian(linear, quadratic, 6))
+
+    def test_pruned_matches_dynamic_labels(self):
+        linear, quadratic = random_qubo(9, density=0.3, seed=4)
+        linear[[1, 5]] = 0.0
+        scale = max(np.abs(linear).max(), np.abs(quadratic).max())
+        assert_same_operator(build_hamiltonian_from_qubo(linear, quadratic, 9, relative_tolerance=1e-12),
+                             reference_label_hamiltonian(linear, quadratic, 9, tolerance=1e-12 * scale))
+
+    def test_relative_tolerance_scales_with_problem(self):
+        linear, quadratic = random_qubo(8, seed=2)
+        small = extract_ising_terms(linear, quadratic, 8, relative_tolerance=0.5)
+        scaled = extract_ising_terms(1e6 * linear, 1e6 * quadratic, 8, relative_tolerance=0.5)
+        np.testing.assert_array_equal(small.linear_indices, scaled.linear_indices)
+        np.testing.assert_array_equal(small.coupling_rows, scaled.coupling_rows)
+        np.testing.assert_array_equal(small.coupling_cols, scaled.coupling_cols)
+        assert small.num_terms < extract_ising_terms(linear, quadratic, 8, relative_tolerance=0.0).num_terms
+
+    def test_block_sparse_input(self):
+        block_qubits = np.array([[0, 1, 2], [3, 4, 5]])
+        qubo = BlockSparseQubo.zeros(block_qubits, 6)
+        qubo.linear[:] = np.arange(1.0, 7.0)
+        qubo.add_block(0, np.full((3, 3), 0.5))
+        qubo.add_block(1, np.full((3, 3), -0.25))
+        linear, quadratic = qubo.to_dense()
+
+        assert_same_operator(build_ising_hamiltonian(qubo.linear, qubo, 6, relative_tolerance=1e-12),
+                             build_ising_hamiltonian(linear, quadratic, 6, relative_tolerance=1e-12))
+
+    def test_empty_hamiltonian_is_zero_identity(self):
+        hamiltonian = build_ising_hamiltonian(np.zeros(4), np.zeros((4, 4)), 4, relative_tolerance=1e-12)
+        assert hamiltonian.paulis.to_labels() == ['IIII']
+        assert hamiltonian.coeffs[0] == 0
+
+    @pytest.mark.performance
+    def test_dense_build_avoids_label_strings(self):
+        import time
+
+        linear, quadratic = random_qubo(300, density=1.0, seed=7)
+        start = time.perf_counter()
+        fast = build_ising_hamiltonian(linear, quadratic, 300, relative_tolerance=0.0)
+        fast_time = time.perf_counter() - start
+        start = time.perf_counter()
+        reference = reference_label_hamiltonian(linear, quadratic, 300, tolerance=0.0)
+        reference_time = time.perf_counter() - start
+
+        assert fast.size == reference.size == 300 + 300 * 299 // 2
+        assert fast_time < reference_time
@@ -0,0 +1,117 @@
+"""
+Tests for job_monitor.py - one asyncio monitor for all outstanding runtime jobs
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+from job_monitor import JobFailedError, JobMonitor
+
+
+class MockJob:
+    """Runtime job stand-in that finishes after a fixed time"""
+
+    def __init__(self, name: str, duration: float, final_status: str = "DONE", result=None):
+        self.name = name
+        self.finish_at = time.monotonic() + duration
+        self.final_status = final_status
+        self._result = result if result is not None else name
+        self.status_calls = 0
+
+    def job_id(self):
+        return self.name
+
+    def done(self):
+        return time.monotonic() >= self.finish_at
+
+    def status(self):
+        self.status_calls += 1
+        return self.final_status if self.done() else "QUEUED"
+
+    def result(self):
+        if isinstance(self._result, Exception):
+            raise self._result
+        return self._result
+
+
+class HungJob(MockJob):
+    """Job whose status call blocks until released"""
+
+    def __init__(self, name: str):
+        super().__init__(name, duration=0.0)
+        self.release = threading.Event()
+
+    def status(self):
+        self.status_calls += 1
+        self.release.wait()
+        return "DONE"
+
+
+class TestJobMonitor:
+    """Futures resolve as jobs finish; polling backs off while jobs stay pending."""
+
+    def setup_method(self):
+        self.monitor = JobMonitor(min_interval=0.01, max_interval=0.08, backoff=2.0)
+
+    def teardown_method(self):
+        self.monitor.shutdown()
+
+    def test_many_jobs_one_thread(self):
+        jobs = [MockJob(f"job-{i}", duration=0.05 * (i % 4)) for i in range(20)]
+        futures = [self.monitor.submit(job) for job in jobs]
+
+        assert [future.result(timeout=5) for future in futures] == [job.name for job in jobs]
+        assert self.monitor.stats()['completed'] == 20
+        assert self.monitor.outstanding == 0
+        assert sum(1 for t in threading.enumerate() if t.name == "job-monitor") == 1
+
+    def test_adaptive_backoff(self):
+        job = MockJob("slow", duration=0.5)
+        assert self.monitor.result(job, timeout=5) == "slow"
+        # Fixed 10 ms polling would take ~50 polls; doubling up to 80 ms needs far fewer
+        assert job.status_calls < 15
+
+    def test_failed_job(self):
+        with pytest.raises(JobFailedError) as error:
+            self.monitor.result(MockJob("broken", duration=0.02, final_status="ERROR"), timeout=5)
+        assert error.value.job_id == "broken"
+        assert error.value.status == "ERROR"
+        with pytest.raises(ValueError):
+            self.monitor.result(MockJob("bad-result", duration=0.0, result=ValueError("no data")), timeout=5)
+        assert self.monitor.stats()['failed'] == 2
+
+    def test_await_from_event_loop(self):
+        async def gather_jobs():
+            return await asyncio.gather(*(self.monitor.wait(MockJob(f"async-{i}", 0.03)) for i in range(3)))
+
+        assert asyncio.run(gather_jobs()) == ["async-0", "async-1", "async-2"]
+
+    def test_hung_status_call_does_not_stall_other_jobs(self):
+        hung = HungJob("hung")
+        hung_future = self.monitor.submit(hung)
+        try:
+            time.sleep(0.05)
+            jobs = [MockJob(f"job-{i}", duration=0.1) for i in range(3)]
+            futures = [self.monitor.submit(job) for job in jobs]
+            assert [future.result(timeout=2) for future in futures] == [job.name for job in jobs]
+            # Jobs were polled repeatedly while the hung job's single poll stayed in flight
+            assert all(job.status_calls >= 2 for job in jobs)
+            assert hung.status_calls == 1 and not hung_future.done()
+        finally:
+            hung.release.set()
+        assert hung_future.result(timeout=2) == "hung"
+
+    def test_shutdown_cancels_outstanding(self):
+        future = self.monitor.submit(MockJob("forever", duration=3600))
+        time.sleep(0.05)
+        self.monitor.shutdown()
+        assert future.cancelled()
+        # The monitor restarts on the next submission
+        assert self.monitor.result(MockJob("after", 0.0), timeout=5) == "after"
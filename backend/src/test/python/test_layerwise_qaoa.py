@@ -0,0 +1,163 @@
+"""
+Tests for layerwise_qaoa.py - QAOA depth growth from interpolated starting points
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.optimize import minimize
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+import hybrid_portfolio_opt
+from exact_expectation import StatevectorExpectation
+from ising_hamiltonian import build_ising_hamiltonian
+from layerwise_qaoa import (
+    _fourier_basis,
+    build_qaoa_ansatz,
+    fourier_angles,
+    interp_angles,
+    join_qaoa_parameters,
+    next_layer_parameters,
+    run_layerwise_qaoa,
+    split_qaoa_parameters
+)
+from qubo_energy import create_energy_lookup
+
+
+def coupled_hamiltonian(num_qubits: int = 5, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    quadratic = np.triu(rng.normal(size=(num_qubits, num_qubits)), 1)
+    hamiltonian = build_ising_hamiltonian(0.3 * rng.normal(size=num_qubits), quadratic + quadratic.T, num_qubits)
+    return hamiltonian / np.abs(hamiltonian.coeffs).max()
+
+
+class TestAngleExtension:
+    """INTERP and FOURIER extend p angles to p+1."""
+
+    def test_interp(self):
+        np.testing.assert_allclose(interp_angles(np.array([0.7])), [0.7, 0.7])
+        np.testing.assert_allclose(interp_angles(np.array([1.0, 2.0])), [1.0, 1.5, 2.0])
+        np.testing.assert_allclose(interp_angles(np.array([0.0, 3.0, 0.0])), [0.0, 2.0, 2.0, 0.0])
+
+    def test_fourier_keeps_amplitudes(self):
+        amplitudes = np.array([0.5, -0.1, 0.05])
+        for kind in ("sin", "cos"):
+            angles = _fourier_basis(3, 3, kind) @ amplitudes
+            np.testing.assert_allclose(fourier_angles(angles, kind), _fourier_basis(4, 3, kind) @ amplitudes)
+
+    def test_parameter_layout(self):
+        hamiltonian = coupled_hamiltonian(4)
+        ansatz = build_qaoa_ansatz(hamiltonian, 3)
+        betas, gammas = np.array([1.0, 2.0, 3.0]), np.array([4.0, 5.0, 6.0])
+        params = join_qaoa_parameters(ansatz, betas, gammas)
+        angles = split_qaoa_parameters(ansatz, params)
+        np.testing.assert_array_equal(angles["β"], betas)
+        np.testing.assert_array_equal(angles["γ"], gammas)
+        bound = ansatz.assign_parameters(params)
+        assert bound.num_parameters == 0
+
+    def test_next_layer(self):
+        hamiltonian = coupled_hamiltonian(4)
+        shallow, deep = build_qaoa_ansatz(hamiltonian, 2), build_qaoa_ansatz(hamiltonian, 3)
+        params = join_qaoa_parameters(shallow, np.array([0.4, 0.2]), np.array([0.1, 0.3]))
+        extended = split_qaoa_parameters(deep, next_layer_parameters(shallow, params, deep))
+        np.testing.assert_allclose(extended["β"], [0.4, 0.3, 0.2])
+        np.testing.assert_allclose(extended["γ"], [0.1, 0.2, 0.3])
+        with pytest.raises(ValueError):
+            next_layer_parameters(shallow, params, deep, strategy="random")
+
+
+class TestRunLayerwiseQaoa:
+    """Depth grows until a layer stops paying off."""
+
+    def test_logs_keep_stdout_clean(self, capsys):
+        # The hybrid CLI prints its JSON result on stdout
+        run_layerwise_qaoa(coupled_hamiltonian(3), lambda ansatz, params: {
+            'objective_value': -1.0, 'optimal_parameters': params, 'cost_evaluations': 1}, max_reps=2)
+        captured = capsys.readouterr()
+        assert captured.out == ""
+        assert "[LOG] Layerwise QAOA" in captured.err
+
+    def test_stops_on_small_improvement(self):
+        energies = {1: -1.0, 2: -1.5, 3: -1.5004, 4: -2.0}
+        starts = {}
+
+        def run_layer(ansatz, params):
+            reps = ansatz.num_parameters // 2
+            starts[reps] = params
+            return {'objective_value': energies[reps], 'optimal_parameters': params + 0.01,
+                    'cost_evaluations': 10}
+
+        result = run_layerwise_qaoa(coupled_hamiltonian(3), run_layer, max_reps=4)
+        assert [layer['reps'] for layer in result['layers']] == [1, 2, 3]
+        assert result['reps'] == 3
+        assert result['total_cost_evaluations'] == 30
+        shallow, deep = build_qaoa_ansatz(coupled_hamiltonian(3), 1), build_qaoa_ansatz(coupled_hamiltonian(3), 2)
+        np.testing.assert_allclose(starts[2], next_layer_parameters(shallow, starts[1] + 0.01, deep))
+
+    def test_layer_without_solution(self):
+        result = run_layerwise_qaoa(coupled_hamiltonian(3),
+                                    lambda ansatz, params: {'objective_value': None, 'optimal_parameters': None})
+        assert result['objective_value'] is None
+        assert len(result['layers']) == 1
+
+    def test_interpolated_starts_beat_random_start(self):
+        hamiltonian = coupled_hamiltonian(5)
+        energies = create_energy_lookup(hamiltonian, 5).energies
+        start_energies = {}
+
+        def run_layer(ansatz, params):
+            energy = StatevectorExpectation(ansatz, hamiltonian, energies)
+            start_energies[ansatz.num_parameters // 2] = energy(params)
+            result = minimize(energy, params, method="COBYLA", options={"maxiter": 80})
+            return {'objective_value': result.fun, 'optimal_parameters': result.x, 'cost_evaluations': result.nfev}
+
+        result = run_layerwise_qaoa(hamiltonian, run_layer, max_reps=4, tolerance=1e-4)
+        layers = result['layers']
+        assert len(layers) == 4
+        # The annealing-like start already lowers the energy and deeper
+        # interpolated starts begin below the depth-1 optimum
+        assert start_energies[1] < 0
+        assert start_energies[3] < layers[0]['objective_value']
+        assert start_energies[4] < layers[0]['objective_value']
+        assert result['reps'] == 4
+
+        # A random depth-4 start with the same evaluation budget ends far higher
+        deep = build_qaoa_ansatz(hamiltonian, 4)
+        random_start = np.random.default_rng(0).uniform(0, 2 * np.pi, deep.num_parameters)
+        baseline = minimize(StatevectorExpectation(deep, hamiltonian, energies), random_start, method="COBYLA",
+                            options={"maxiter": result['total_cost_evaluations']})
+        assert result['objective_value'] < baseline.fun - 0.3
+
+
+class TestLayerwiseQuantumOptimize:
+    """quantum_optimize(layerwise=True) reports the chosen depth and layer history."""
+
+    def test_layerwise_mode(self):
+        rng = np.random.default_rng(3)
+        prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0.001, 0.01, (30, 3)), axis=0)),
+                              index=pd.date_range('2023-01-01', periods=30, freq='D'), columns=list("ABC"))
+        depths = []
+
+        def fake_simulator(ansatz, hamiltonian, num_assets, init_params, simulation_mode="sampling"):
+            reps = ansatz.num_parameters // 2
+            depths.append(reps)
+            return {'solution': [1, 0, 0], 'objective_value': -float(min(reps, 2)),
+                    'optimal_parameters': list(init_params), 'cost_evaluations': 5}
+
+        with patch.object(hybrid_portfolio_opt, 'run_simulator', side_effect=fake_simulator), \
+                patch.object(hybrid_portfolio_opt, 'qc_simulator_mode', True, create=True):
+            result = asyncio.run(hybrid_portfolio_opt.quantum_optimize(prices, risk_aversion=0.05, warm_start=False,
+                                                                       layerwise=True, max_reps=4))
+            with pytest.raises(ValueError):
+                asyncio.run(hybrid_portfolio_opt.quantum_optimize(prices, layerwise=True, layer_strategy="linear"))
+
+        assert depths == [1, 2, 3]
+        assert result['reps'] == 2
+        assert result['total_cost_evaluations'] == 15
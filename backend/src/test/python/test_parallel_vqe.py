@@ -0,0 +1,93 @@
+"""
+Tests for parallel_vqe.py - picklable DE-VQE cost and process-pool evaluation
+"""
+
+import os
+import pickle
+import sys
+
+import numpy as np
+import pytest
+from qiskit.circuit.library import RealAmplitudes
+from qiskit.quantum_info import SparsePauliOp
+from qiskit.transpiler import generate_preset_pass_manager
+from qiskit_aer import AerSimulator
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+from ising_hamiltonian import build_ising_hamiltonian
+from parallel_vqe import PENALTY_COST, ParallelPopulationEvaluator, VQECostFunction
+from transpilation import transpile_parameterized
+from enhanced_dynamic_portfolio_opt import DynamicOptimizationConfig, run_differential_evolution_vqe
+
+
+def random_hamiltonian(num_qubits: int, seed: int = 0) -> SparsePauliOp:
+    rng = np.random.default_rng(seed)
+    quadratic = np.triu(rng.normal(size=(num_qubits, num_qubits)), 1)
+    return build_ising_hamiltonian(rng.normal(size=num_qubits), quadratic + quadratic.T, num_qubits)
+
+
+class TestVQECostFunction:
+    """The cost survives pickling and rebuilds its resources in the new process."""
+
+    def setup_method(self):
+        self.hamiltonian = random_hamiltonian(4, seed=3)
+        self.backend = AerSimulator()
+        ansatz = RealAmplitudes(4, reps=1)
+        ansatz.measure_all()
+        pm = generate_preset_pass_manager(backend=self.backend, optimization_level=2)
+        self.isa_ansatz = transpile_parameterized(ansatz, pm)
+        self.population = np.random.default_rng(4).uniform(0, 2 * np.pi, (3, ansatz.num_parameters))
+
+    def test_pickled_cost_matches_original(self):
+        cost = VQECostFunction(self.isa_ansatz, self.hamiltonian, self.backend, shots=1000, use_exact=True)
+        restored = pickle.loads(pickle.dumps(cost))
+
+        assert restored._resources is None
+        np.testing.assert_allclose(restored(self.population.T), cost(self.population.T), rtol=1e-10)
+        assert restored(self.population[0]) == pytest.approx(cost(self.population[0]), rel=1e-10)
+
+    def test_population_is_one_sampler_job(self):
+        cost = VQECostFunction(self.isa_ansatz, self.hamiltonian, self.backend, shots=200)
+        costs = cost(self.population.T)
+
+        assert costs.shape == (3,)
+        assert cost.job_count == 1
+        assert cost.evaluation_count == 3
+
+    def test_budget_rejects_candidates(self):
+        cost = VQECostFunction(self.isa_ansatz, self.hamiltonian, self.backend, shots=200, max_evaluations=4)
+        cost(self.population.T)
+        # One candidate of the second population still fits the budget
+        costs = cost(self.population.T)
+        assert costs[0] < PENALTY_COST
+        np.testing.assert_array_equal(costs[1:], PENALTY_COST)
+        np.testing.assert_array_equal(cost(self.population.T), PENALTY_COST)
+        assert cost.job_count == 2
+
+    def test_remote_backends_are_not_picklable(self):
+        cost = VQECostFunction(self.isa_ansatz, self.hamiltonian, object(), shots=200)
+        assert not cost.picklable
+        with pytest.raises(TypeError):
+            pickle.dumps(cost)
+        with pytest.raises(ValueError):
+            ParallelPopulationEvaluator(cost, workers=2)
+
+
+class TestParallelDifferentialEvolution:
+    """de_workers > 1 spreads each population over worker processes."""
+
+    def test_parallel_run(self):
+        hamiltonian = random_hamiltonian(4, seed=6)
+        ansatz = RealAmplitudes(4, reps=1)
+        ansatz.measure_all()
+        config = DynamicOptimizationConfig(num_generations=3, population_size=4, estimator_shots=500,
+                                           sampler_shots=500, de_workers=2)
+        result = run_differential_evolution_vqe(ansatz, hamiltonian, config, quantum_backend="aer_simulator")
+
+        # The initial population and the part of the first generation within the
+        # evaluation budget are each split into one batched job per worker
+        assert result['job_count'] == 4
+        assert result['evaluation_count'] > 2
+        assert len(result['solution']) == 4
+        assert sum(result['final_counts'].values()) == 500
@@ -286,6 +286,26 @@ class TestHybridOptimizationEndpoint:
         assert "classical_weights" in data
         assert "quantum_qaoa_result" in data
 
+    def test_background_job_keeps_classical_step_off_event_loop(self):
+        """The hybrid background task runs the blocking classical step in a worker thread."""
+        import threading
+        import portfolio_api
+        from portfolio_api import OptimizeRequest, create_job, job_store, run_hybrid_optimization
+
+        classical_threads = []
+
+        def classical(prices):
+            classical_threads.append(threading.get_ident())
+            return {"AAPL": 0.7, "GOOGL": 0.3}, (0.12, 0.15, 0.8)
+
+        job_id = create_job("hybrid")
+        with patch.object(portfolio_api, 'classical_optimize', side_effect=classical), \
+                patch.object(portfolio_api, 'quantum_optimize', return_value={"solution": [1, 0]}):
+            asyncio.run(run_hybrid_optimization(job_id, OptimizeRequest(**self.valid_request_data)))
+
+        assert job_store[job_id].status == "completed"
+        assert classical_threads and classical_threads[0] != threading.get_ident()
+
 
 class TestAsyncOptimizationEndpoints:
     """Test async optimization job endpoints."""
@@ -345,6 +365,69 @@ class TestAsyncOptimizationEndpoints:
         assert response.status_code == 404
 
 
+class TestDynamicWeightingSweepEndpoint:
+    """Test the dynamic-portfolio (risk_aversion, restriction_coefficient) sweep endpoint."""
+    
+    def setup_method(self):
+        """Set up a small test-mode sweep request."""
+        self.request_data = {
+            "assets": [{"symbol": "AAPL"}, {"symbol": "MSFT"}],
+            "num_time_steps": 2,
+            "rebalance_frequency_days": 10,
+            "bit_resolution": 1,
+            "test_mode": True,
+            "risk_aversions": [0.2, 1.0],
+            "restriction_coefficients": [1.0, 2.0]
+        }
+    
+    def test_sweep_returns_one_result_per_grid_point(self):
+        """Every (γ, ρ) pair of the cartesian grid produces a tagged result."""
+        response = client.post("/api/v1/dynamic-portfolio/sweep", json=self.request_data)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "completed"
+        weightings = [(r["risk_aversion"], r["restriction_coefficient"]) for r in data["results"]]
+        assert weightings == [(0.2, 1.0), (0.2, 2.0), (1.0, 1.0), (1.0, 2.0)]
+    
+    def test_large_quantum_sweep_is_queued(self):
+        """Multi-point quantum sweeps cannot fit the synchronous timeout and run in the background."""
+        self.request_data["test_mode"] = False
+        with patch("dynamic_portfolio_api_clean.run_sweep_background") as background:
+            response = client.post("/api/v1/dynamic-portfolio/sweep", json=self.request_data)
+        assert response.status_code == 200
+        assert response.json()["status"] == "queued"
+        assert background.call_count == 1
+    
+    def test_timed_out_sweep_keeps_failed_status(self):
+        """A sweep finishing after its timeout does not overwrite the failed job."""
+        import dynamic_portfolio_api_clean as api
+        from dynamic_portfolio_api_clean import WeightingSweepRequest
+        
+        job_id = "sweep-timeout-test"
+        api.active_jobs[job_id] = {"job_id": job_id, "status": "pending"}
+        
+        def timed_out_sweep(*args):
+            should_stop = args[-1]
+            api.active_jobs[job_id]["status"] = "failed"  # what run_sweep_sync does on timeout
+            assert should_stop()
+            return []
+        
+        try:
+            with patch.object(api, "dynamic_quantum_sweep", side_effect=timed_out_sweep), \
+                    patch.object(api, "load_price_data", return_value=None):
+                asyncio.run(api.run_sweep(job_id, WeightingSweepRequest(**self.request_data)))
+            assert api.active_jobs[job_id]["status"] == "failed"
+            assert "result" not in api.active_jobs[job_id]
+        finally:
+            api.active_jobs.pop(job_id, None)
+    
+    def test_sweep_rejects_negative_weights(self):
+        """Negative weights are rejected by request validation."""
+        self.request_data["risk_aversions"] = [-0.5]
+        response = client.post("/api/v1/dynamic-portfolio/sweep", json=self.request_data)
+        assert response.status_code == 422
+
+
 class TestAPIValidation:
     """Test API input validation and error handling."""
     
@@ -0,0 +1,105 @@
+"""
+Tests for portfolio_statistics.py - the shared memoized mu / Ledoit-Wolf layer
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+from pypfopt import expected_returns
+from pypfopt.risk_models import CovarianceShrinkage
+
+import portfolio_statistics
+from portfolio_statistics import (
+    StatisticsCache,
+    get_statistics_cache,
+    ledoit_wolf_covariance,
+    mean_historical_return,
+    portfolio_statistics as compute_statistics,
+    price_fingerprint
+)
+
+
+def generate_prices(num_assets: int = 4, days: int = 60, seed: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0005, 0.01, (days, num_assets))
+    dates = pd.date_range('2024-01-01', periods=days, freq='D')
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=dates,
+                        columns=[f"A{i}" for i in range(num_assets)])
+
+
+class TestPriceFingerprint:
+    """Fingerprints depend on content, not object identity."""
+
+    def test_equal_content_equal_fingerprint(self):
+        prices = generate_prices()
+        assert price_fingerprint(prices) == price_fingerprint(prices.copy())
+
+    def test_values_index_and_columns_change_fingerprint(self):
+        prices = generate_prices()
+        changed_value = prices.copy()
+        changed_value.iloc[3, 1] += 1e-9
+        renamed = prices.rename(columns={"A0": "B0"})
+        shifted = prices.set_axis(prices.index + pd.Timedelta(days=1))
+
+        reference = price_fingerprint(prices)
+        for other in (changed_value, renamed, shifted):
+            assert price_fingerprint(other) != reference
+
+
+class TestStatisticsCache:
+    """Cached statistics equal pypfopt and are computed once per price matrix."""
+
+    def setup_method(self):
+        get_statistics_cache().clear()
+        self.prices = generate_prices()
+
+    def test_matches_pypfopt(self):
+        mu, S = compute_statistics(self.prices)
+        pd.testing.assert_series_equal(mu, expected_returns.mean_historical_return(self.prices))
+        pd.testing.assert_frame_equal(S, CovarianceShrinkage(self.prices).ledoit_wolf())
+
+    def test_repeated_calls_hit_cache(self):
+        with patch.object(portfolio_statistics, 'CovarianceShrinkage', wraps=CovarianceShrinkage) as shrinkage:
+            for _ in range(3):
+                ledoit_wolf_covariance(self.prices.copy())
+        assert shrinkage.call_count == 1
+        assert get_statistics_cache().info()["hits"] == 2
+
+    def test_frequency_is_part_of_key(self):
+        daily = mean_historical_return(self.prices, frequency=1)
+        annual = mean_historical_return(self.prices)
+        assert not np.allclose(daily, annual)
+        assert get_statistics_cache().info()["misses"] == 2
+
+    def test_returned_values_are_copies(self):
+        S = ledoit_wolf_covariance(self.prices)
+        S.iloc[0, 0] = -1.0
+        assert ledoit_wolf_covariance(self.prices).iloc[0, 0] > 0
+
+    def test_lru_eviction(self):
+        cache = StatisticsCache(max_entries=2)
+        cache.get_or_compute(("a",), lambda: pd.Series([1.0]))
+        cache.get_or_compute(("b",), lambda: pd.Series([2.0]))
+        cache.get_or_compute(("a",), lambda: pd.Series([-1.0]))   # refresh "a"
+        cache.get_or_compute(("c",), lambda: pd.Series([3.0]))    # evicts "b"
+
+        assert cache.get_or_compute(("a",), lambda: pd.Series([-1.0])).iloc[0] == 1.0
+        assert cache.get_or_compute(("b",), lambda: pd.Series([-2.0])).iloc[0] == -2.0
+        assert cache.info()["entries"] == 2
+
+    def test_hybrid_pipeline_computes_statistics_once(self):
+        from hybrid_portfolio_opt import build_qubo, classical_optimize
+
+        with patch.object(portfolio_statistics, 'CovarianceShrinkage', wraps=CovarianceShrinkage) as shrinkage, \
+             patch.object(expected_returns, 'mean_historical_return',
+                          wraps=expected_returns.mean_historical_return) as mean_return:
+            classical_optimize(self.prices)
+            build_qubo(self.prices, risk_aversion=0.5)
+        assert shrinkage.call_count == 1
+        assert mean_return.call_count == 1
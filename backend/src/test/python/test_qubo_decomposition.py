@@ -0,0 +1,115 @@
+"""
+Tests for qubo_decomposition.py - independent components solved as separate circuits
+"""
+
+import itertools
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+from enhanced_dynamic_portfolio_opt import (
+    DynamicOptimizationConfig,
+    build_dynamic_qubo,
+    dynamic_quantum_optimize,
+    prepare_multi_period_data
+)
+from qubo_decomposition import decompose_qubo, stitch_bitstrings, stitch_counts
+from sparse_qubo import BlockSparseQubo
+
+
+def ising_energy(linear, quadratic, bits):
+    """E = Σ h_i s_i + Σ_{i<j} J_ij s_i s_j with s = 1 - 2x"""
+    spins = 1 - 2 * np.asarray(bits, dtype=float)
+    couplings = np.triu(quadratic, 1)
+    return spins @ linear + np.einsum('...i,ij,...j->...', spins, couplings, spins)
+
+
+def all_bits(n: int) -> np.ndarray:
+    return np.array(list(itertools.product([0, 1], repeat=n)), dtype=np.int64).reshape(2 ** n, n)
+
+
+def interleaved_problem(seed: int = 0):
+    """Two coupled groups {0, 2, 4} and {1, 3} plus the isolated variable 5"""
+    rng = np.random.default_rng(seed)
+    quadratic = np.zeros((6, 6))
+    for i, j in ((0, 2), (2, 4), (1, 3)):
+        quadratic[i, j] = quadratic[j, i] = rng.normal()
+    return rng.normal(size=6), quadratic
+
+
+class TestDecomposeQubo:
+    """Components follow the interaction graph and keep every term."""
+
+    def test_components(self):
+        linear, quadratic = interleaved_problem()
+        components = decompose_qubo(linear, quadratic, 6)
+        assert [component.indices.tolist() for component in components] == [[0, 2, 4], [1, 3], [5]]
+        np.testing.assert_allclose(components[0].linear, linear[[0, 2, 4]])
+        np.testing.assert_allclose(components[0].quadratic, quadratic[np.ix_([0, 2, 4], [0, 2, 4])])
+        assert components[2].quadratic.shape == (1, 1)
+
+    def test_energy_is_sum_over_components(self):
+        linear, quadratic = interleaved_problem(1)
+        components = decompose_qubo(linear, quadratic, 6)
+        rng = np.random.default_rng(2)
+        for _ in range(10):
+            parts = ["".join(rng.choice(["0", "1"], component.num_qubits)) for component in components]
+            full = [int(bit) for bit in stitch_bitstrings(components, parts, 6)]
+            total = sum(ising_energy(component.linear, component.quadratic, [int(bit) for bit in part])
+                        for component, part in zip(components, parts))
+            assert np.isclose(ising_energy(linear, quadratic, full), total)
+
+    def test_block_sparse_input(self):
+        rng = np.random.default_rng(3)
+        qubo = BlockSparseQubo.zeros(np.array([[0, 1, 2], [3, 4, 5]]), 6)
+        qubo.linear[:] = rng.normal(size=6)
+        for block in range(2):
+            couplings = np.triu(rng.normal(size=(3, 3)), 1)
+            qubo.add_block(block, couplings + couplings.T)
+        linear, dense = qubo.to_dense()
+        sparse_components = decompose_qubo(qubo.linear, qubo, 6)
+        assert [component.indices.tolist() for component in sparse_components] == [[0, 1, 2], [3, 4, 5]]
+        for sparse_component, dense_component in zip(sparse_components, decompose_qubo(linear, dense, 6)):
+            np.testing.assert_allclose(sparse_component.quadratic, dense_component.quadratic)
+
+    def test_stitch_counts_keeps_marginals(self):
+        linear, quadratic = interleaved_problem()
+        components = decompose_qubo(linear, quadratic, 6)[:2]
+        counts = [{"000": 30, "111": 70}, {"01": 100}]
+        stitched = stitch_counts(components, counts, 5, seed=0)
+        assert sum(stitched.values()) == 100
+        assert stitched == {"00010": 30, "10111": 70}
+
+
+class TestDecomposedOptimization:
+    """The dynamic QUBO splits by period and each period is its own circuit."""
+
+    def test_periods_are_solved_separately(self):
+        rng = np.random.default_rng(7)
+        prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0.001, 0.01, (60, 2)), axis=0)),
+                              index=pd.date_range('2023-01-01', periods=60, freq='D'), columns=["A", "B"])
+        config = DynamicOptimizationConfig(num_time_steps=3, rebalance_frequency_days=10, bit_resolution=1,
+                                           num_generations=2, population_size=3, ansatz_reps=1,
+                                           sampler_shots=256, simulation_mode="exact", presolve=False,
+                                           warm_start=False)
+        result = dynamic_quantum_optimize(prices, config, quantum_backend="aer_simulator")
+
+        components = result['components']
+        assert [len(component['qubits']) for component in components] == [2, 2, 2]
+        assert result['quantum_jobs_executed'] == sum(component['job_count'] for component in components)
+        assert sum(result['measurement_counts'].values()) == 256
+        assert all(len(bitstring) == 6 for bitstring in result['measurement_counts'])
+
+        # Every component optimum is exact on two qubits, so the stitched solution is the global optimum
+        linear, quadratic, num_qubits = build_dynamic_qubo(prepare_multi_period_data(prices, config), config)
+        solution = [int(bit) for bit in result['solution_bitstring']]
+        assert np.isclose(ising_energy(linear, quadratic, solution),
+                          ising_energy(linear, quadratic, all_bits(num_qubits)).min())
+
+        single = dynamic_quantum_optimize(prices, DynamicOptimizationConfig(**{**config.__dict__, 'decompose': False}),
+                                          quantum_backend="aer_simulator")
+        assert single['components'] is None
@@ -0,0 +1,226 @@
+"""
+Tests for qubo_energy.py - vectorized energies from counts and sampler bit arrays
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+from qiskit.primitives import BitArray
+from qiskit.quantum_info import SparsePauliOp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+from ising_hamiltonian import build_ising_hamiltonian
+from qubo_energy import (
+    CachedQuboEnergy,
+    EnergyTable,
+    QuboEnergyEvaluator,
+    bit_array_to_bit_matrix,
+    counts_to_bit_matrix,
+    create_energy_lookup,
+    evaluator_for,
+    expectation_from_bit_array,
+    expectation_from_counts
+)
+from enhanced_dynamic_portfolio_opt import compute_expectation_from_counts
+
+
+def reference_expectation(counts: dict, hamiltonian: SparsePauliOp) -> float:
+    """The original per-bitstring, per-label, per-character loop"""
+    expectation = 0.0
+    total_shots = sum(counts.values())
+    for bitstring, count in counts.items():
+        z_values = np.array([1 - 2 * int(bit) for bit in bitstring])
+        energy = 0.0
+        for pauli_string, coeff in zip(hamiltonian.paulis.to_labels(), hamiltonian.coeffs):
+            term_value = coeff.real
+            for qubit_idx, pauli_op in enumerate(pauli_string):
+                if pauli_op == 'Z':
+                    term_value *= z_values[qubit_idx]
+            energy += term_value
+        expectation += count / total_shots * energy
+    return expectation
+
+
+def random_hamiltonian(num_qubits: int, seed: int = 0) -> SparsePauliOp:
+    rng = np.random.default_rng(seed)
+    quadratic = np.triu(rng.normal(size=(num_qubits, num_qubits)), 1)
+    return build_ising_hamiltonian(rng.normal(size=num_qubits), quadratic + quadratic.T, num_qubits)
+
+
+def random_counts(num_qubits: int, shots: int, seed: int = 1) -> dict:
+    rng = np.random.default_rng(seed)
+    # Skewed distribution so that outcomes repeat, as in a converging VQE
+    outcomes = rng.integers(0, 2, (shots, num_qubits)) * (rng.random((shots, num_qubits)) < 0.3)
+    keys, frequencies = np.unique(outcomes, axis=0, return_counts=True)
+    return {''.join(map(str, key)): int(freq) for key, freq in zip(keys, frequencies)}
+
+
+class TestQuboEnergyEvaluator:
+    """The quadratic form must reproduce the Pauli-label loop."""
+
+    def setup_method(self):
+        self.num_qubits = 8
+        self.hamiltonian = random_hamiltonian(self.num_qubits)
+        self.counts = random_counts(self.num_qubits, 2000)
+
+    def test_matches_reference_loop(self):
+        assert compute_expectation_from_counts(self.counts, self.hamiltonian) == pytest.approx(
+            reference_expectation(self.counts, self.hamiltonian), rel=1e-12, abs=1e-12)
+
+    def test_integer_counts_match_string_counts(self):
+        int_counts = {int(key, 2): value for key, value in self.counts.items()}
+        assert expectation_from_counts(int_counts, self.hamiltonian) == pytest.approx(
+            expectation_from_counts(self.counts, self.hamiltonian), rel=1e-12)
+
+    def test_bit_array_matches_counts(self):
+        bit_array = BitArray.from_counts(self.counts, num_bits=self.num_qubits)
+        bits, frequencies = bit_array_to_bit_matrix(bit_array)
+        assert frequencies.sum() == sum(self.counts.values())
+        assert len(bits) == len(self.counts)
+        assert expectation_from_bit_array(bit_array, self.hamiltonian) == pytest.approx(
+            expectation_from_counts(self.counts, self.hamiltonian), rel=1e-12)
+
+    def test_constant_and_duplicate_terms(self):
+        hamiltonian = SparsePauliOp.from_list([('III', 0.5), ('ZIZ', 1.5), ('IZI', -2.0), ('ZIZ', 0.25)])
+        counts = {'101': 3, '010': 1, '111': 4}
+        assert expectation_from_counts(counts, hamiltonian) == pytest.approx(
+            reference_expectation(counts, hamiltonian))
+
+    def test_sparse_couplings_for_large_problems(self):
+        num_qubits = 60
+        quadratic = np.zeros((num_qubits, num_qubits))
+        quadratic[np.arange(59), np.arange(1, 60)] = 1.0
+        hamiltonian = build_ising_hamiltonian(np.ones(num_qubits), quadratic + quadratic.T,
+                                              num_qubits, relative_tolerance=0.0)
+        evaluator = QuboEnergyEvaluator.from_hamiltonian(hamiltonian)
+        assert not isinstance(evaluator.quadratic, np.ndarray)
+
+        counts = random_counts(num_qubits, 200, seed=3)
+        assert evaluator.expectation_from_counts(counts) == pytest.approx(
+            reference_expectation(counts, hamiltonian), rel=1e-12)
+
+    def test_rejects_non_diagonal_hamiltonian(self):
+        with pytest.raises(ValueError):
+            QuboEnergyEvaluator.from_hamiltonian(SparsePauliOp.from_list([('XZ', 1.0)]))
+        with pytest.raises(ValueError):
+            QuboEnergyEvaluator.from_hamiltonian(SparsePauliOp.from_list([('ZZZ', 1.0)]))
+
+    def test_evaluator_converted_once_per_hamiltonian(self):
+        assert evaluator_for(self.hamiltonian) is evaluator_for(self.hamiltonian)
+        assert evaluator_for(self.hamiltonian) is not evaluator_for(self.hamiltonian.copy())
+
+    def test_short_and_padded_keys(self):
+        bits, _ = counts_to_bit_matrix({'11': 1}, 4)
+        np.testing.assert_array_equal(bits, [[0, 0, 1, 1]])
+
+
+class TestEnergyLookups:
+    """Tabulated and cached energies agree with direct evaluation."""
+
+    def setup_method(self):
+        self.num_qubits = 10
+        self.hamiltonian = random_hamiltonian(self.num_qubits, seed=8)
+        self.evaluator = QuboEnergyEvaluator.from_hamiltonian(self.hamiltonian)
+        self.counts = random_counts(self.num_qubits, 3000, seed=9)
+
+    @pytest.mark.parametrize("chunk_bits", [3, 10, 16])
+    def test_table_matches_evaluator(self, chunk_bits):
+        table = EnergyTable(self.evaluator, chunk_bits=chunk_bits, max_chunk_elements=64)
+        all_bits = np.array([[int(b) for b in format(k, '010b')] for k in range(1 << 10)])
+        np.testing.assert_allclose(table.energies, self.evaluator.energies(all_bits), rtol=1e-12, atol=1e-12)
+
+    def test_table_expectations(self):
+        table = EnergyTable(self.evaluator)
+        expected = self.evaluator.expectation_from_counts(self.counts)
+        bit_array = BitArray.from_counts(self.counts, num_bits=self.num_qubits)
+        int_counts = {int(key, 2): value for key, value in self.counts.items()}
+
+        assert table.expectation_from_counts(self.counts) == pytest.approx(expected, rel=1e-12)
+        assert table.expectation_from_counts(int_counts) == pytest.approx(expected, rel=1e-12)
+        assert table.expectation_from_bit_array(bit_array) == pytest.approx(expected, rel=1e-12)
+
+    def test_memory_mapped_table_is_reused(self, tmp_path):
+        first = create_energy_lookup(self.hamiltonian, table_dir=str(tmp_path))
+        assert isinstance(first, EnergyTable)
+        assert isinstance(first.energies, np.memmap)
+        files = list(tmp_path.iterdir())
+        assert len(files) == 1
+
+        modified = os.path.getmtime(files[0])
+        second = create_energy_lookup(self.hamiltonian, table_dir=str(tmp_path))
+        assert os.path.getmtime(files[0]) == modified
+        np.testing.assert_array_equal(second.energies, first.energies)
+
+    def test_large_problems_use_cache(self):
+        lookup = create_energy_lookup(self.hamiltonian, table_max_qubits=4, cache_size=50)
+        assert isinstance(lookup, CachedQuboEnergy)
+
+        bit_array = BitArray.from_counts(self.counts, num_bits=self.num_qubits)
+        expected = self.evaluator.expectation_from_counts(self.counts)
+        assert lookup.expectation_from_bit_array(bit_array) == pytest.approx(expected, rel=1e-12)
+        assert lookup.misses == len(self.counts)
+        assert len(lookup._energies) == 50
+
+        small_counts = dict(list(self.counts.items())[:20])
+        lookup.expectation_from_counts(small_counts)
+        lookup.expectation_from_counts(small_counts)
+        assert lookup.hits >= 20
+        assert lookup.expectation_from_counts(small_counts) == pytest.approx(
+            self.evaluator.expectation_from_counts(small_counts), rel=1e-12)
+
+    def test_batched_expectations_match_per_parameter_set(self, tmp_path):
+        counts = [random_counts(self.num_qubits, 500, seed=seed) for seed in range(4)]
+        batched = BitArray.concatenate(
+            [BitArray.from_counts(c, num_bits=self.num_qubits).reshape(1, 500) for c in counts])
+        expected = [self.evaluator.expectation_from_counts(c) for c in counts]
+
+        lookups = [self.evaluator, EnergyTable(self.evaluator),
+                   create_energy_lookup(self.hamiltonian, table_max_qubits=4, cache_size=50)]
+        for lookup in lookups:
+            np.testing.assert_allclose(lookup.expectations_from_bit_array(batched), expected, rtol=1e-12)
+
+    def test_batched_variances(self):
+        counts = [random_counts(self.num_qubits, 500, seed=seed) for seed in range(3)]
+        batched = BitArray.concatenate(
+            [BitArray.from_counts(c, num_bits=self.num_qubits).reshape(1, 500) for c in counts])
+        expected = []
+        for c in counts:
+            bits, frequencies = counts_to_bit_matrix(c, self.num_qubits)
+            energies = self.evaluator.energies(bits)
+            mean = energies @ frequencies / frequencies.sum()
+            expected.append((energies - mean) ** 2 @ frequencies / frequencies.sum())
+
+        for lookup in (self.evaluator, EnergyTable(self.evaluator),
+                       create_energy_lookup(self.hamiltonian, table_max_qubits=4, cache_size=50)):
+            means, variances = lookup.expectations_from_bit_array(batched, with_variance=True)
+            np.testing.assert_allclose(means, lookup.expectations_from_bit_array(batched), rtol=1e-12)
+            np.testing.assert_allclose(variances, expected, rtol=1e-9)
+
+
+@pytest.mark.performance
+class TestQuboEnergyBenchmark:
+    """Reference loop vs. vectorized evaluator at the DE-VQE shot counts."""
+
+    @pytest.mark.parametrize("shots", [25000, 100000])
+    def test_speedup_at_vqe_shot_counts(self, shots):
+        num_qubits = 16
+        hamiltonian = random_hamiltonian(num_qubits, seed=5)
+        counts = random_counts(num_qubits, shots, seed=6)
+
+        start = time.perf_counter()
+        expected = reference_expectation(counts, hamiltonian)
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = compute_expectation_from_counts(counts, hamiltonian)
+        vectorized_time = time.perf_counter() - start
+
+        print(f"\n{shots} shots, {len(counts)} unique outcomes: "
+              f"loop {loop_time:.3f}s, vectorized {vectorized_time:.4f}s "
+              f"({loop_time / vectorized_time:.0f}x)")
+        assert actual == pytest.approx(expected, rel=1e-10)
+        assert vectorized_time * 10 < loop_time
@@ -0,0 +1,153 @@
+"""
+Tests for qubo_presolve.py - variable fixing and merging before the circuit is built
+"""
+
+import itertools
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+from enhanced_dynamic_portfolio_opt import (
+    DynamicOptimizationConfig,
+    build_dynamic_qubo,
+    dynamic_quantum_optimize,
+    prepare_multi_period_data
+)
+from qubo_presolve import presolve_qubo
+from sparse_qubo import BlockSparseQubo
+
+
+def ising_energy(linear, quadratic, bits):
+    """E = Σ h_i s_i + Σ_{i<j} J_ij s_i s_j with s = 1 - 2x"""
+    spins = 1 - 2 * np.asarray(bits, dtype=float)
+    couplings = np.triu(quadratic, 1)
+    return spins @ linear + np.einsum('...i,ij,...j->...', spins, couplings, spins)
+
+
+def all_bits(n: int) -> np.ndarray:
+    return np.array(list(itertools.product([0, 1], repeat=n)), dtype=np.int64).reshape(2 ** n, n)
+
+
+def generate_prices(num_assets: int, days: int, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.001, 0.01, (days, num_assets))
+    dates = pd.date_range('2023-01-01', periods=days, freq='D')
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=dates,
+                        columns=[f"A{i}" for i in range(num_assets)])
+
+
+def frustrated_triangle(n: int) -> np.ndarray:
+    """Couplings of n variables whose last three form an antiferromagnetic triangle"""
+    quadratic = np.zeros((n, n))
+    for i, j in ((n - 3, n - 2), (n - 3, n - 1), (n - 2, n - 1)):
+        quadratic[i, j] = quadratic[j, i] = 1.0
+    return quadratic
+
+
+class TestPresolveRules:
+    """Dominant fields fix variables, dominant couplings merge them."""
+
+    def test_dominant_fields_are_fixed(self):
+        quadratic = np.array([[0, 0.5, 0], [0.5, 0, 0.2], [0, 0.2, 0]])
+        presolved = presolve_qubo(np.array([3.0, -2.0, 0.1]), quadratic, 3)
+        # h > 0 favours s = -1 (bit 1); fixing s_1 = +1 leaves variable 2 the field 0.1 + 0.2
+        np.testing.assert_array_equal(presolved.fixed_bits, [1, 0, 1])
+        assert presolved.num_reduced == 0
+        assert np.isclose(presolved.offset, ising_energy([3.0, -2.0, 0.1], quadratic, [1, 0, 1]))
+
+    def test_dominant_couplings_are_merged(self):
+        for coupling, flipped in ((-5.0, 0), (5.0, 1)):
+            # Variable 0 hangs off a frustrated triangle 1-2-3 that no rule decides
+            quadratic = frustrated_triangle(4)
+            quadratic[0, 1] = quadratic[1, 0] = coupling
+            presolved = presolve_qubo(np.full(4, 0.1), quadratic, 4)
+            assert presolved.num_merged == 1 and presolved.num_reduced == 3
+            assert presolved.flipped[0] == flipped
+            assert presolved.reduced_index[0] == presolved.reduced_index[1]
+
+    def test_undecided_problem_is_kept(self):
+        quadratic = np.array([[0, 1.0, 1.0], [1.0, 0, 1.0], [1.0, 1.0, 0]])
+        presolved = presolve_qubo(np.zeros(3) + 0.1, quadratic, 3)
+        assert presolved.num_reduced == 3
+        np.testing.assert_allclose(presolved.quadratic, quadratic)
+
+    def test_random_problems_keep_their_optimum(self):
+        for seed in range(40):
+            rng = np.random.default_rng(seed)
+            n = int(rng.integers(2, 8))
+            linear = rng.normal(size=n) * rng.choice([0.2, 1.0, 4.0])
+            quadratic = np.triu(rng.normal(size=(n, n)) * (rng.random((n, n)) < 0.5), 1)
+            quadratic = quadratic + quadratic.T
+            presolved = presolve_qubo(linear, quadratic, n)
+
+            reduced = all_bits(presolved.num_reduced)
+            reduced_energies = ising_energy(presolved.linear, presolved.quadratic, reduced) + presolved.offset
+            expanded_energies = ising_energy(linear, quadratic, presolved.expand_bits(reduced))
+            np.testing.assert_allclose(reduced_energies, expanded_energies, atol=1e-9)
+            assert np.isclose(reduced_energies.min(), ising_energy(linear, quadratic, all_bits(n)).min())
+
+    def test_block_sparse_input(self):
+        rng = np.random.default_rng(1)
+        qubo = BlockSparseQubo.zeros(np.array([[0, 1, 2], [3, 4, 5]]), 6)
+        qubo.linear[:] = rng.normal(size=6)
+        for block in range(2):
+            couplings = np.triu(rng.normal(size=(3, 3)), 1)
+            qubo.add_block(block, couplings + couplings.T)
+        linear, dense = qubo.to_dense()
+        sparse_result = presolve_qubo(qubo.linear, qubo, 6)
+        dense_result = presolve_qubo(linear, dense, 6)
+        np.testing.assert_array_equal(sparse_result.fixed_bits, dense_result.fixed_bits)
+        np.testing.assert_allclose(sparse_result.quadratic, dense_result.quadratic)
+        assert np.isclose(sparse_result.offset, dense_result.offset)
+
+    def test_expand_bitstrings(self):
+        # 0 is fixed by its field, 1 merges antiferromagnetically into the triangle 2-3-4
+        quadratic = frustrated_triangle(5)
+        quadratic[1, 2] = quadratic[2, 1] = 5.0
+        presolved = presolve_qubo(np.array([-3.0, 0.1, 0.1, 0.1, 0.1]), quadratic, 5)
+        assert presolved.num_fixed == 1 and presolved.num_merged == 1
+        for reduced in ("000", "111"):
+            full = presolved.expand_bitstring(reduced)
+            assert len(full) == 5 and full[0] == "0"
+            assert full[1] != full[2]
+        assert presolved.expand_counts({"000": 3, "111": 5}) == {"01000": 3, "00111": 5}
+        # Reduced outcomes mapping to one full bitstring are summed
+        fixed = presolve_qubo(np.array([1.0, -1.0]), np.zeros((2, 2)), 2)
+        assert fixed.expand_counts({"": 2}) == {"10": 2}
+
+
+class TestPresolvedOptimization:
+    """dynamic_quantum_optimize runs only the variables presolve leaves."""
+
+    def config(self, **overrides):
+        settings = dict(num_time_steps=2, rebalance_frequency_days=10, bit_resolution=1, num_generations=1,
+                        population_size=2, ansatz_reps=1, sampler_shots=256)
+        return DynamicOptimizationConfig(**{**settings, **overrides})
+
+    def test_fully_fixed_problem_skips_circuit(self):
+        prices = generate_prices(2, 30)
+        config = self.config()
+        result = dynamic_quantum_optimize(prices, config, quantum_backend="aer_simulator")
+
+        assert result['presolve']['reduced_qubits'] == 0
+        assert result['quantum_jobs_executed'] == 0
+        linear, quadratic, num_qubits = build_dynamic_qubo(prepare_multi_period_data(prices, config), config)
+        energies = ising_energy(linear, quadratic, all_bits(num_qubits))
+        solution = [int(bit) for bit in result['solution_bitstring']]
+        assert np.isclose(ising_energy(linear, quadratic, solution), energies.min())
+        assert np.isclose(result['objective_value'], energies.min())
+
+    def test_partial_presolve_expands_solution(self):
+        prices = generate_prices(3, 60, seed=5)
+        config = self.config(risk_aversion=1.0, restriction_coefficient=1.0, bit_resolution=2)
+        result = dynamic_quantum_optimize(prices, config, quantum_backend="aer_simulator")
+
+        presolve = result['presolve']
+        assert 0 < presolve['reduced_qubits'] < presolve['original_qubits']
+        assert len(result['solution_bitstring']) == presolve['original_qubits']
+        assert all(len(bitstring) == presolve['original_qubits'] for bitstring in result['measurement_counts'])
+        assert sum(result['measurement_counts'].values()) == 256
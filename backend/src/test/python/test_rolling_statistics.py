@@ -0,0 +1,127 @@
+"""
+Tests for rolling_statistics.py - incremental rolling-window mu / Ledoit-Wolf
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+from pypfopt import expected_returns
+from pypfopt.risk_models import CovarianceShrinkage
+
+from portfolio_statistics import get_statistics_cache
+from rolling_statistics import RollingLedoitWolf, period_statistics
+from enhanced_dynamic_portfolio_opt import DynamicOptimizationConfig, prepare_multi_period_data
+
+
+def generate_prices(num_assets: int = 5, days: int = 200, seed: int = 21) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0005, 0.012, (days, num_assets))
+    dates = pd.date_range('2022-01-03', periods=days, freq='B')
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=dates,
+                        columns=[f"A{i}" for i in range(num_assets)])
+
+
+def reference_statistics(prices: pd.DataFrame):
+    return (expected_returns.mean_historical_return(prices).to_numpy(),
+            CovarianceShrinkage(prices).ledoit_wolf().to_numpy())
+
+
+class TestRollingLedoitWolf:
+    """Running sums must reproduce pypfopt on every window."""
+
+    @pytest.mark.parametrize("num_assets", [1, 2, 5, 30])
+    def test_windows_match_pypfopt(self, num_assets):
+        prices = generate_prices(num_assets=num_assets)
+        windows = [(0, 40), (20, 60), (35, 200), (198, 200)]
+        stats = RollingLedoitWolf(prices).window_statistics(windows)
+
+        for idx, (start, end) in enumerate(windows):
+            mu, S = reference_statistics(prices.iloc[start:end])
+            np.testing.assert_allclose(stats.mu[idx], mu, rtol=1e-10, atol=1e-14)
+            np.testing.assert_allclose(stats.covariance[idx], S, rtol=1e-9, atol=1e-14)
+
+    def test_shrinkage_matches_pypfopt(self):
+        prices = generate_prices()
+        estimator = CovarianceShrinkage(prices.iloc[10:70])
+        estimator.ledoit_wolf()
+        stats = RollingLedoitWolf(prices).window_statistics([(10, 70)])
+        assert stats.shrinkage[0] == pytest.approx(estimator.delta, rel=1e-9)
+
+    def test_append_matches_full_rebuild(self):
+        prices = generate_prices()
+        incremental = RollingLedoitWolf(prices.iloc[:150])
+        incremental.append(prices.iloc[150:151])
+        incremental.append(prices.iloc[151:])
+        rebuilt = RollingLedoitWolf(prices)
+
+        windows = [(100, 200), (140, 180)]
+        assert incremental.num_prices == len(prices)
+        for new, full in zip(
+                (incremental.window_statistics(windows).mu, incremental.window_statistics(windows).covariance),
+                (rebuilt.window_statistics(windows).mu, rebuilt.window_statistics(windows).covariance)):
+            np.testing.assert_allclose(new, full, rtol=1e-10, atol=1e-14)
+
+    def test_daily_append_and_tail_statistics(self):
+        prices = generate_prices(days=120)
+        estimator = RollingLedoitWolf(prices.iloc[:100])
+        for day in range(100, 120):
+            estimator.append(prices.iloc[day:day + 1])
+            mu, S = estimator.tail_statistics(40)
+            ref_mu, ref_S = reference_statistics(prices.iloc[day - 39:day + 1])
+            np.testing.assert_allclose(mu.to_numpy(), ref_mu, rtol=1e-10)
+            np.testing.assert_allclose(S.to_numpy(), ref_S, rtol=1e-9, atol=1e-14)
+        assert list(S.columns) == list(prices.columns)
+
+    def test_rejects_invalid_input(self):
+        prices = generate_prices()
+        with pytest.raises(ValueError):
+            RollingLedoitWolf(prices.mask(prices.index == prices.index[5]))
+        with pytest.raises(ValueError):
+            RollingLedoitWolf(prices).window_statistics([(10, 11)])
+
+
+class TestPeriodStatistics:
+    """period_statistics serves the dynamic engine's overlapping periods."""
+
+    def setup_method(self):
+        get_statistics_cache().clear()
+        self.prices = generate_prices(num_assets=4, days=130)
+        self.config = DynamicOptimizationConfig(num_time_steps=6, rebalance_frequency_days=20)
+
+    def test_overlapping_periods_match_per_period_estimates(self):
+        periods = prepare_multi_period_data(self.prices, self.config)
+        stats = period_statistics(periods)
+
+        assert stats.mu.shape == (len(periods), 4)
+        assert stats.covariance.shape == (len(periods), 4, 4)
+        assert not np.any(np.isnan(stats.shrinkage))   # rolling path, not the fallback
+        for idx, period in enumerate(periods):
+            mu, S = reference_statistics(period)
+            np.testing.assert_allclose(stats.mu[idx], mu, rtol=1e-10)
+            np.testing.assert_allclose(stats.covariance[idx], S, rtol=1e-9, atol=1e-14)
+
+    def test_missing_prices_fall_back_to_exact_estimators(self):
+        prices = self.prices.copy()
+        prices.iloc[30, 2] = np.nan
+        periods = prepare_multi_period_data(prices, self.config)
+        stats = period_statistics(periods)
+
+        assert np.all(np.isnan(stats.shrinkage))
+        np.testing.assert_allclose(stats.covariance[1], reference_statistics(periods[1])[1])
+
+    def test_non_contiguous_periods_fall_back(self):
+        periods = [self.prices.iloc[0:40], self.prices.iloc[60:100]]
+        stats = period_statistics(periods)
+        np.testing.assert_allclose(stats.mu[1], reference_statistics(periods[1])[0])
+
+    def test_results_are_cached(self):
+        periods = prepare_multi_period_data(self.prices, self.config)
+        period_statistics(periods)
+        period_statistics([period.copy() for period in periods])
+        assert get_statistics_cache().info()["hits"] == 1
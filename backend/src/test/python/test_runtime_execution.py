@@ -0,0 +1,136 @@
+"""
+Tests for runtime_execution.py - Session/Batch execution of the real-backend path on local stand-ins
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from qiskit.circuit.library import QAOAAnsatz
+from qiskit_aer import AerSimulator
+from qiskit_ibm_runtime import Batch, Session
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+from job_monitor import JobMonitor
+from hybrid_portfolio_opt import build_hamiltonian, run_real_backend
+from runtime_execution import (
+    IBMRuntimeAdapter,
+    LocalExecutionAdapter,
+    PrimitiveOptions,
+    RuntimeExecution
+)
+
+
+def small_problem(num_assets: int = 3, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    quadratic = np.triu(rng.normal(size=(num_assets, num_assets)), 1)
+    hamiltonian = build_hamiltonian(rng.normal(size=num_assets), quadratic + quadratic.T, num_assets)
+    ansatz = QAOAAnsatz(cost_operator=hamiltonian, reps=1)
+    ansatz.measure_all()
+    return ansatz, hamiltonian, rng.uniform(0, 2 * np.pi, ansatz.num_parameters)
+
+
+class TestPrimitiveOptions:
+    """Options are applied to both primitives when an execution opens."""
+
+    def test_configured_once_per_execution(self):
+        options = PrimitiveOptions(estimator_shots=123, sampler_shots=456, num_randomizations=8)
+        with LocalExecutionAdapter(options=options).open("batch") as execution:
+            assert execution.estimator.options.default_shots == 123
+            assert execution.sampler.options.default_shots == 456
+            assert execution.estimator.options.dynamical_decoupling.sequence_type == "XY4"
+            assert execution.sampler.options.twirling.num_randomizations == 8
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            with LocalExecutionAdapter().open("dedicated"):
+                pass
+
+
+class TestExecutionModes:
+    """Session and Batch contexts wrap every job of an execution."""
+
+    @pytest.mark.parametrize("mode, context", [("session", Session), ("batch", Batch)])
+    def test_mode_context(self, mode, context):
+        adapter = LocalExecutionAdapter()
+        with patch.object(context, '__enter__', autospec=True, side_effect=lambda self: self) as entered:
+            with adapter.open(mode) as execution:
+                assert execution.mode == mode
+        entered.assert_called_once()
+
+    def test_failed_job_returns_none(self):
+        job = MagicMock()
+        job.done.return_value = False
+        job.status.return_value = "ERROR"
+        estimator = MagicMock()
+        estimator.run.return_value = job
+        execution = RuntimeExecution("session", estimator, MagicMock(), "Test", JobMonitor(min_interval=0.001))
+
+        assert execution.run_estimator([()]) is None
+        assert execution.estimator_jobs == 1
+        job.result.assert_not_called()
+
+    def test_least_busy_device(self):
+        service = MagicMock()
+        adapter = IBMRuntimeAdapter.least_busy(service, min_num_qubits=5)
+        service.least_busy.assert_called_once_with(min_num_qubits=5)
+        assert adapter.backend is service.least_busy.return_value
+
+
+class TestRealBackendPathLocally:
+    """run_real_backend runs unchanged against an Aer stand-in."""
+
+    def test_session_run(self):
+        ansatz, hamiltonian, init_params = small_problem()
+        options = PrimitiveOptions(estimator_shots=500, sampler_shots=800,
+                                   dynamical_decoupling=False, twirling=False)
+        adapter = LocalExecutionAdapter(AerSimulator(seed_simulator=7), options)
+        result = asyncio.run(run_real_backend(ansatz, hamiltonian, 3, init_params, adapter=adapter))
+
+        assert result['execution_mode'] == "session"
+        assert result['backend_name'] == "aer_simulator"
+        assert result['estimator_jobs_executed'] > 1
+        assert result['sampler_jobs_executed'] == 1
+        assert len(result['solution']) == 3
+        assert np.isfinite(result['objective_value'])
+
+    def test_bayesian_batches_share_estimator_jobs(self):
+        ansatz, hamiltonian, init_params = small_problem()
+        options = PrimitiveOptions(estimator_shots=500, sampler_shots=800,
+                                   dynamical_decoupling=False, twirling=False)
+        adapter = LocalExecutionAdapter(AerSimulator(seed_simulator=7), options)
+        result = asyncio.run(run_real_backend(ansatz, hamiltonian, 3, init_params, adapter=adapter,
+                                              optimizer="bayesian", max_evaluations=12))
+
+        assert result['cost_evaluations'] == 12
+        # 4-point initial design, then batches of 4: one estimator job per batch
+        assert result['estimator_jobs_executed'] == 3
+        assert np.isfinite(result['objective_value'])
+        with pytest.raises(ValueError):
+            asyncio.run(run_real_backend(ansatz, hamiltonian, 3, init_params, adapter=adapter, optimizer="adam"))
+
+    def test_concurrent_runs_await_jobs_on_one_loop(self):
+        ansatz, hamiltonian, init_params = small_problem()
+        options = PrimitiveOptions(estimator_shots=500, sampler_shots=800,
+                                   dynamical_decoupling=False, twirling=False)
+
+        async def two_runs():
+            runs = [run_real_backend(ansatz, hamiltonian, 3, init_params, execution_mode="batch",
+                                     adapter=LocalExecutionAdapter(AerSimulator(seed_simulator=seed), options),
+                                     optimizer="spsa", max_evaluations=6)
+                    for seed in (1, 2)]
+            return await asyncio.gather(*runs)
+
+        # The blocking waits must not be used: every job is awaited through the monitor
+        with patch.object(RuntimeExecution, 'run_estimator', side_effect=AssertionError("blocking wait")), \
+                patch.object(RuntimeExecution, 'run_sampler', side_effect=AssertionError("blocking wait")):
+            results = asyncio.run(two_runs())
+
+        for result in results:
+            assert result['estimator_jobs_executed'] == 3
+            assert result['sampler_jobs_executed'] == 1
+            assert np.isfinite(result['objective_value'])
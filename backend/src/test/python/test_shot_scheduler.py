@@ -0,0 +1,118 @@
+"""
+Tests for shot_scheduler.py - adaptive shot allocation across and within DE generations
+"""
+
+import os
+import sys
+
+import numpy as np
+from qiskit.circuit.library import RealAmplitudes
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+from ising_hamiltonian import build_ising_hamiltonian
+from shot_scheduler import AdaptiveShotScheduler, ShotSchedule
+from enhanced_dynamic_portfolio_opt import DynamicOptimizationConfig, run_differential_evolution_vqe
+
+
+class NoisyCosts:
+    """Sampling callback with known true costs and unit per-shot variance"""
+
+    def __init__(self, true_costs, seed: int = 0):
+        self.true_costs = np.asarray(true_costs, dtype=float)
+        self.rng = np.random.default_rng(seed)
+        self.shots_per_candidate = np.zeros(len(self.true_costs), dtype=int)
+
+    def __call__(self, population, shots):
+        index = population[:, 0].astype(int)
+        self.shots_per_candidate[index] += shots
+        means = self.true_costs[index] + self.rng.normal(size=len(index)) / np.sqrt(shots)
+        return means, np.ones(len(index))
+
+
+def indexed_population(num_candidates: int, spread: float = np.pi) -> np.ndarray:
+    offsets = np.random.default_rng(1).uniform(-spread, spread, num_candidates)
+    return np.column_stack([np.arange(num_candidates), np.pi + offsets])
+
+
+class TestShotSchedule:
+    """Default bounds derived from the fixed shot count."""
+
+    def test_for_budget(self):
+        schedule = ShotSchedule.for_budget(4000)
+        assert (schedule.min_shots, schedule.max_shots, schedule.eta) == (250, 4000, 2)
+        assert ShotSchedule.for_budget(4000, min_shots=8000).min_shots == 4000
+        assert ShotSchedule.for_budget(10).min_shots == 1
+
+
+class TestAdaptiveShotScheduler:
+    """Generations get more shots as they converge; races favour contenders."""
+
+    def setup_method(self):
+        self.scheduler = AdaptiveShotScheduler(ShotSchedule(min_shots=100, max_shots=1600))
+
+    def test_base_shots_follow_population_spread(self):
+        population = np.random.default_rng(2).uniform(0, 2 * np.pi, (10, 3))
+        assert self.scheduler.base_shots(population) == 100
+        assert 100 < self.scheduler.base_shots(np.pi + (population - np.pi) / 2) < 1600
+        assert self.scheduler.base_shots(np.full((10, 3), np.pi)) == 1600
+
+    def test_race_spends_shots_on_contenders(self):
+        true_costs = np.arange(16, dtype=float) * 0.05
+        true_costs[9] = -1.0
+        sample = NoisyCosts(true_costs)
+        estimates = self.scheduler.race(indexed_population(16), sample)
+
+        assert np.argmin(estimates) == 9
+        # The winner is sampled as precisely as a fixed-shot evaluation, losers are cut early
+        assert sample.shots_per_candidate[9] == 1600
+        assert sample.shots_per_candidate.min() == 100
+        assert self.scheduler.total_shots == sample.shots_per_candidate.sum()
+        assert self.scheduler.total_shots < 16 * 1600 / 4
+
+        rounds = self.scheduler.generations[0]['rounds']
+        assert rounds[0] == (16, 100)
+        for (field, _), (survivors, _) in zip(rounds, rounds[1:]):
+            assert survivors <= -(-field // 2)
+
+    def test_close_candidates_keep_racing(self):
+        sample = NoisyCosts(np.zeros(8))
+        self.scheduler.race(indexed_population(8), sample)
+        rounds = self.scheduler.generations[0]['rounds']
+        assert rounds == [(8, 100), (4, 100), (2, 200), (1, 1200)]
+        assert sample.shots_per_candidate.max() == 1600
+
+    def test_summary(self):
+        self.scheduler.race(indexed_population(16), NoisyCosts(np.arange(16)))
+        summary = self.scheduler.summary(fixed_shots=1600)
+        assert summary['fixed_schedule_shots'] == 16 * 1600
+        assert summary['total_shots'] == self.scheduler.total_shots
+        assert 0 < summary['shot_savings'] < 1
+        assert summary['base_shots_per_population'] == [100]
+
+
+class TestAdaptiveShotsInDifferentialEvolution:
+    """adaptive_shots reports its shot totals next to the fixed schedule."""
+
+    def test_adaptive_run_uses_fewer_shots(self):
+        rng = np.random.default_rng(0)
+        quadratic = np.triu(rng.normal(size=(4, 4)), 1)
+        hamiltonian = build_ising_hamiltonian(rng.normal(size=4), quadratic + quadratic.T, 4)
+        ansatz = RealAmplitudes(4, reps=1)
+        ansatz.measure_all()
+
+        results = {}
+        for adaptive in (False, True):
+            config = DynamicOptimizationConfig(num_generations=3, population_size=4, estimator_shots=2000,
+                                               sampler_shots=500, adaptive_shots=adaptive)
+            results[adaptive] = run_differential_evolution_vqe(ansatz, hamiltonian, config,
+                                                               quantum_backend="aer_simulator")
+
+        fixed, adaptive = results[False], results[True]
+        assert fixed['shot_schedule'] is None
+        assert fixed['shot_count'] > 0 and fixed['shot_count'] % 2000 == 0
+        schedule = adaptive['shot_schedule']
+        assert schedule['total_shots'] < schedule['fixed_schedule_shots']
+        assert adaptive['shot_count'] < fixed['shot_count']
+        assert adaptive['total_shots'] == adaptive['shot_count'] + 500
+
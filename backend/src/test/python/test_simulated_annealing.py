@@ -0,0 +1,122 @@
+"""
+Tests for simulated_annealing.py - vectorized classical QUBO engine
+"""
+
+import itertools
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+from enhanced_dynamic_portfolio_opt import (
+    DynamicOptimizationConfig,
+    build_dynamic_qubo,
+    dynamic_quantum_optimize,
+    prepare_multi_period_data
+)
+from ising_hamiltonian import upper_triangle_terms
+from qubo_decomposition import decompose_qubo
+from simulated_annealing import greedy_coloring, simulated_annealing
+from sparse_qubo import BlockSparseQubo
+
+
+def ising_energy(linear, quadratic, bits):
+    """E = Σ h_i s_i + Σ_{i<j} J_ij s_i s_j with s = 1 - 2x"""
+    spins = 1 - 2 * np.asarray(bits, dtype=float)
+    couplings = np.triu(quadratic, 1)
+    return spins @ linear + np.einsum('...i,ij,...j->...', spins, couplings, spins)
+
+
+def all_bits(n: int) -> np.ndarray:
+    return np.array(list(itertools.product([0, 1], repeat=n)), dtype=np.int64).reshape(2 ** n, n)
+
+
+def block_sparse_problem(num_blocks: int, block_size: int, seed: int = 0) -> BlockSparseQubo:
+    rng = np.random.default_rng(seed)
+    num_qubits = num_blocks * block_size
+    qubo = BlockSparseQubo.zeros(np.arange(num_qubits).reshape(num_blocks, block_size), num_qubits)
+    qubo.linear[:] = rng.normal(size=num_qubits)
+    for block in range(num_blocks):
+        couplings = np.triu(rng.normal(size=(block_size, block_size)), 1)
+        qubo.add_block(block, couplings + couplings.T)
+    return qubo
+
+
+class TestSimulatedAnnealing:
+    """Replicas find ground states and track their energies incrementally."""
+
+    def test_finds_ground_state_of_small_problems(self):
+        for seed in range(20):
+            rng = np.random.default_rng(seed)
+            n = int(rng.integers(1, 11))
+            linear = rng.normal(size=n)
+            quadratic = np.triu(rng.normal(size=(n, n)) * (rng.random((n, n)) < 0.6), 1)
+            quadratic = quadratic + quadratic.T
+            result = simulated_annealing(linear, quadratic, n, num_replicas=16, num_sweeps=200, seed=seed)
+
+            assert np.isclose(result.energy, ising_energy(linear, quadratic, all_bits(n)).min())
+            assert np.isclose(ising_energy(linear, quadratic, result.bits), result.energy)
+            np.testing.assert_allclose(ising_energy(linear, quadratic, result.replica_bits),
+                                       result.replica_energies)
+
+    def test_coloring_separates_coupled_variables(self):
+        qubo = block_sparse_problem(5, 4)
+        rows, cols, _ = upper_triangle_terms(qubo)
+        classes = greedy_coloring(20, rows, cols)
+        # Blocks are complete graphs: one colour per block position, shared across blocks
+        assert len(classes) == 4
+        colors = np.zeros(20, dtype=np.int64)
+        for color, members in enumerate(classes):
+            colors[members] = color
+        assert np.all(colors[rows] != colors[cols])
+
+    def test_dense_and_sparse_couplings_agree(self):
+        qubo = block_sparse_problem(6, 5, seed=2)
+        linear, dense = qubo.to_dense()
+        kwargs = dict(num_replicas=8, num_sweeps=50, seed=3)
+        dense_result = simulated_annealing(linear, dense, 30, **kwargs)
+        sparse_result = simulated_annealing(qubo.linear, qubo, 30, dense_max_qubits=0, **kwargs)
+        np.testing.assert_array_equal(dense_result.replica_bits, sparse_result.replica_bits)
+        assert np.isclose(dense_result.energy, sparse_result.energy)
+        assert np.isclose(qubo.energies(sparse_result.bits[None, :])[0], sparse_result.energy)
+
+    def test_counts(self):
+        result = simulated_annealing(np.array([1.0, -1.0]), np.zeros((2, 2)), 2, num_replicas=5,
+                                     num_sweeps=20, seed=0)
+        assert result.bitstring == "10"
+        assert result.counts() == {"10": 5}
+
+
+class TestAnnealingOptimizer:
+    """optimizer_type="simulated_annealing" solves the dynamic QUBO without a circuit."""
+
+    def test_dynamic_qubo_optimum(self):
+        rng = np.random.default_rng(5)
+        prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0.001, 0.01, (90, 3)), axis=0)),
+                              index=pd.date_range('2023-01-01', periods=90, freq='D'), columns=list("ABC"))
+        config = DynamicOptimizationConfig(num_time_steps=3, rebalance_frequency_days=20, bit_resolution=2,
+                                           risk_aversion=1.0, optimizer_type="simulated_annealing",
+                                           annealing_replicas=16, annealing_sweeps=300,
+                                           presolve=False, decompose=False)
+        result = dynamic_quantum_optimize(prices, config)
+
+        assert result['optimizer_type'] == "simulated_annealing"
+        assert result['quantum_jobs_executed'] == 0
+        assert sum(result['measurement_counts'].values()) == 16
+        linear, quadratic, num_qubits = build_dynamic_qubo(prepare_multi_period_data(prices, config), config)
+        # Periods are independent, so the optimum is the sum of per-period brute-force optima
+        optimum = 0.0
+        for component in decompose_qubo(linear, quadratic, num_qubits):
+            optimum += ising_energy(component.linear, component.quadratic,
+                                    all_bits(component.num_qubits)).min()
+        assert np.isclose(result['objective_value'], optimum)
+        solution = [int(bit) for bit in result['solution_bitstring']]
+        assert np.isclose(ising_energy(linear, quadratic, solution), optimum)
+
+        # Presolve and decomposition feed the same engine and reach the same optimum
+        reduced = dynamic_quantum_optimize(prices, DynamicOptimizationConfig(
+            **{**config.__dict__, 'presolve': True, 'decompose': True}))
+        assert np.isclose(reduced['objective_value'], optimum)
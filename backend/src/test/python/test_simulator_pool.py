@@ -0,0 +1,217 @@
+"""
+Tests for the pooled local simulators and simulation-method selection in quantum_backend_config.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+from qiskit import QuantumCircuit
+from qiskit.circuit.library import RealAmplitudes
+from qiskit.quantum_info import SparsePauliOp
+from qiskit_aer import AerSimulator
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+from quantum_backend_config import (
+    CircuitStructure,
+    QuantumBackendManager,
+    SimulationMethodPolicy,
+    SimulatorPool,
+    SimulatorPoolConfig
+)
+from enhanced_dynamic_portfolio_opt import DynamicOptimizationConfig, run_differential_evolution_vqe
+
+
+def circular_ansatz(num_qubits: int, reps: int = 1) -> QuantumCircuit:
+    ansatz = RealAmplitudes(num_qubits, reps=reps, entanglement='circular')
+    ansatz.measure_all()
+    return ansatz
+
+
+class TestSimulatorPoolConfig:
+    """Thread budgets split the machine between pooled instances."""
+
+    def test_explicit_thread_budget(self):
+        assert SimulatorPoolConfig(max_parallel_threads=3).thread_budget() == 3
+
+    def test_cores_split_across_pool(self):
+        config = SimulatorPoolConfig(pool_size=2)
+        assert config.thread_budget() == max(1, (os.cpu_count() or 1) // 2)
+        assert SimulatorPoolConfig(pool_size=10_000).thread_budget() == 1
+
+
+class TestSimulatorPool:
+    """Leases reuse configured instances and bound concurrency."""
+
+    def setup_method(self):
+        self.config = SimulatorPoolConfig(pool_size=1, max_parallel_threads=2, max_parallel_shots=1)
+        self.pool = SimulatorPool(self.config, lambda name: AerSimulator())
+
+    def test_instances_are_reused(self):
+        with self.pool.lease("aer_simulator") as first:
+            pass_manager = first.pass_manager(optimization_level=1)
+        with self.pool.lease("aer_simulator") as second:
+            assert second is first
+            assert second.pass_manager(optimization_level=1) is pass_manager
+
+        assert self.pool.stats()["instances_created"] == 1
+        assert self.pool.stats()["total_leases"] == 2
+
+    def test_thread_budget_applied(self):
+        with self.pool.lease("aer_simulator") as lease:
+            assert lease.backend.options.max_parallel_threads == 2
+            assert lease.backend.options.max_parallel_experiments == 1
+            assert lease.backend.options.max_parallel_shots == 1
+
+    def test_pool_size_bounds_concurrent_leases(self):
+        leased = threading.Event()
+        release = threading.Event()
+
+        def hold_lease():
+            with self.pool.lease("aer_simulator"):
+                leased.set()
+                release.wait(5)
+
+        holder = threading.Thread(target=hold_lease)
+        holder.start()
+        leased.wait(5)
+        try:
+            with pytest.raises(TimeoutError):
+                with self.pool.lease("aer_simulator", timeout=0.05):
+                    pass
+        finally:
+            release.set()
+            holder.join()
+
+        with self.pool.lease("aer_simulator", timeout=1):
+            pass
+
+    def test_failed_creation_releases_slot(self):
+        pool = SimulatorPool(self.config, lambda name: (_ for _ in ()).throw(RuntimeError("no simulator")))
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                with pool.lease("aer_simulator", timeout=0.05):
+                    pass
+
+
+class TestBackendManagerPool:
+    """The manager hands out pooled simulators instead of new instances."""
+
+    def setup_method(self):
+        self.manager = QuantumBackendManager(config_file="nonexistent_quantum_config.json")
+
+    def test_backend_instance_is_shared(self):
+        backend = self.manager.get_backend_instance("aer_simulator")
+        assert backend is self.manager.get_backend_instance("aer_simulator")
+        assert backend.options.max_parallel_threads == self.manager.simulator_pool.config.thread_budget()
+
+    def test_lease_backend_uses_pool(self):
+        with self.manager.lease_backend("aer_simulator") as first:
+            pass
+        with self.manager.lease_backend("aer_simulator") as second:
+            assert second is first
+        assert self.manager.get_backend_summary()["simulator_pool"]["instances_created"] == 1
+
+    def test_concurrent_first_calls_share_one_manager(self, monkeypatch):
+        import quantum_backend_config
+        monkeypatch.setattr(quantum_backend_config, "_backend_manager", None)
+        constructed = []
+
+        class SlowManager:
+            def __init__(self):
+                constructed.append(self)
+                time.sleep(0.05)
+
+        monkeypatch.setattr(quantum_backend_config, "QuantumBackendManager", SlowManager)
+        barrier = threading.Barrier(8)
+        managers = []
+
+        def first_call():
+            barrier.wait()
+            managers.append(quantum_backend_config.get_backend_manager())
+
+        threads = [threading.Thread(target=first_call) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(constructed) == 1
+        assert all(manager is constructed[0] for manager in managers)
+
+
+class TestSimulationMethodPolicy:
+    """Method choice from qubit count, entanglement and non-Clifford content."""
+
+    def test_circuit_structure(self):
+        structure = CircuitStructure.from_circuit(circular_ansatz(6))
+        assert structure.num_qubits == 6
+        assert structure.two_qubit_gates == 6
+        assert structure.long_range_gates == 1  # the circular wrap-around
+        assert structure.non_clifford_gates == 12
+        assert structure.max_cut_crossings == 2
+
+    def test_small_circuits_use_statevector(self):
+        choice = SimulationMethodPolicy().choose(circular_ansatz(10))
+        assert choice.method == "statevector"
+        assert choice.predicted_memory_mb == pytest.approx(16 * 2 ** 10 / 2 ** 20)
+
+    def test_wide_circuits_use_matrix_product_state(self):
+        choice = SimulationMethodPolicy(max_memory_mb=1024).choose(circular_ansatz(40, reps=3))
+        assert choice.method == "matrix_product_state"
+        assert choice.predicted_memory_mb < 1024
+        assert "matrix_product_state_max_bond_dimension" not in choice.options
+        assert choice.to_dict()["structure"]["num_qubits"] == 40
+
+    def test_bond_dimension_capped_to_fit_memory(self):
+        policy = SimulationMethodPolicy(max_memory_mb=0.005)
+        choice = policy.choose(circular_ansatz(40, reps=3))
+        cap = choice.options["matrix_product_state_max_bond_dimension"]
+        assert choice.predicted_memory_mb <= 0.005
+        assert policy.mps_memory_mb(choice.structure, cap * 2) > 0.005
+
+    def test_nearly_clifford_circuits_use_extended_stabilizer(self):
+        circuit = QuantumCircuit(40)
+        circuit.h(range(40))
+        circuit.cx(range(39), range(1, 40))
+        circuit.t(3)
+        circuit.measure_all()
+        assert SimulationMethodPolicy(max_memory_mb=1024).choose(circuit).method == "extended_stabilizer"
+
+
+class TestSimulationMethodOnLease:
+    """Leases apply the chosen method and return to the pool with defaults restored."""
+
+    def setup_method(self):
+        self.manager = QuantumBackendManager(config_file="nonexistent_quantum_config.json")
+
+    def test_method_applied_and_reset(self):
+        choice = self.manager.select_simulation_method(circular_ansatz(40))
+        with self.manager.lease_backend("aer_simulator") as lease:
+            statevector_pm = lease.pass_manager(optimization_level=1)
+            lease.apply_simulation_method(choice)
+            assert lease.backend.options.method == "matrix_product_state"
+            # The wider MPS target needs its own pass manager
+            assert lease.pass_manager(optimization_level=1) is not statevector_pm
+            assert lease.backend.target.num_qubits >= 40
+        with self.manager.lease_backend("aer_simulator") as lease:
+            assert lease.backend.options.method == "automatic"
+
+    def test_forty_qubit_run(self):
+        num_qubits = 40
+        coefficients = np.random.default_rng(2).normal(size=num_qubits)
+        hamiltonian = SparsePauliOp.from_sparse_list(
+            [("Z", [i], c) for i, c in enumerate(coefficients)], num_qubits=num_qubits)
+        config = DynamicOptimizationConfig(num_generations=1, population_size=1, estimator_shots=50,
+                                           sampler_shots=100, energy_table_max_qubits=20)
+        result = run_differential_evolution_vqe(circular_ansatz(num_qubits), hamiltonian, config,
+                                                quantum_backend="aer_simulator")
+
+        assert result['simulation_method']['method'] == "matrix_product_state"
+        assert result['simulation_method']['predicted_memory_mb'] < 1
+        assert result['job_count'] >= 1
+        assert len(result['solution']) == num_qubits
@@ -0,0 +1,115 @@
+"""
+Tests for sparse_qubo.py and the block-sparse path of build_dynamic_qubo
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+from sparse_qubo import BlockSparseQubo
+from enhanced_dynamic_portfolio_opt import (
+    DynamicOptimizationConfig,
+    build_dynamic_qubo,
+    build_hamiltonian_from_qubo,
+    compute_expectation_from_counts,
+    decode_quantum_solution,
+    prepare_multi_period_data
+)
+
+
+def generate_prices(num_assets: int, days: int, seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0005, 0.01, (days, num_assets))
+    dates = pd.date_range('2023-01-01', periods=days, freq='D')
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=dates,
+                        columns=[f"A{i}" for i in range(num_assets)])
+
+
+class TestBlockSparseQubo:
+    """Block-sparse storage must describe exactly the same problem as the dense matrix."""
+
+    def setup_method(self):
+        self.config = DynamicOptimizationConfig(num_time_steps=3, rebalance_frequency_days=10,
+                                                bit_resolution=2, transaction_fee=0.02)
+        self.periods_data = prepare_multi_period_data(generate_prices(3, 40), self.config)
+        self.previous_allocation = np.array([0.2, 0.5, 0.3])
+        self.linear, self.quadratic, self.total_qubits = build_dynamic_qubo(
+            self.periods_data, self.config, self.previous_allocation)
+        self.sparse_linear, self.qubo, _ = build_dynamic_qubo(
+            self.periods_data, self.config, self.previous_allocation, sparse=True)
+
+    def test_sparse_build_returns_block_qubo(self):
+        assert isinstance(self.qubo, BlockSparseQubo)
+        assert self.sparse_linear is self.qubo.linear
+        assert self.qubo.num_qubits == self.total_qubits
+        assert self.qubo.blocks.shape == (len(self.periods_data), 6, 6)
+
+    def test_dense_export_matches_dense_builder(self):
+        linear, quadratic = self.qubo.to_dense()
+        np.testing.assert_array_equal(linear, self.linear)
+        np.testing.assert_array_equal(quadratic, self.quadratic)
+
+    def test_scipy_export_matches_dense_builder(self):
+        csr = self.qubo.to_sparse("csr")
+        assert csr.format == "csr"
+        assert csr.nnz == np.count_nonzero(self.quadratic) == self.qubo.nnz
+        np.testing.assert_array_equal(csr.toarray(), self.quadratic)
+
+    def test_hamiltonian_identical_for_both_representations(self):
+        dense_h = build_hamiltonian_from_qubo(self.linear, self.quadratic, self.total_qubits)
+        sparse_h = build_hamiltonian_from_qubo(self.qubo.linear, self.qubo, self.total_qubits)
+        assert dense_h.paulis.to_labels() == sparse_h.paulis.to_labels()
+        np.testing.assert_array_equal(dense_h.coeffs, sparse_h.coeffs)
+
+    def test_energies_match_counts_expectation(self):
+        hamiltonian = build_hamiltonian_from_qubo(self.linear, self.quadratic, self.total_qubits)
+        rng = np.random.default_rng(3)
+        bits = rng.integers(0, 2, (16, self.total_qubits))
+
+        energies = self.qubo.energies(bits)
+        for row, energy in zip(bits, energies):
+            bitstring = ''.join(str(b) for b in row)
+            assert energy == pytest.approx(compute_expectation_from_counts({bitstring: 1}, hamiltonian))
+
+    def test_upper_triangle_terms_sorted_and_tolerance(self):
+        rows, cols, values = self.qubo.upper_triangle_terms()
+        assert np.all(rows < cols)
+        assert list(zip(rows, cols)) == sorted(zip(rows, cols))
+        np.testing.assert_array_equal(values, self.quadratic[rows, cols])
+
+        rows_tol, _, values_tol = self.qubo.upper_triangle_terms(tolerance=np.median(np.abs(values)))
+        assert len(rows_tol) < len(rows)
+
+    def test_large_problem_memory(self):
+        # 10 assets × 12 periods × 4 bits = 480 qubits; blocks hold 1/12 of the dense couplings
+        config = DynamicOptimizationConfig(num_time_steps=12, rebalance_frequency_days=10, bit_resolution=4)
+        periods_data = prepare_multi_period_data(generate_prices(10, 130), config)
+        _, qubo, total_qubits = build_dynamic_qubo(periods_data, config, sparse=True)
+
+        assert total_qubits == 480
+        assert qubo.nbytes < total_qubits * total_qubits * 8 / 10
+
+
+class TestDecodeQuantumSolution:
+    """The vectorized decoder keeps the original bit layout and padding rules."""
+
+    def test_decode_known_bitstring(self):
+        config = DynamicOptimizationConfig(bit_resolution=2, max_investment_per_asset=0.9)
+        # Qubit order: asset-major, then period, then bit (LSB first)
+        bitstring = "10" "11" "01" "00"
+        allocations = decode_quantum_solution(bitstring, config, num_assets=2, num_periods=2)
+
+        assert allocations == {
+            "time_step_0": {"asset_0": pytest.approx(0.3), "asset_1": pytest.approx(0.6)},
+            "time_step_1": {"asset_0": pytest.approx(0.9), "asset_1": pytest.approx(0.0)},
+        }
+
+    def test_decode_short_bitstring_pads_with_zeros(self):
+        config = DynamicOptimizationConfig(bit_resolution=1, max_investment_per_asset=0.8)
+        allocations = decode_quantum_solution("1", config, num_assets=2, num_periods=1)
+        assert allocations == {"time_step_0": {"asset_0": 0.8, "asset_1": 0.0}}
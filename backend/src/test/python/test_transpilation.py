@@ -0,0 +1,187 @@
+"""
+Tests for transpilation.py and the transpile-once cost functions
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from qiskit.circuit.library import QAOAAnsatz, RealAmplitudes
+from qiskit.quantum_info import SparsePauliOp
+from qiskit.transpiler import StagedPassManager
+from qiskit.transpiler.preset_passmanagers import generate_preset_pass_manager
+from qiskit_aer import AerSimulator
+from qiskit_ibm_runtime import SamplerV2 as Sampler
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+import hybrid_portfolio_opt
+from enhanced_dynamic_portfolio_opt import DynamicOptimizationConfig, run_differential_evolution_vqe
+from ising_hamiltonian import build_ising_hamiltonian
+from transpilation import (
+    TranspileCache,
+    backend_fingerprint,
+    circuit_structure_hash,
+    get_transpile_cache,
+    laid_out_observable,
+    sampler_pub,
+    transpile_parameterized
+)
+
+
+def random_hamiltonian(num_qubits: int, seed: int = 0) -> SparsePauliOp:
+    rng = np.random.default_rng(seed)
+    quadratic = np.triu(rng.normal(size=(num_qubits, num_qubits)), 1)
+    return build_ising_hamiltonian(rng.normal(size=num_qubits), quadratic + quadratic.T, num_qubits)
+
+
+class TestTranspileParameterized:
+    """The transpiled ansatz keeps its parameters and binds like a re-transpiled circuit."""
+
+    def setup_method(self):
+        self.backend = AerSimulator(seed_simulator=11)
+        self.pass_manager = generate_preset_pass_manager(backend=self.backend, optimization_level=2)
+        self.ansatz = RealAmplitudes(4, reps=2)
+        self.ansatz.measure_all()
+
+    def test_parameters_preserved(self):
+        isa_ansatz = transpile_parameterized(self.ansatz, self.pass_manager)
+        assert list(isa_ansatz.parameters) == list(self.ansatz.parameters)
+
+    def test_bound_pub_matches_per_evaluation_transpile(self):
+        isa_ansatz = transpile_parameterized(self.ansatz, self.pass_manager)
+        params = np.random.default_rng(2).uniform(0, 2 * np.pi, self.ansatz.num_parameters)
+        sampler = Sampler(mode=self.backend)
+
+        once = sampler.run([sampler_pub(isa_ansatz, params)], shots=4000).result()[0].data.meas
+        per_call = self.pass_manager.run(self.ansatz.assign_parameters(params))
+        reference = sampler.run([per_call], shots=4000).result()[0].data.meas
+
+        def distribution(bit_array):
+            counts = bit_array.get_int_counts()
+            return np.array([counts.get(k, 0) for k in range(16)]) / bit_array.num_shots
+
+        assert np.abs(distribution(once) - distribution(reference)).max() < 0.05
+
+    def test_rejects_dropped_parameters(self):
+        class DroppingPassManager:
+            def run(self, circuit):
+                return circuit.assign_parameters({circuit.parameters[0]: 0.0})
+
+        with pytest.raises(ValueError):
+            transpile_parameterized(self.ansatz, DroppingPassManager())
+
+    def test_laid_out_observable_without_layout(self):
+        hamiltonian = random_hamiltonian(4)
+        isa_ansatz = transpile_parameterized(self.ansatz, self.pass_manager)
+        assert laid_out_observable(hamiltonian, isa_ansatz).num_qubits == isa_ansatz.num_qubits
+
+
+class TestTranspileCache:
+    """ISA circuits are cached by ansatz structure, target and optimization level."""
+
+    def setup_method(self):
+        self.backend = AerSimulator()
+
+    def make_ansatz(self, reps: int = 2):
+        ansatz = RealAmplitudes(5, reps=reps)
+        ansatz.measure_all()
+        return ansatz
+
+    def test_structure_hash(self):
+        assert circuit_structure_hash(self.make_ansatz()) == circuit_structure_hash(self.make_ansatz())
+        assert circuit_structure_hash(self.make_ansatz()) != circuit_structure_hash(self.make_ansatz(reps=3))
+        first = QAOAAnsatz(random_hamiltonian(4, seed=1), reps=1)
+        second = QAOAAnsatz(random_hamiltonian(4, seed=2), reps=1)
+        assert circuit_structure_hash(first) != circuit_structure_hash(second)
+
+    def test_target_fingerprint_follows_simulation_method(self):
+        assert backend_fingerprint(AerSimulator()) == backend_fingerprint(AerSimulator())
+        assert backend_fingerprint(AerSimulator()) != backend_fingerprint(AerSimulator(method="matrix_product_state"))
+
+    def test_memory_tier(self):
+        cache = TranspileCache()
+        first = cache.transpile(self.make_ansatz(), self.backend, optimization_level=1)
+        second = cache.transpile(self.make_ansatz(), self.backend, optimization_level=1)
+        cache.transpile(self.make_ansatz(), self.backend, optimization_level=2)
+
+        assert second is not first
+        assert second == first
+        assert cache.info()["hits"] == 1
+        assert cache.info()["misses"] == 2
+        assert cache.pass_manager(self.backend, 1) is cache.pass_manager(AerSimulator(), 1)
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        ansatz = self.make_ansatz()
+        original = TranspileCache(str(tmp_path)).transpile(ansatz, self.backend, optimization_level=3)
+        assert len(list(tmp_path.glob("*.qpy"))) == 1
+
+        restarted = TranspileCache(str(tmp_path))
+        with patch.object(StagedPassManager, 'run') as pm_run:
+            restored = restarted.transpile(self.make_ansatz(), self.backend, optimization_level=3)
+        pm_run.assert_not_called()
+        assert restarted.info()["disk_hits"] == 1
+        assert restored == original
+        assert [p.name for p in restored.parameters] == [p.name for p in ansatz.parameters]
+
+    def test_unreadable_file_is_retranspiled(self, tmp_path):
+        cache = TranspileCache(str(tmp_path))
+        cache.transpile(self.make_ansatz(), self.backend)
+        path = next(tmp_path.glob("*.qpy"))
+        path.write_bytes(b"not qpy")
+
+        restarted = TranspileCache(str(tmp_path))
+        assert restarted.transpile(self.make_ansatz(), self.backend).num_parameters == 15
+        assert restarted.info()["misses"] == 1
+
+    def test_lru_bound(self):
+        cache = TranspileCache(max_entries=2)
+        for reps in (1, 2, 3):
+            cache.transpile(self.make_ansatz(reps), self.backend)
+        assert cache.info()["circuits"] == 2
+
+
+class TestTranspileOncePerRun:
+    """Cost evaluations no longer invoke the pass manager."""
+
+    def test_hybrid_simulator_transpiles_once(self):
+        hamiltonian = random_hamiltonian(3, seed=4)
+        ansatz = QAOAAnsatz(cost_operator=hamiltonian, reps=1)
+        ansatz.measure_all()
+
+        get_transpile_cache().clear()
+        original_run = StagedPassManager.run
+        with patch.object(StagedPassManager, 'run', autospec=True, side_effect=original_run) as pm_run:
+            result = hybrid_portfolio_opt.run_simulator(ansatz, hamiltonian, 3, np.array([0.3, 0.7]))
+            # One unrolling for simulation-method selection, one transpilation of the ansatz
+            assert pm_run.call_count == 2
+            hybrid_portfolio_opt.run_simulator(ansatz, hamiltonian, 3, np.array([0.3, 0.7]))
+            # The second run reuses the cached ISA circuit
+            assert pm_run.call_count == 3
+
+        assert result['simulator_sampler_jobs_executed'] > 2
+        assert len(result['solution']) == 3
+
+
+class TestBatchedPopulation:
+    """Differential evolution scores a whole population with one sampler job."""
+
+    def run(self, batch_population: bool) -> dict:
+        hamiltonian = random_hamiltonian(4, seed=6)
+        ansatz = RealAmplitudes(4, reps=1)
+        ansatz.measure_all()
+        config = DynamicOptimizationConfig(num_generations=3, population_size=4, estimator_shots=500,
+                                           sampler_shots=500, batch_population=batch_population)
+        return run_differential_evolution_vqe(ansatz, hamiltonian, config, quantum_backend="aer_simulator")
+
+    def test_one_job_per_population(self):
+        batched = self.run(batch_population=True)
+        sequential = self.run(batch_population=False)
+
+        assert batched['evaluation_count'] == sequential['evaluation_count']
+        assert sequential['job_count'] > 1
+        # The initial population of 4 × num_params candidates is a single job
+        assert batched['job_count'] < sequential['job_count'] / 8
+        assert len(batched['solution']) == 4
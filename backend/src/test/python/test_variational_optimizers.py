@@ -0,0 +1,186 @@
+"""
+Tests for variational_optimizers.py - ask/tell optimizers behind optimizer_type
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+from qiskit.circuit.library import RealAmplitudes
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+import enhanced_dynamic_portfolio_opt
+from enhanced_dynamic_portfolio_opt import (
+    DynamicOptimizationConfig,
+    dynamic_quantum_optimize,
+    run_ask_tell_vqe
+)
+from ising_hamiltonian import build_ising_hamiltonian
+from variational_optimizers import (
+    OPTIMIZERS,
+    SPSA,
+    AskTellOptimizer,
+    BayesianOptimizer,
+    ParameterShiftGradientDescent,
+    ScipyAskTell,
+    create_optimizer,
+    run_ask_tell,
+    run_ask_tell_async
+)
+from warm_start import WarmStartStore
+
+
+def rotation_cost(points):
+    """Sum of cosines: every parameter enters one rotation, so parameter shifts are exact"""
+    points = np.atleast_2d(points)
+    return np.sum(np.cos(points) + 0.3 * np.sin(2 * points[:, ::-1]), axis=1)
+
+
+class TestAskTellOptimizers:
+    """Every registered optimizer improves within its evaluation budget."""
+
+    @pytest.mark.parametrize("name", list(OPTIMIZERS))
+    def test_respects_budget(self, name):
+        x0 = np.full(4, 0.5)
+        batches = []
+
+        def objective(points):
+            batches.append(len(points))
+            return rotation_cost(points)
+
+        result = run_ask_tell(create_optimizer(name, x0, 120, bounds=[(0, 2 * np.pi)] * 4, seed=1), objective)
+        assert result.nfev == sum(batches) <= 120
+        assert result.fun < rotation_cost(x0)[0] - 1.0
+        np.testing.assert_allclose(rotation_cost(result.x)[0], result.fun)
+        assert result.optimizer == name
+
+    def test_batch_sizes(self):
+        spsa = SPSA(np.zeros(6), 10, seed=0)
+        assert spsa.ask().shape == (2, 6)
+        shift = ParameterShiftGradientDescent(np.zeros(6), 10)
+        assert shift.ask().shape == (0, 6)
+        shift = ParameterShiftGradientDescent(np.zeros(6), 13)
+        assert shift.ask().shape == (13, 6)
+
+    def test_parameter_shift_gradient_is_exact(self):
+        x0 = np.array([0.3, 1.1, 2.0])
+        optimizer = ParameterShiftGradientDescent(x0, 7, learning_rate=1.0)
+        points = optimizer.ask()
+        optimizer.tell(points, np.sum(np.cos(points), axis=1))
+        # One step of size 1 along -(-sin x)
+        np.testing.assert_allclose(optimizer.x, x0 + np.sin(x0))
+
+    def test_scipy_thread_stops_with_callback(self):
+        optimizer = create_optimizer("nelder_mead", np.zeros(5), 500)
+        result = run_ask_tell(optimizer, rotation_cost, callback=lambda: optimizer.evaluations >= 7)
+        assert result.nfev == 7
+        assert result.message == "Stopped by callback"
+        assert not any(thread.name == "nelder_mead-ask-tell" for thread in threading.enumerate())
+
+    def test_async_driver_runs_optimizer_steps_off_the_loop(self):
+        ask_threads, loop_threads = [], []
+        optimizer = BayesianOptimizer(np.full(3, 0.5), 10, batch_size=2, seed=0)
+        ask = optimizer.ask
+
+        def tracked_ask():
+            ask_threads.append(threading.get_ident())
+            return ask()
+
+        async def objective(points):
+            loop_threads.append(threading.get_ident())
+            return rotation_cost(points)
+
+        optimizer.ask = tracked_ask
+        result = asyncio.run(run_ask_tell_async(optimizer, objective))
+        reference = run_ask_tell(BayesianOptimizer(np.full(3, 0.5), 10, batch_size=2, seed=0), rotation_cost)
+
+        # GP fits run in worker threads, never on the thread awaiting the objective
+        assert ask_threads and not set(ask_threads) & set(loop_threads)
+        assert result.nfev == reference.nfev
+        np.testing.assert_allclose(result.x, reference.x)
+
+    def test_bayesian_batches(self):
+        x0 = np.full(3, 0.5)
+        optimizer = BayesianOptimizer(x0, 20, batch_size=3, seed=0)
+        design = optimizer.ask()
+        assert design.shape == (4, 3)
+        np.testing.assert_array_equal(design[0], x0)
+        values = rotation_cost(design)
+        values[1] = np.nan  # failed evaluations are not modelled
+        optimizer.tell(design, values)
+        batch = optimizer.ask()
+        assert batch.shape == (3, 3)
+        assert np.all((batch >= 0) & (batch <= 2 * np.pi))
+        assert len({tuple(point) for point in batch}) == 3
+        optimizer.tell(batch, rotation_cost(batch))
+        assert optimizer.evaluations == 7 and optimizer.iterations == 2
+        assert optimizer.best_fun == np.nanmin(np.append(values, rotation_cost(batch)))
+
+    def test_bayesian_needs_fewer_rounds(self):
+        rounds = {}
+        for name, budget in (("bayesian", 48), ("cobyla", 300)):
+            batches = []
+
+            def objective(points):
+                batches.append(len(points))
+                return rotation_cost(points)
+
+            result = run_ask_tell(create_optimizer(name, np.full(4, 0.5), budget,
+                                                   bounds=[(0, 2 * np.pi)] * 4, seed=1), objective)
+            rounds[name] = (len(batches), result.fun)
+        assert rounds["bayesian"][1] < rotation_cost(np.full(4, 0.5))[0] - 3.0
+        assert rounds["bayesian"][0] * 4 < rounds["cobyla"][0]
+
+    def test_expected_improvement(self):
+        ei = BayesianOptimizer.expected_improvement(np.array([0.0, 0.0, 1.0]), np.array([1.0, 0.1, 1e-15]),
+                                                    best=0.0, margin=0.0)
+        np.testing.assert_allclose(ei[:2], [1 / np.sqrt(2 * np.pi), 0.1 / np.sqrt(2 * np.pi)])
+        assert ei[2] == 0.0
+
+    def test_incomplete_subclass_fails_on_creation(self):
+        class NoAsk(AskTellOptimizer):
+            pass
+
+        class NoBudget(ScipyAskTell):
+            method = "COBYLA"
+
+        for incomplete in (NoAsk, NoBudget):
+            with pytest.raises(TypeError):
+                incomplete(np.zeros(2), 10)
+
+    def test_unknown_optimizer(self):
+        with pytest.raises(ValueError):
+            create_optimizer("adam", np.zeros(2), 10)
+
+
+class TestAskTellVqe:
+    """optimizer_type selects the ask/tell loop of the dynamic engine."""
+
+    def test_spsa_vqe_reports_evaluations(self):
+        rng = np.random.default_rng(4)
+        quadratic = np.triu(rng.normal(size=(4, 4)), 1)
+        hamiltonian = build_ising_hamiltonian(rng.normal(size=4), quadratic + quadratic.T, 4)
+        ansatz = RealAmplitudes(4, reps=1)
+        ansatz.measure_all()
+        config = DynamicOptimizationConfig(optimizer_type="spsa", max_evaluations=40, sampler_shots=200,
+                                           simulation_mode="exact")
+        with patch.object(enhanced_dynamic_portfolio_opt, 'get_warm_start_store', return_value=WarmStartStore()):
+            result = run_ask_tell_vqe(ansatz, hamiltonian, config, quantum_backend="aer_simulator")
+
+        assert result['optimizer_type'] == "spsa"
+        assert result['evaluation_count'] == result['optimization_result'].nfev == 40
+        assert result['optimization_result'].nit == 20
+        assert result['objective_value'] < 0
+        assert len(result['solution']) == 4
+
+    def test_unknown_optimizer_type(self):
+        prices = pd.DataFrame(np.ones((120, 2)), index=pd.date_range('2023-01-01', periods=120, freq='D'),
+                              columns=["A", "B"])
+        with pytest.raises(ValueError):
+            dynamic_quantum_optimize(prices, DynamicOptimizationConfig(optimizer_type="adam"))
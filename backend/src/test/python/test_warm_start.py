@@ -0,0 +1,164 @@
+"""
+Tests for warm_start.py - optimized parameters recalled for similar problems
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from qiskit.circuit.library import QAOAAnsatz, RealAmplitudes
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'main', 'python'))
+
+import enhanced_dynamic_portfolio_opt
+import hybrid_portfolio_opt
+from ising_hamiltonian import build_ising_hamiltonian
+from warm_start import WarmStart, WarmStartStore, ansatz_key, problem_signature, seeded_population
+from enhanced_dynamic_portfolio_opt import DynamicOptimizationConfig, run_differential_evolution_vqe
+
+
+def random_problem(num_qubits: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    quadratic = np.triu(rng.normal(size=(num_qubits, num_qubits)), 1)
+    return rng.normal(size=num_qubits), quadratic + quadratic.T
+
+
+def hamiltonian_of(linear, quadratic):
+    return build_ising_hamiltonian(linear, quadratic, len(linear))
+
+
+def measured_ansatz(num_qubits: int, reps: int = 1):
+    ansatz = RealAmplitudes(num_qubits, reps=reps)
+    ansatz.measure_all()
+    return ansatz
+
+
+class TestProblemSignature:
+    """Signatures ignore scale and separate different problems."""
+
+    def test_scale_invariant(self):
+        linear, quadratic = random_problem(5)
+        np.testing.assert_allclose(problem_signature(hamiltonian_of(linear, quadratic)),
+                                   problem_signature(hamiltonian_of(3 * linear, 3 * quadratic)), atol=1e-12)
+
+    def test_similar_problems_are_close(self):
+        linear, quadratic = random_problem(5)
+        base = problem_signature(hamiltonian_of(linear, quadratic))
+        nudged = problem_signature(hamiltonian_of(linear * 1.01, quadratic))
+        other = problem_signature(hamiltonian_of(*random_problem(5, seed=9)))
+        assert len(base) == 5 + 10
+        assert np.linalg.norm(base - nudged) < 0.05
+        assert np.linalg.norm(base - other) > 0.5
+
+    def test_ansatz_key(self):
+        assert ansatz_key(measured_ansatz(4)) == ansatz_key(RealAmplitudes(4, reps=1))
+        assert ansatz_key(measured_ansatz(4)) != ansatz_key(measured_ansatz(4, reps=2))
+        qaoa = QAOAAnsatz(hamiltonian_of(*random_problem(4)), reps=2)
+        assert ansatz_key(qaoa) == "4q_QAOA_r2_p4"
+
+
+class TestWarmStartStore:
+    """Nearest-neighbour recall per ansatz key, optionally persisted."""
+
+    def setup_method(self):
+        self.ansatz = measured_ansatz(4)
+        self.linear, self.quadratic = random_problem(4)
+        self.hamiltonian = hamiltonian_of(self.linear, self.quadratic)
+        self.parameters = np.linspace(0, 1, self.ansatz.num_parameters)
+
+    def test_nearest_problem(self):
+        store = WarmStartStore()
+        assert store.lookup(self.ansatz, self.hamiltonian) == []
+        store.record(self.ansatz, self.hamiltonian, self.parameters, objective=-1.0)
+        store.record(self.ansatz, hamiltonian_of(self.linear * 1.2, self.quadratic), self.parameters + 1)
+
+        starts = store.lookup(self.ansatz, hamiltonian_of(self.linear * 1.02, self.quadratic), k=2)
+        assert len(starts) == 2
+        np.testing.assert_allclose(starts[0].parameters, self.parameters)
+        assert starts[0].objective == -1.0
+        assert starts[0].distance < starts[1].distance
+
+        # Dissimilar problems and other circuits get nothing
+        assert store.lookup(self.ansatz, hamiltonian_of(*random_problem(4, seed=5))) == []
+        assert store.lookup(measured_ansatz(4, reps=2), self.hamiltonian) == []
+
+    def test_same_problem_is_replaced(self):
+        store = WarmStartStore()
+        store.record(self.ansatz, self.hamiltonian, self.parameters)
+        store.record(self.ansatz, hamiltonian_of(2 * self.linear, 2 * self.quadratic), self.parameters + 1)
+        assert store.info()['entries'] == 1
+        np.testing.assert_allclose(store.lookup(self.ansatz, self.hamiltonian)[0].parameters, self.parameters + 1)
+
+    def test_invalid_parameters_are_ignored(self):
+        store = WarmStartStore()
+        store.record(self.ansatz, self.hamiltonian, self.parameters[:-1])
+        store.record(self.ansatz, self.hamiltonian, np.full(self.ansatz.num_parameters, np.nan))
+        assert store.info()['entries'] == 0
+
+    def test_persisted_across_instances(self, tmp_path):
+        WarmStartStore(str(tmp_path)).record(self.ansatz, self.hamiltonian, self.parameters, objective=-2.0)
+        starts = WarmStartStore(str(tmp_path)).lookup(self.ansatz, self.hamiltonian)
+        assert starts[0].distance == 0.0
+        assert starts[0].objective == -2.0
+        np.testing.assert_allclose(starts[0].parameters, self.parameters)
+
+        path = next(tmp_path.glob("*.json"))
+        path.write_text("{not json")
+        assert WarmStartStore(str(tmp_path)).lookup(self.ansatz, self.hamiltonian) == []
+
+    def test_seeded_population(self):
+        seeds = [WarmStart(np.full(3, 1.0), 0.0), WarmStart(np.full(3, 2.0), 0.1)]
+        population = seeded_population(seeds, 20, 3, np.random.default_rng(0))
+        assert population.shape == (20, 3)
+        np.testing.assert_array_equal(population[:2], [[1.0] * 3, [2.0] * 3])
+        # A quarter of the population explores around the nearest optimum
+        assert np.all(np.abs(population[2:7] - 1.0) < 2.0)
+        assert population.min() >= 0 and population.max() <= 2 * np.pi
+
+
+class TestWarmStartedOptimizers:
+    """COBYLA and DE start from the recorded optimum of a similar problem."""
+
+    def test_quantum_optimize_seeds_cobyla(self):
+        rng = np.random.default_rng(3)
+        prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0.001, 0.01, (30, 3)), axis=0)),
+                              index=pd.date_range('2023-01-01', periods=30, freq='D'), columns=list("ABC"))
+        store = WarmStartStore()
+        calls = []
+
+        def fake_simulator(ansatz, hamiltonian, num_assets, init_params, simulation_mode="sampling"):
+            calls.append(np.array(init_params))
+            return {'solution': [1, 0, 0], 'objective_value': -1.0,
+                    'optimal_parameters': [0.5] * ansatz.num_parameters}
+
+        with patch.object(hybrid_portfolio_opt, 'get_warm_start_store', return_value=store), \
+                patch.object(hybrid_portfolio_opt, 'run_simulator', side_effect=fake_simulator), \
+                patch.object(hybrid_portfolio_opt, 'qc_simulator_mode', True, create=True):
+            first = asyncio.run(hybrid_portfolio_opt.quantum_optimize(prices, risk_aversion=0.05))
+            second = asyncio.run(hybrid_portfolio_opt.quantum_optimize(prices, risk_aversion=0.05))
+            asyncio.run(hybrid_portfolio_opt.quantum_optimize(prices, risk_aversion=0.05, warm_start=False))
+
+        assert first['warm_start_distance'] is None
+        assert second['warm_start_distance'] == 0.0
+        np.testing.assert_allclose(calls[1], 0.5)
+        np.testing.assert_allclose(calls[2], calls[0])
+
+    def test_differential_evolution_seeds_population(self):
+        linear, quadratic = random_problem(4, seed=6)
+        hamiltonian = hamiltonian_of(linear, quadratic)
+        ansatz = measured_ansatz(4)
+        config = DynamicOptimizationConfig(num_generations=2, population_size=3, estimator_shots=500,
+                                           sampler_shots=200)
+        store = WarmStartStore()
+        with patch.object(enhanced_dynamic_portfolio_opt, 'get_warm_start_store', return_value=store):
+            first = run_differential_evolution_vqe(ansatz, hamiltonian, config, quantum_backend="aer_simulator")
+            second = run_differential_evolution_vqe(ansatz, hamiltonian_of(linear * 1.01, quadratic), config,
+                                                    quantum_backend="aer_simulator")
+
+        assert first['warm_start_distance'] is None
+        assert 0 < second['warm_start_distance'] < 0.05
+        assert store.info()['entries'] == 2
+        assert second['evaluation_count'] == first['evaluation_count']